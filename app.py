@@ -1,12 +1,16 @@
 import streamlit as st
-import json
 from datetime import datetime
-import re
-import requests
-from typing import List, Dict, Optional
 import time
-from utils.logger import logger, log_api_call, log_error, log_user_action, log_generation
-from utils.rate_limiter import rate_limiter
+from utils.logger import log_user_action, log_generation
+from utils.generators import gerar_estrutura_infografico, gerar_roteiro_video
+from utils.metrics import metrics
+from utils.serializer import serializer
+from utils.research import PERGUNTAS_RAPIDAS
+from ui.servicos import (get_api_keys, aquecer_cache, destino_webhook, enfileirar_envio, gerar_com_historico,
+                         mostrar_imagem_infografico, mostrar_leitor_video, mostrar_lesao, mostrar_narracao,
+                         mostrar_perplexity_stream, pesquisar_evidencia, registar_procura,
+                         streaming_video_disponivel)
+from ui.paineis import admin_autorizado, mostrar_envios, mostrar_historico, mostrar_painel_admin
 
 # Configuração da página
 st.set_page_config(
@@ -15,348 +19,37 @@ st.set_page_config(
     layout="wide"
 )
 
+metrics.iniciar_exportacao()
+aquecer_cache()
 
-# ==== FUNÇÕES DE INTEGRAÇÃO COM APIs ====
+if admin_autorizado():
+    mostrar_painel_admin()
 
-@st.cache_data(ttl=3600)
-def get_api_keys():
-    """Obtém as API keys do Streamlit secrets"""
-    try:
-        return {
-            'newsapi': st.secrets.get('NEWSAPI_KEY', ''),
-            'perplexity': st.secrets.get('PERPLEXITY_API_KEY', ''),
-            'openai': st.secrets.get('OPENAI_API_KEY', '')
-        }
-    except:
-                log_error('get_api_keys', Exception('Erro ao carregar API keys'))
-                return {'newsapi': '', 'perplexity': '', 'openai': ''}
+# Widgets dos formulários -> valor inicial. O Streamlit apaga o estado de um
+# widget que não é executado num rerun; como só o separador aberto é executado,
+# os valores são reafirmados no início de cada rerun para sobreviverem à troca
+# de separador
+FORMULARIOS = {
+    'fonte_info': None, 'publico_info': None, 'idioma_info': None, 'nivel_detalhe': None,
+    'pesquisar_info': True,
+    'fonte_video': None, 'publico_video': None, 'idioma_video': None, 'duracao': 90, 'tom': None,
+    'pesquisar_video': True, 'narracao_video': None, 'video_url_input': None, 'video_streaming': True,
+    'query_perplexity': None, 'reutilizar_semelhantes': True,
+    'historico_tipo': None, 'historico_lesao': None, 'historico_publico': None, 'historico_idioma': None,
+    'historico_texto': None,
+}
 
-@st.cache_data(ttl=1800)
-def buscar_pubmed(query: str, max_results: int = 5) -> List[Dict]:
-    """Busca artigos no PubMed via API pública - GRATUITO"""
-    try:
-                # Rate limiting check
-        if not rate_limiter.check_limit('pubmed'):
-            st.warning('⚠️ Muitas requisições. Aguarde um momento.')
-            return []
-        
-        start_time = time.time()
-        search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-        search_params = {'db': 'pubmed', 'term': query, 'retmax': max_results, 'retmode': 'json', 'sort': 'relevance'}
-        search_response = requests.get(search_url, params=search_params, timeout=10)
-        search_data = search_response.json()
-        ids = search_data.get('esearchresult', {}).get('idlist', [])
-        if not ids:
-            return []
-        
-        fetch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-        fetch_params = {'db': 'pubmed', 'id': ','.join(ids), 'retmode': 'json'}
-        fetch_response = requests.get(fetch_url, params=fetch_params, timeout=10)
-        fetch_data = fetch_response.json()
-        
-        artigos = []
-        for pmid in ids:
-            if pmid in fetch_data.get('result', {}):
-                article = fetch_data['result'][pmid]
-                artigos.append({
-                    'pmid': pmid,
-                    'title': article.get('title', 'N/A'),
-                    'authors': ', '.join([a.get('name', '') for a in article.get('authors', [])[:3]]),
-                    'journal': article.get('source', 'N/A'),
-                    'pubdate': article.get('pubdate', 'N/A'),
-                    'url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-                })
-        log_api_call('buscar_pubmed', time.time() - start_time, True, len(artigos))
-        return artigos
-    except Exception as e:
-        st.error(f"⚠️ Erro ao buscar no PubMed: {str(e)}")
-        log_error('buscar_pubmed', e)
-        return []
-
-@st.cache_data(ttl=1800)
-def buscar_noticias(query: str, api_key: str, max_results: int = 5) -> List[Dict]:
-    """Busca notícias via NewsAPI"""
-    if not api_key:
-        return []
-    try:
-                # Rate limiting check
-        if not rate_limiter.check_limit('newsapi'):
-            st.warning('⚠️ Muitas requisições. Aguarde um momento.')
-            return []
-        
-        start_time = time.time()
-        
-        url = "https://newsapi.org/v2/everything"
-        params = {'q': query, 'language': 'pt', 'sortBy': 'publishedAt', 'pageSize': max_results, 'apiKey': api_key}
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        if data.get('status') != 'ok':
-            return []
-        noticias = [{'title': article.get('title', 'N/A'), 'source': article.get('source', {}).get('name', ''), 'description': article.get('description', 'N/A'), 'url': article.get('url', ''), 'publishedAt': article.get('publishedAt', 'N/A')} for article in data.get('articles', [])]
-        log_api_call('buscar_noticias', time.time() - start_time, True, len(noticias))
-        return noticias
-    except Exception as e:
-        st.error(f"⚠️ Erro ao buscar notícias: {str(e)}")
-        log_error('buscar_noticias', e)
-        return []
-
-@st.cache_data(ttl=1800)
-def buscar_perplexity(query: str, api_key: str) -> str:
-    """Busca informações sobre lesões desportivas via Perplexity AI"""
-    if not api_key:
-        return ""
-    
-    try:
-        # Rate limiting check
-        if not rate_limiter.check_limit('perplexity'):
-            st.warning('⚠️ Muitas requisições. Aguarde um momento.')
-            return ""
-        
-        start_time = time.time()
-        
-        url = "https://api.perplexity.ai/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "llama-3.1-sonar-small-128k-online",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "Você é um especialista em medicina desportiva e fisioterapia. Fornece informações precisas, detalhadas e baseadas em evidência científica sobre lesões desportivas, tratamentos, reabilitação e prevenção."
-                },
-                {
-                    "role": "user",
-                    "content": query
-                }
-            ],
-            "temperature": 0.2,
-            "max_tokens": 1000
-        }
-        
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response_data = response.json()
-        
-        if 'choices' in response_data and len(response_data['choices']) > 0:
-            resultado = response_data['choices'][0]['message']['content']
-            log_api_call('buscar_perplexity', time.time() - start_time, True, len(resultado))
-            return resultado
-        else:
-            return ""
-            
-    except Exception as e:
-        st.error(f"⚠️ Erro ao consultar Perplexity AI: {str(e)}")
-        log_error('buscar_perplexity', e)
-        return ""
-
-
-# Título principal
-
-# Funções auxiliares
-def validar_pubmed_id(texto):
-    """Valida se o texto contém um PubMed ID válido (8 dígitos)"""
-    if not texto:
-        return False
-    padrao = r'\b\d{8}\b'
-    return re.search(padrao, texto) is not None
-
-def extrair_tipo_fonte(texto):
-    """Identifica o tipo de fonte fornecida"""
-    if not texto:
-        return "Texto livre", "📝"
-    if validar_pubmed_id(texto):
-        return "PubMed ID", "🔬"
-    elif texto.startswith('http'):
-        return "URL", "🌐"
-    elif 'doi' in texto.lower():
-        return "DOI", "📄"
-    else:
-        return "Texto livre", "📝"
-
-def gerar_lesoes_comuns():
-    """Retorna lista de lesões desportivas comuns para quick selection"""
-    return [
-        "Entorse do Tornozelo",
-        "Rutura do LCA (Ligamento Cruzado Anterior)",
-        "Tendinite Patelar (Joelho do Saltador)",
-        "Fascite Plantar",
-        "Pubalgia",
-        "Lesão Muscular Isquiotibial",
-        "Síndrome do Impacto no Ombro",
-        "Epicondilite Lateral (Cotovelo do Tenista)",
-        "Fratura de Stress",
-        "Concussão Cerebral"
-    ]
-
-st.title("🏥 Sports Injury AI Studio")
-st.markdown("*Gere infográficos e vídeos profissionais sobre lesões desportivas*")
-
-# Função para gerar estrutura de infográfico
-def gerar_estrutura_infografico(fonte, tema, publico, idioma, nivel_detalhe):
-    """Gera estrutura JSON para infográfico"""
-        
-    # Detect tipo de fonte
-    tipo_fonte, emoji = extrair_tipo_fonte(fonte)
-    
-    estrutura = {
-        "metadata": {
-            "titulo": f"Infográfico: {tema}",
-            "data_criacao": datetime.now().isoformat(),
-            "publico_alvo": publico,
-            "idioma": idioma,
-            "nivel_detalhe": nivel_detalhe
-        },
-        "conteudo": {
-            "titulo_principal": tema,
-            "subtitulo": f"Informação para {publico}",
-            "secoes": [
-                {
-                    "id": 1,
-                    "tipo": "introducao",
-                    "titulo": "O que é?",
-                    "conteudo": f"Introdução sobre {tema}",
-                    "visual_hint": "ícone anatômico"
-                },
-                {
-                    "id": 2,
-                    "tipo": "sintomas",
-                    "titulo": "Sintomas",
-                    "conteudo": "Lista de sintomas principais",
-                    "visual_hint": "ícones de sintomas"
-                },
-                {
-                    "id": 3,
-                    "tipo": "tratamento",
-                    "titulo": "Tratamento",
-                    "conteudo": "Opções de tratamento",
-                    "visual_hint": "fluxograma"
-                },
-                {
-                    "id": 4,
-                    "tipo": "prevencao",
-                    "titulo": "Prevenção",
-                    "conteudo": "Dicas de prevenção",
-                    "visual_hint": "checklist visual"
-                }
-            ],
-            "layout": {
-                "tipo": "vertical",
-                "cores_principais": ["#2E86AB", "#A23B72", "#F18F01"],
-                "fonte_titulo": "Montserrat Bold",
-                "fonte_corpo": "Open Sans"
-            }
-        },
-        "integracao": {
-            "plataforma_destino": "Canva",
-            "fonte_dados": fonte
-        }
-    }
-    return estrutura
-
-# Função para gerar roteiro de vídeo
-def gerar_roteiro_video(fonte, tema, publico, idioma, duracao, tom):
-    """Gera roteiro JSON para vídeo"""
-    roteiro = {
-        "metadata": {
-            "titulo": f"Vídeo: {tema}",
-            "data_criacao": datetime.now().isoformat(),
-            "publico_alvo": publico,
-            "idioma": idioma,
-            "duracao_alvo": duracao,
-            "tom": tom
-        },
-        "cenas": [
-            {
-                "id": 1,
-                "duracao": int(duracao * 0.15),
-                "tipo": "abertura",
-                "narrador": {
-                    "role": "especialista",
-                    "texto": f"Bem-vindo! Hoje vamos falar sobre {tema}",
-                    "tom_voz": tom
-                },
-                "visual": {
-                    "tipo": "título animado",
-                    "elementos": ["logo", "título", "subtítulo"]
-                }
-            },
-            {
-                "id": 2,
-                "duracao": int(duracao * 0.25),
-                "tipo": "contexto",
-                "narrador": {
-                    "role": "especialista",
-                    "texto": "Contextualização da lesão",
-                    "tom_voz": tom
-                },
-                "visual": {
-                    "tipo": "animação anatômica",
-                    "elementos": ["diagrama", "setas", "legendas"]
-                }
-            },
-            {
-                "id": 3,
-                "duracao": int(duracao * 0.30),
-                "tipo": "explicacao",
-                "narrador": {
-                    "role": "especialista",
-                    "texto": "Explicação detalhada dos sintomas e diagnóstico",
-                    "tom_voz": tom
-                },
-                "visual": {
-                    "tipo": "infográfico animado",
-                    "elementos": ["lista", "ícones", "transições"]
-                }
-            },
-            {
-                "id": 4,
-                "duracao": int(duracao * 0.20),
-                "tipo": "solucao",
-                "narrador": {
-                    "role": "especialista",
-                    "texto": "Tratamentos e reabilitação",
-                    "tom_voz": tom
-                },
-                "visual": {
-                    "tipo": "demonstração",
-                    "elementos": ["exercícios", "técnicas", "equipamento"]
-                }
-            },
-            {
-                "id": 5,
-                "duracao": int(duracao * 0.10),
-                "tipo": "encerramento",
-                "narrador": {
-                    "role": "especialista",
-                    "texto": "Conclusão e call-to-action",
-                    "tom_voz": tom
-                },
-                "visual": {
-                    "tipo": "tela final",
-                    "elementos": ["resumo", "contatos", "redes sociais"]
-                }
-            }
-        ],
-        "audio": {
-            "narrador_voz": "Português nativo profissional" if idioma == "Português" else "Native speaker",
-            "musica_fundo": "corporativa suave",
-            "efeitos_sonoros": ["transições", "highlights"]
-        },
-        "integracao": {
-            "plataforma_video": "HeyGen/Synthesia",
-            "plataforma_audio": "ElevenLabs",
-            "fonte_dados": fonte
-        }
-    }
-    return roteiro
-
-# Tabs principais
-tab1, tab2 , tab3= st.tabs(["📊 Infográfico", "🎬 Vídeo", "🤖 Perplexity AI"])
+def preservar_formularios():
+    """Mantém os valores dos formulários dos separadores fechados"""
+    for chave, inicial in FORMULARIOS.items():
+        if chave in st.session_state:
+            st.session_state[chave] = st.session_state[chave]
+        elif inicial is not None:
+            st.session_state[chave] = inicial
 
 # TAB 1: INFOGRÁFICO
-with tab1:
+def mostrar_infografico():
+    """Separador do gerador de infográficos"""
     st.header("📊 Gerador de Infográfico")
     
     col1, col2 = st.columns(2)
@@ -365,54 +58,94 @@ with tab1:
         fonte_info = st.text_area(
             "Fonte / Tema",
             placeholder="Cole texto, URL, PubMed ID ou descreva o tema da lesão...",
-            height=100
+            height=100,
+            key="fonte_info"
         )
         
         publico_info = st.selectbox(
             "Público-alvo",
-            ["Fisioterapeuta", "Atleta", "Treinador", "Paciente leigo"]
+            ["Fisioterapeuta", "Atleta", "Treinador", "Paciente leigo"],
+            key="publico_info"
         )
     
     with col2:
         idioma_info = st.selectbox(
             "Idioma",
-            ["Português", "English", "Español"]
+            ["Português", "English", "Español"],
+            key="idioma_info"
         )
         
         nivel_detalhe = st.select_slider(
             "Nível de detalhe",
-            options=["Conciso", "Standard", "Detalhado"]
+            options=["Conciso", "Standard", "Detalhado"],
+            key="nivel_detalhe"
+        )
+        
+        pesquisar_info = st.checkbox(
+            "🔎 Incluir evidência (PubMed, NewsAPI, Perplexity)",
+            key="pesquisar_info"
+        )
+        
+        destino_info = destino_webhook('infografico')
+        enviar_info = st.checkbox(
+            "📤 Enviar para Make.com/Activepieces",
+            value=bool(destino_info),
+            disabled=not destino_info,
+            help="Configure MAKE_WEBHOOK_INFOGRAPHIC ou ACTIVEPIECES_WEBHOOK nos secrets",
+            key="enviar_info"
         )
     
     if st.button("🎨 Gerar Estrutura de Infográfico", type="primary", use_container_width=True):
         if fonte_info:
             with st.spinner("Gerando estrutura..."):
-                estrutura = gerar_estrutura_infografico(
-                    fonte_info,
-                    fonte_info[:50] + "..." if len(fonte_info) > 50 else fonte_info,
-                    publico_info,
-                    idioma_info,
-                    nivel_detalhe
+                inicio_geracao = time.time()
+                tema_info = fonte_info[:50] + "..." if len(fonte_info) > 50 else fonte_info
+                entradas = {'fonte': fonte_info, 'tema': tema_info, 'publico': publico_info,
+                            'idioma': idioma_info, 'nivel': nivel_detalhe}
+                if pesquisar_info:
+                    registar_procura('tema', tema_info)
+                estrutura, do_historico = gerar_com_historico(
+                    'infografico', entradas,
+                    lambda: gerar_estrutura_infografico(
+                        fonte_info,
+                        tema_info,
+                        publico_info,
+                        idioma_info,
+                        nivel_detalhe,
+                        pesquisa=pesquisar_evidencia(tema_info) if pesquisar_info else None
+                    ),
+                    pesquisa=pesquisar_info
                 )
+                metrics.observe('generation_seconds', time.time() - inicio_geracao, tipo='infografico')
+                log_generation('infografico', tema_info, True, (time.time() - inicio_geracao) * 1000)
                 
-                st.success("✅ Estrutura gerada com sucesso!")
+                st.success("✅ Estrutura gerada com sucesso!" + (" ♻️ (do histórico)" if do_historico else ""))
+                mostrar_lesao(estrutura)
                 
                 # Mostra preview
-                st.json(estrutura)
+                col_imagem, col_json = st.columns([1, 2])
+                with col_imagem:
+                    mostrar_imagem_infografico(estrutura)
+                with col_json:
+                    st.json(estrutura)
                 
                 # Download JSON
-                json_str = json.dumps(estrutura, indent=2, ensure_ascii=False)
+                json_str = serializer.dumps(estrutura, pretty=True)
                 st.download_button(
                     label="📥 Download JSON para Make.com",
                     data=json_str,
                     file_name=f"infografico_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                     mime="application/json"
                 )
+                
+                if enviar_info and destino_info:
+                    enfileirar_envio(destino_info, estrutura, 'infografico')
         else:
             st.warning("⚠️ Por favor, insira a fonte ou tema")
 
 # TAB 2: VÍDEO
-with tab2:
+def mostrar_video():
+    """Separador do gerador de roteiros e da visualização de vídeo"""
     st.header("🎬 Gerador de Roteiro de Vídeo")
     
     col1, col2 = st.columns(2)
@@ -442,34 +175,69 @@ with tab2:
             "Duração do vídeo (segundos)",
             min_value=30,
             max_value=180,
-            value=90,
-            step=15
+            step=15,
+            key="duracao"
         )
         
         tom = st.select_slider(
             "Tom",
-            options=["Explicativo", "Motivacional", "Técnico"]
+            options=["Explicativo", "Motivacional", "Técnico"],
+            key="tom"
+        )
+        
+        pesquisar_video = st.checkbox(
+            "🔎 Incluir evidência (PubMed, NewsAPI, Perplexity)",
+            key="pesquisar_video"
+        )
+        
+        narracao_video = st.checkbox(
+            "🎧 Gerar narração em áudio",
+            help="Sintetiza a fala de cada cena (gTTS ou motor offline) numa faixa com a duração das cenas",
+            key="narracao_video"
+        )
+        
+        destino_video = destino_webhook('video')
+        enviar_video = st.checkbox(
+            "📤 Enviar para Make.com/Activepieces",
+            value=bool(destino_video),
+            disabled=not destino_video,
+            help="Configure MAKE_WEBHOOK_VIDEO ou ACTIVEPIECES_WEBHOOK nos secrets",
+            key="enviar_video"
         )
     
     if st.button("🎬 Gerar Roteiro de Vídeo", type="primary", use_container_width=True, key="btn_video"):
         if fonte_video:
             with st.spinner("Gerando roteiro..."):
-                roteiro = gerar_roteiro_video(
-                    fonte_video,
-                    fonte_video[:50] + "..." if len(fonte_video) > 50 else fonte_video,
-                    publico_video,
-                    idioma_video,
-                    duracao,
-                    tom
+                inicio_geracao = time.time()
+                tema_video = fonte_video[:50] + "..." if len(fonte_video) > 50 else fonte_video
+                entradas = {'fonte': fonte_video, 'tema': tema_video, 'publico': publico_video,
+                            'idioma': idioma_video, 'duracao': duracao, 'tom': tom}
+                if pesquisar_video:
+                    registar_procura('tema', tema_video)
+                roteiro, do_historico = gerar_com_historico(
+                    'video', entradas,
+                    lambda: gerar_roteiro_video(
+                        fonte_video,
+                        tema_video,
+                        publico_video,
+                        idioma_video,
+                        duracao,
+                        tom,
+                        pesquisa=pesquisar_evidencia(tema_video) if pesquisar_video else None
+                    ),
+                    pesquisa=pesquisar_video
                 )
+                metrics.observe('generation_seconds', time.time() - inicio_geracao, tipo='video')
+                log_generation('video', tema_video, True, (time.time() - inicio_geracao) * 1000)
                 
-                st.success("✅ Roteiro gerado com sucesso!")
+                st.success("✅ Roteiro gerado com sucesso!" + (" ♻️ (do histórico)" if do_historico else ""))
+                mostrar_lesao(roteiro)
                 
                 # Mostra preview
                 st.json(roteiro)
                 
                 # Download JSON
-                json_str = json.dumps(roteiro, indent=2, ensure_ascii=False)
+                json_str = serializer.dumps(roteiro, pretty=True)
                 st.download_button(
                     label="📥 Download JSON para Make.com",
                     data=json_str,
@@ -477,6 +245,12 @@ with tab2:
                     mime="application/json",
                     key="download_video"
                 )
+                
+                if narracao_video:
+                    mostrar_narracao(roteiro)
+                
+                if enviar_video and destino_video:
+                    enfileirar_envio(destino_video, roteiro, 'video')
         else:
             st.warning("⚠️ Por favor, insira a fonte ou tema")
 
@@ -491,17 +265,21 @@ with tab2:
         help="Suporta YouTube, Vimeo, e links diretos para ficheiros de vídeo",
         key="video_url_input"
     )
+    video_streaming = streaming_video_disponivel() and st.checkbox(
+        "⏩ Streaming com avanço rápido (ficheiros locais e links diretos)",
+        key="video_streaming"
+    )
     
     if video_url:
-        try:
-            st.video(video_url)
-            st.caption(f"📍 Fonte: {video_url}")
-        except Exception as e:
-            st.error(f"⚠️ Erro ao carregar vídeo: {str(e)}")
-            st.info("💡 Dica: Certifica-te que o URL é válido e acessível. Para YouTube, usa o formato: https://youtu.be/VIDEO_ID")
+        mostrar_leitor_video(video_url, video_streaming)
 
-            # TAB 3: PERPLEXITY AI
-with tab3:
+# TAB 3: PERPLEXITY AI
+def escolher_pergunta(pergunta):
+    """Preenche a pergunta com um exemplo (antes do rerun, quando o widget ainda aceita o valor)"""
+    st.session_state.query_perplexity = pergunta
+
+def mostrar_perplexity():
+    """Separador do assistente de pesquisa Perplexity"""
     st.header("🤖 Assistente de Pesquisa - Perplexity AI")
     
     st.markdown("""
@@ -525,12 +303,15 @@ with tab3:
     with col2:
         st.markdown("<br>", unsafe_allow_html=True)
         st.markdown("**Exemplos:**")
-        if st.button("🦵 Rutura LCA", use_container_width=True):
-            st.session_state.query_perplexity = "Quais são os protocolos mais recentes e baseados em evidência para reabilitação de rutura do ligamento cruzado anterior em atletas profissionais?"
-        if st.button("⚽ Entorse Tornozelo", use_container_width=True):
-            st.session_state.query_perplexity = "Quais são as melhores práticas para tratamento e prevenção de entorses de tornozelo em futebolistas?"
-        if st.button("🏋️ Tendinite Patelar", use_container_width=True):
-            st.session_state.query_perplexity = "Qual é o tratamento mais eficaz para tendinite patelar (joelho do saltador) baseado em evidência científica?"
+        for rotulo, pergunta in PERGUNTAS_RAPIDAS.items():
+            st.button(rotulo, use_container_width=True, on_click=escolher_pergunta, args=(pergunta,))
+    
+    st.checkbox(
+        "♻️ Reutilizar respostas a perguntas semelhantes",
+        help="Sem resposta guardada para esta pergunta, mostra a de uma pergunta quase igual já respondida "
+             "(poupa a quota e os segundos de espera da Perplexity)",
+        key="reutilizar_semelhantes"
+    )
     
     if st.button("🔍 Pesquisar com Perplexity AI", type="primary", use_container_width=True, key="btn_perplexity"):
         if query_perplexity:
@@ -540,22 +321,41 @@ with tab3:
             if not perplexity_key:
                 st.error("⚠️ API Key da Perplexity não configurada. Configure em Streamlit Secrets.")
             else:
-                with st.spinner("Consultando Perplexity AI..."):
-                    resultado = buscar_perplexity(query_perplexity, perplexity_key)
+                st.markdown("---")
+                st.markdown("### 📝 Resposta:")
+                registar_procura('pergunta', query_perplexity)
+                resultado = mostrar_perplexity_stream(query_perplexity, perplexity_key,
+                                                      st.session_state.reutilizar_semelhantes)
+                
+                if resultado:
+                    st.success("✅ Pesquisa concluída!")
                     
-                    if resultado:
-                        st.success("✅ Pesquisa concluída!")
-                        st.markdown("---")
-                        st.markdown("### 📝 Resposta:")
-                        st.markdown(resultado)
-                        
-                        # Log da ação do usuário
-                        log_user_action('perplexity_search', {'query': query_perplexity[:100]})
-                    else:
-                        st.warning("⚠️ Não foi possível obter resposta da Perplexity AI.")
+                    # Log da ação do usuário
+                    log_user_action('perplexity_search', {'query': query_perplexity[:100]})
+                else:
+                    st.warning("⚠️ Não foi possível obter resposta da Perplexity AI.")
         else:
             st.warning("⚠️ Por favor, insira uma pergunta.")
 
+# Título principal
+
+st.title("🏥 Sports Injury AI Studio")
+st.markdown("*Gere infográficos e vídeos profissionais sobre lesões desportivas*")
+
+# Tabs principais: só o separador aberto é executado em cada rerun
+preservar_formularios()
+tab1, tab2, tab3, tab4 = st.tabs(["📊 Infográfico", "🎬 Vídeo", "🤖 Perplexity AI", "🗂️ Histórico"],
+                                 key="tab", on_change="rerun")
+for tab, mostrar in ((tab1, mostrar_infografico), (tab2, mostrar_video), (tab3, mostrar_perplexity),
+                     (tab4, mostrar_historico)):
+    if tab.open:
+        with tab:
+            mostrar()
+
+if st.session_state.get('envios'):
+    st.markdown("---")
+    mostrar_envios()
+
 # Rodapé
 st.markdown("---")
 st.markdown(
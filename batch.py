@@ -0,0 +1,368 @@
+"""Geração em lote (sem UI) para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Lê um CSV ou JSONL com colunas fonte, tema, publico, idioma, nivel/duracao,
+tom (e opcionalmente tipo = infografico|video) e escreve uma linha JSONL por
+entrada, processando em paralelo num pool de processos. Entrada e saída podem
+ser .jsonl.gz (comprimidas com gzip).
+
+Com --resolver-ids, as fontes são classificadas em blocos (PMIDs, DOIs e URLs
+extraídos de uma vez) e os identificadores novos de cada bloco são resolvidos
+num só pedido em lote ao PubMed; os artigos citados na fonte entram no bloco
+de evidência do documento.
+
+Com --audio DIR, a narração de cada roteiro de vídeo é sintetizada (cenas em
+paralelo, clips em cache por conteúdo) numa faixa WAV DIR/linha_<n>.wav com a
+duração das cenas; --tts escolhe o backend (gtts ou offline). Com --imagens
+DIR, cada infográfico é desenhado localmente (Pillow) em DIR/linha_<n>.png
+(ou .webp com --formato-imagem webp), nos mesmos processos do pool.
+
+Com --pesquisa, os temas de cada bloco de entradas são pesquisados de uma vez
+no PubMed (History Server, pubmed_bulk.buscar_pubmed_lote) e cada linha
+recebe os artigos do seu tema, pesquisando só NewsAPI e Perplexity.
+
+Com --historico, as entradas já geradas (mesmos campos) são servidas do
+histórico da app (utils/historico.py) e as novas ficam lá guardadas.
+
+Exemplo:
+    python batch.py temas.csv -o saida.jsonl --workers 4 --pesquisa
+    python batch.py temas.jsonl.gz -o saida.jsonl.gz --validar
+    python batch.py referencias.csv -o saida.jsonl --resolver-ids
+    python batch.py temas.csv -t video -o saida.jsonl --audio narracoes/ --tts offline
+    python batch.py temas.csv -o saida.jsonl --imagens imagens/ --formato-imagem webp
+    python batch.py temas.csv -o saida.jsonl --historico
+    python batch.py temas.csv -o saida.jsonl --webhook https://hook.eu1.make.com/...
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+
+from utils.generators import gerar_estrutura_infografico, gerar_roteiro_video
+from utils.identificadores import classificar_lote, extrair_lote
+from utils.schemas import validar
+from utils.serializer import serializer
+from utils.webhook_queue import webhook_queue
+
+TIPOS = ('infografico', 'video')
+
+# Duração dos roteiros de vídeo em segundos (os mesmos limites do slider da app)
+DURACAO_MIN, DURACAO_MAX = 30, 180
+
+# Entradas classificadas e resolvidas de cada vez com --resolver-ids
+BLOCO_IDS = 500
+# Artigos do PubMed por tema com --pesquisa (os mesmos de research.pesquisar_fontes)
+ARTIGOS_POR_TEMA = 5
+
+
+def ler_entradas(path: Path):
+    """Gera dicionários a partir de um ficheiro CSV ou JSONL (opcionalmente .gz)"""
+    if {'.jsonl', '.ndjson'} & {s.lower() for s in path.suffixes}:
+        yield from serializer.ler_jsonl(path)
+        return
+    with open(path, encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def _blocos(itens, tamanho: int):
+    bloco = []
+    for item in itens:
+        bloco.append(item)
+        if len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def resolver_fontes(entradas, tamanho_bloco: int = BLOCO_IDS):
+    """Gera (numero, entrada, artigos citados na fonte) a partir de (numero, entrada)
+
+    Cada bloco de fontes é classificado de uma vez e só os PMIDs/DOIs ainda
+    não pedidos são resolvidos (pubmed_bulk.resolver_identificadores). Uma
+    falha na resolução deixa as entradas do bloco sem artigos.
+    """
+    from utils.pubmed_bulk import resolver_identificadores
+
+    artigos, por_doi, pedidos = {}, {}, set()
+    for bloco in _blocos(entradas, tamanho_bloco):
+        fontes = classificar_lote(linha.get('fonte') or '' for _, linha in bloco)
+        pmids, dois = extrair_lote(fontes)
+        pmids = [p for p in pmids if p not in pedidos]
+        dois = [d for d in dois if d not in pedidos]
+        pedidos.update(pmids, dois)
+        if pmids or dois:
+            try:
+                encontrados, dois_encontrados = resolver_identificadores(pmids, dois)
+                artigos.update(encontrados)
+                por_doi.update(dois_encontrados)
+            except Exception as e:
+                sys.stderr.write(f"\nResolução de {len(pmids)} PMIDs/{len(dois)} DOIs falhou: "
+                                 f"{type(e).__name__}: {e}\n")
+        for (numero, linha), fonte in zip(bloco, fontes):
+            ids = dict.fromkeys(fonte.pmids + tuple(por_doi[d] for d in fonte.dois if d in por_doi))
+            yield numero, linha, [artigos[p] for p in ids if p in artigos]
+
+
+def precarregar_pubmed(tarefas, tamanho_bloco: int = BLOCO_IDS):
+    """Gera (numero, entrada, artigos da fonte, artigos do tema) a partir de (numero, entrada, artigos da fonte)
+
+    Os temas ainda não pesquisados de cada bloco vão numa só pesquisa em lote
+    ao PubMed (pubmed_bulk.buscar_pubmed_lote). Uma falha deixa os artigos do
+    tema a None e essas linhas pesquisam o PubMed sozinhas.
+    """
+    from utils.pubmed_bulk import buscar_pubmed_lote
+
+    por_tema = {}
+    for bloco in _blocos(tarefas, tamanho_bloco):
+        temas = [t for t in dict.fromkeys(_tema(linha) for _, linha, _ in bloco) if t and t not in por_tema]
+        if temas:
+            pmids = {}
+            try:
+                artigos = {a['pmid']: a for a in buscar_pubmed_lote(temas, ARTIGOS_POR_TEMA, por_termo=pmids)}
+                por_tema.update({tema: [artigos[p] for p in pmids.get(tema, []) if p in artigos] for tema in temas})
+            except Exception as e:
+                sys.stderr.write(f"\nPesquisa em lote de {len(temas)} temas no PubMed falhou: "
+                                 f"{type(e).__name__}: {e}\n")
+        for numero, linha, artigos_fonte in bloco:
+            yield numero, linha, artigos_fonte, por_tema.get(_tema(linha))
+
+
+def _tema(entrada: dict) -> str:
+    tema = (entrada.get('tema') or '').strip()
+    if tema:
+        return tema
+    fonte = entrada.get('fonte', '')
+    return fonte[:50] + "..." if len(fonte) > 50 else fonte
+
+
+@lru_cache(maxsize=None)
+def _narrador(backend: str):
+    # Um por processo do pool e por backend (os clips em cache são partilhados no disco)
+    from utils.audio import Narrador
+    return Narrador(backend)
+
+
+def processar_entrada(tarefa: tuple) -> dict:
+    """Gera o documento de uma entrada (corre num processo do pool)"""
+    numero, entrada, tipo_padrao, pesquisa, validar_esquema, artigos_fonte, artigos_tema, saidas = tarefa
+    inicio = time.perf_counter()
+    tipo = entrada.get('tipo') or tipo_padrao
+    try:
+        tipo = str(tipo).strip().lower()
+        fonte = (entrada.get('fonte') or '').strip()
+        if not fonte:
+            raise ValueError("campo 'fonte' em falta")
+        if tipo not in TIPOS:
+            raise ValueError(f"tipo inválido: {tipo!r}")
+        tema = _tema(entrada)
+        publico = entrada.get('publico') or 'Fisioterapeuta'
+        idioma = entrada.get('idioma') or 'Português'
+
+        nivel = entrada.get('nivel') or 'Standard'
+        duracao = int(entrada.get('duracao') or 90)
+        if tipo == 'video' and not DURACAO_MIN <= duracao <= DURACAO_MAX:
+            raise ValueError(f"duracao fora do intervalo {DURACAO_MIN}-{DURACAO_MAX} s: {duracao}")
+        tom = entrada.get('tom') or 'Explicativo'
+
+        def gerar() -> dict:
+            pacote = None
+            if pesquisa:
+                from utils.research import FONTES, pesquisar_fontes
+                api_keys = {
+                    'newsapi': os.environ.get('NEWSAPI_KEY', ''),
+                    'perplexity': os.environ.get('PERPLEXITY_API_KEY', ''),
+                }
+                if artigos_tema is None:
+                    pacote = pesquisar_fontes(tema, api_keys)
+                else:
+                    # PubMed já pesquisado em lote (precarregar_pubmed)
+                    pacote = pesquisar_fontes(tema, api_keys, fontes=[f for f in FONTES if f != 'pubmed'])
+                    pacote['pubmed'] = artigos_tema
+            if artigos_fonte:
+                # Os artigos citados na própria fonte vêm primeiro na evidência
+                pacote = dict(pacote or {'pendentes': [], 'erros': {}})
+                citados = {artigo['pmid'] for artigo in artigos_fonte}
+                pacote['pubmed'] = artigos_fonte + [a for a in pacote.get('pubmed', []) if a.get('pmid') not in citados]
+
+            if tipo == 'infografico':
+                return gerar_estrutura_infografico(fonte, tema, publico, idioma, nivel, pesquisa=pacote)
+            return gerar_roteiro_video(fonte, tema, publico, idioma, duracao, tom, pesquisa=pacote)
+
+        historico_hit = None
+        if saidas.get('historico'):
+            from utils.historico import historico
+            entradas = {'fonte': fonte, 'tema': tema, 'publico': publico, 'idioma': idioma}
+            entradas.update({'nivel': nivel} if tipo == 'infografico' else {'duracao': duracao, 'tom': tom})
+            resultado, historico_hit = historico.obter_ou_gerar(
+                tipo, entradas, gerar, pesquisa=pesquisa or bool(artigos_fonte)
+            )
+        else:
+            resultado = gerar()
+        if validar_esquema:
+            validar(tipo, resultado)
+        documento = {'linha': numero, 'tipo': tipo, 'ok': True, 'resultado': resultado}
+        if historico_hit is not None:
+            documento['historico'] = historico_hit
+        if saidas.get('audio') and tipo == 'video':
+            pasta, backend = saidas['audio']
+            faixa = _narrador(backend).renderizar(resultado, Path(pasta) / f'linha_{numero}.wav')
+            documento['audio'] = {'ficheiro': str(faixa.path), 'duracao_s': faixa.duracao_s, 'cenas': faixa.cenas}
+        if saidas.get('imagens') and tipo == 'infografico':
+            from utils.rasterizador import rasterizador
+            pasta, formato = saidas['imagens']
+            destino = Path(pasta) / f'linha_{numero}.{formato}'
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(rasterizador.ficheiro(resultado, formato), destino)
+            documento['imagem'] = str(destino)
+        documento['duracao_ms'] = (time.perf_counter() - inicio) * 1000
+        return documento
+    except Exception as e:
+        return {'linha': numero, 'tipo': tipo, 'ok': False, 'erro': f"{type(e).__name__}: {e}",
+                'duracao_ms': (time.perf_counter() - inicio) * 1000}
+
+
+def _progresso(processadas: int, erros: int, inicio: float, final: bool = False):
+    decorrido = time.monotonic() - inicio
+    taxa = processadas / decorrido if decorrido > 0 else 0
+    fim = '\n' if final else '\r'
+    sys.stderr.write(f"Processadas: {processadas} | Erros: {erros} | {taxa:.1f} linhas/s{fim}")
+    sys.stderr.flush()
+
+
+def executar(entrada: Path, saida, workers: int, tipo_padrao: str, pesquisa: bool,
+             max_pendentes: int = None, validar_esquema: bool = False, webhook: str = None,
+             resolver_ids: bool = False, saidas: dict = None) -> dict:
+    """Processa todas as entradas e escreve os resultados em streaming (ordem de conclusão)
+
+    'saida' é um JsonlWriter (ver serializer.abrir_jsonl). Com 'webhook', cada
+    documento gerado é também colocado na fila de envio desse destino.
+    'saidas' pede ficheiros além do JSONL: 'audio' = (pasta, backend TTS) para
+    a narração dos roteiros, 'imagens' = (pasta, formato) para os infográficos.
+    Com 'historico' = True, cada documento é procurado/guardado no histórico.
+    Se um processo do pool morrer (ex: falta de memória), as linhas que
+    estavam em curso ficam com erro e as restantes seguem num pool novo.
+    """
+    saidas = saidas or {}
+    max_pendentes = max_pendentes or workers * 4
+    processadas = erros = 0
+    envios = []
+    inicio = ultimo_progresso = time.monotonic()
+
+    def escrever(resultados):
+        nonlocal processadas, erros, ultimo_progresso
+        for futuro in resultados:
+            numero, tipo = pendentes.pop(futuro)
+            try:
+                resultado = futuro.result()
+            except BrokenProcessPool as e:
+                resultado = {'linha': numero, 'tipo': tipo, 'ok': False, 'erro': f"{type(e).__name__}: {e}"}
+            processadas += 1
+            if not resultado['ok']:
+                erros += 1
+                sys.stderr.write(f"\nLinha {resultado['linha']}: {resultado['erro']}\n")
+            saida.escrever(resultado)
+            if webhook and resultado['ok']:
+                envios.append(webhook_queue.enfileirar(webhook, resultado['resultado']))
+        if time.monotonic() - ultimo_progresso >= 1:
+            _progresso(processadas, erros, inicio)
+            ultimo_progresso = time.monotonic()
+
+    pendentes = {}
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        tarefas = enumerate(ler_entradas(entrada), start=1)
+        tarefas = resolver_fontes(tarefas) if resolver_ids else ((n, linha, None) for n, linha in tarefas)
+        tarefas = precarregar_pubmed(tarefas) if pesquisa else ((*t, None) for t in tarefas)
+        for numero, linha, artigos_fonte, artigos_tema in tarefas:
+            tarefa = (numero, linha, tipo_padrao, pesquisa, validar_esquema, artigos_fonte, artigos_tema, saidas)
+            try:
+                futuro = executor.submit(processar_entrada, tarefa)
+            except BrokenProcessPool:
+                # As linhas em curso no pool partido falham em escrever(); as seguintes vão para um pool novo
+                executor.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=workers)
+                futuro = executor.submit(processar_entrada, tarefa)
+            pendentes[futuro] = (numero, linha.get('tipo') or tipo_padrao)
+            if len(pendentes) >= max_pendentes:
+                escrever(wait(pendentes, return_when=FIRST_COMPLETED).done)
+        escrever(wait(pendentes).done)
+    finally:
+        executor.shutdown()
+
+    _progresso(processadas, erros, inicio, final=True)
+    return {'processadas': processadas, 'erros': erros, 'envios': envios,
+            'duracao_s': time.monotonic() - inicio}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Geração em lote de infográficos e roteiros de vídeo")
+    parser.add_argument('entrada', type=Path, help="ficheiro CSV ou JSONL")
+    parser.add_argument('-o', '--output', default='-',
+                        help="ficheiro JSONL de saída, .jsonl.gz para comprimir (padrão: stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('-t', '--tipo', choices=TIPOS, default='infografico',
+                        help="tipo usado quando a linha não tem coluna 'tipo'")
+    parser.add_argument('--pesquisa', action='store_true',
+                        help="enriquecer com PubMed/NewsAPI/Perplexity (keys via NEWSAPI_KEY, PERPLEXITY_API_KEY)")
+    parser.add_argument('--resolver-ids', action='store_true',
+                        help="resolver em lote no PubMed os PMIDs/DOIs citados nas fontes")
+    parser.add_argument('--validar', action='store_true',
+                        help="validar cada documento contra o esquema (utils/schemas.py)")
+    parser.add_argument('--audio', type=Path, help="pasta onde gravar a narração (WAV) de cada roteiro de vídeo")
+    parser.add_argument('--tts', choices=('gtts', 'offline'),
+                        help="backend TTS da narração (padrão: SIA_TTS_BACKEND ou o primeiro disponível)")
+    parser.add_argument('--imagens', type=Path, help="pasta onde gravar a imagem de cada infográfico")
+    parser.add_argument('--formato-imagem', choices=('png', 'webp'), default='png')
+    parser.add_argument('--historico', action='store_true',
+                        help="reutilizar documentos já gerados e guardar os novos no histórico da app")
+    parser.add_argument('--webhook', help="URL de um webhook Make.com/Activepieces para onde enviar os documentos")
+    parser.add_argument('--webhook-lote', type=int, default=20,
+                        help="documentos por POST (o corpo é uma lista JSON quando > 1)")
+    parser.add_argument('--webhook-timeout', type=float, default=600,
+                        help="segundos a aguardar pelos envios no fim")
+    args = parser.parse_args(argv)
+
+    destino = None
+    if args.webhook:
+        destino = 'batch'
+        webhook_queue.configurar_destino(destino, args.webhook, tamanho_lote=args.webhook_lote)
+
+    saidas = {}
+    if args.audio:
+        saidas['audio'] = (args.audio, args.tts)
+    if args.imagens:
+        saidas['imagens'] = (args.imagens, args.formato_imagem)
+    if args.historico:
+        saidas['historico'] = True
+
+    with serializer.abrir_jsonl(args.output) as saida:
+        resumo = executar(args.entrada, saida, args.workers, args.tipo, args.pesquisa,
+                          validar_esquema=args.validar, webhook=destino, resolver_ids=args.resolver_ids,
+                          saidas=saidas)
+
+    sys.stderr.write(
+        f"Concluído: {resumo['processadas']} linhas, {resumo['erros']} erros em {resumo['duracao_s']:.1f}s\n"
+    )
+    falhados = 0
+    if resumo['envios']:
+        sys.stderr.write(f"A aguardar {len(resumo['envios'])} envios para o webhook...\n")
+        terminado = webhook_queue.esperar(resumo['envios'], args.webhook_timeout)
+        estados = [(webhook_queue.estado(i) or {}).get('estado') for i in resumo['envios']]
+        falhados = estados.count('falhado')
+        sys.stderr.write(
+            f"Webhook: {estados.count('enviado')} enviados, {falhados} falhados"
+            f"{'' if terminado else ' (timeout: os restantes continuam na fila)'}\n"
+        )
+    return 1 if resumo['erros'] or falhados else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
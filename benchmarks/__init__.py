@@ -0,0 +1,15 @@
+"""Benchmarks de Sports Injury AI Studio (python -m benchmarks.<nome>)
+
+As caches e os logs dos benchmarks vão para um diretório temporário, para não
+misturar com os da app; SIA_CACHE_DIR / SIA_LOG_DIR definidos no ambiente têm
+precedência.
+"""
+
+import os
+import tempfile
+
+_TEMP = os.path.join(tempfile.gettempdir(), 'sia-benchmarks')
+os.environ.setdefault('SIA_CACHE_DIR', os.path.join(_TEMP, 'cache'))
+os.environ.setdefault('SIA_LOG_DIR', os.path.join(_TEMP, 'logs'))
+os.environ.setdefault('SIA_LOG_LEVEL', 'ERROR')
+os.makedirs(os.environ['SIA_LOG_DIR'], exist_ok=True)
@@ -0,0 +1,67 @@
+"""Suite de benchmarks de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Corre os microbenchmarks (bench_hotpaths), o arranque a frio e o custo por
+rerun da app (bench_startup), o teste de carga (loadtest) e os cenários de
+falhas injetadas (bench_resiliencia), grava os
+resultados em JSON e, com --comparar, compara com uma execução anterior:
+termina com código 1 se alguma métrica piorar mais do que a tolerância.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks                                  # benchmarks/resultados/<data>.json
+    python -m benchmarks -o atual.json --comparar base.json --tolerancia 0.15
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from . import bench_hotpaths, bench_resiliencia, bench_startup, loadtest
+from .resultados import carregar, comparar, guardar
+
+DIR_RESULTADOS = Path(__file__).resolve().parent / 'resultados'
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Suite de benchmarks")
+    parser.add_argument("-o", "--output", help="Ficheiro JSON de resultados")
+    parser.add_argument("--comparar", help="Resultados anteriores (JSON) para detetar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Piora relativa aceite antes de contar como regressão")
+    parser.add_argument("--rapido", action="store_true", help="Menos iterações e pedidos")
+    parser.add_argument("--sem-carga", action="store_true", help="Não correr o teste de carga nem os cenários de falhas")
+    args = parser.parse_args()
+
+    print("== Microbenchmarks ==")
+    resultados = bench_hotpaths.executar(1 if args.rapido else 5)
+    bench_hotpaths.imprimir(resultados)
+    print("\n== Arranque e rerun ==")
+    arranque = bench_startup.executar(5 if args.rapido else 20)
+    bench_startup.imprimir(arranque)
+    resultados.update(arranque)
+    if not args.sem_carga:
+        print("\n== Teste de carga (stubs locais) ==")
+        carga = loadtest.executar(pedidos=50 if args.rapido else 200)
+        loadtest.imprimir(carga)
+        resultados.update(carga)
+        print("\n== Disjuntores e hedging (falhas injetadas) ==")
+        resiliencia = bench_resiliencia.executar(pedidos=100 if args.rapido else 300)
+        bench_resiliencia.imprimir(resiliencia)
+        resultados.update(resiliencia)
+
+    output = args.output or DIR_RESULTADOS / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    print(f"\nResultados em {guardar(resultados, output)}")
+
+    if args.comparar:
+        regressoes = comparar(carregar(args.comparar), carregar(output), args.tolerancia)
+        for r in regressoes:
+            print(f"REGRESSÃO {r['nome']}: {r['metrica']} {r['antes']:.2f} -> {r['depois']:.2f} "
+                  f"({r['variacao']:+.0%})")
+        if regressoes:
+            sys.exit(1)
+        print(f"Sem regressões acima de {args.tolerancia:.0%} face a {args.comparar}")
+
+
+if __name__ == "__main__":
+    main()
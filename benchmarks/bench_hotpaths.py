@@ -0,0 +1,294 @@
+"""Microbenchmarks dos caminhos quentes de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Mede, por operação:
+- gerar_estrutura_infografico / gerar_roteiro_video (com e sem pesquisa)
+- extrair_tipo_fonte / validar_pubmed_id sobre entradas típicas e
+  classificar_lote sobre 5000 fontes
+- RateLimiter.check_limit com N threads em contenção (SQLite em memória e em
+  ficheiro)
+- exportação JSON (download legível e JSONL compacto) face ao json da stdlib
+- narração de um roteiro de 90 s com o backend offline: sem cache (síntese
+  das cenas em paralelo + montagem) e com todos os clips em cache (só montagem)
+- rasterização de um infográfico: imagem completa e miniatura desenhadas e
+  codificadas em PNG, e a miniatura lida da cache
+- perguntas semelhantes: procura MinHash/LSH num índice de 5000 perguntas
+  (pergunta reformulada e pergunta sem semelhante)
+- streaming de vídeo local: pedido Range de um bloco numa posição aleatória e
+  ficheiro de 32 MB inteiro
+- histórico com 20000 gerações: geração repetida servida do histórico,
+  primeira página, página seguinte (cursor) com filtro e pesquisa por texto
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_hotpaths [--rapido] [-o resultados.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from utils import generators, identificadores
+from utils.audio import Narrador
+from utils.historico import Historico
+from utils.semelhantes import IndiceSemelhantes
+from utils.rasterizador import LARGURA_MINIATURA, Rasterizador, codificar, desenhar
+from utils.knowledge_base import knowledge_base
+from utils.rate_limiter import RateLimiter
+from utils.serializer import Serializer
+from utils.videos import BLOCO, ServidorVideos
+
+from .bench_serializer import PESQUISA, documentos
+from .resultados import guardar, medir
+
+# Entradas do campo "fonte" representativas do que os utilizadores colam
+FONTES = (
+    '38123456',
+    'PMID: 37012345',
+    'https://pubmed.ncbi.nlm.nih.gov/38123456/',
+    'https://www.bjsm.bmj.com/content/58/1/12',
+    'doi:10.1136/bjsports-2023-107456',
+    '10.1016/j.jsams.2024.01.003',
+    'Entorse do tornozelo grau II em futebolista',
+    'Rutura do ligamento cruzado anterior - revisão 2024',
+    '',
+)
+
+
+def bench_geradores(escala: int) -> dict:
+    temas = itertools.cycle(knowledge_base.nomes() + ['Lesão sem correspondência'])
+    resultados = {}
+    for pesquisa, sufixo in ((None, ''), (PESQUISA, '.pesquisa')):
+        def infografico():
+            tema = next(temas)
+            generators.gerar_estrutura_infografico(tema, tema, 'Fisioterapeuta', 'Português', 'Detalhado',
+                                                   pesquisa=pesquisa)
+
+        def roteiro():
+            tema = next(temas)
+            generators.gerar_roteiro_video(tema, tema, 'Atleta', 'Português', 90, 'Explicativo',
+                                           pesquisa=pesquisa)
+
+        resultados[f'geradores.infografico{sufixo}'] = medir(infografico, 2000 * escala)
+        resultados[f'geradores.roteiro{sufixo}'] = medir(roteiro, 2000 * escala)
+    return resultados
+
+
+def bench_fontes(escala: int) -> dict:
+    def tipos():
+        for fonte in FONTES:
+            generators.extrair_tipo_fonte(fonte)
+
+    def pmids():
+        for fonte in FONTES:
+            generators.validar_pubmed_id(fonte)
+
+    # Lote como no batch: textos distintos (um número de linha em cada)
+    lote = [f'{fonte} #{i}' for i, fonte in zip(range(5000), itertools.cycle(FONTES))]
+
+    def classificar():
+        identificadores.classificar_lote(lote)
+
+    resultados = {}
+    for nome, func, por_chamada in (('fontes.extrair_tipo_fonte', tipos, len(FONTES)),
+                                    ('fontes.validar_pubmed_id', pmids, len(FONTES)),
+                                    ('fontes.classificar_lote', classificar, len(lote))):
+        r = medir(func, max(1, 5000 * escala // por_chamada) if por_chamada > len(FONTES) else 5000 * escala)
+        # Por entrada, não por chamada
+        for campo in ('min_us', 'mediana_us', 'max_us'):
+            r[campo] /= por_chamada
+        r['ops_s'] *= por_chamada
+        resultados[nome] = r
+    return resultados
+
+
+def _contencao(limiter: RateLimiter, threads: int, chamadas: int, repeticoes: int) -> dict:
+    """µs por check_limit com 'threads' threads a chamar em simultâneo"""
+    tempos = []
+    for _ in range(repeticoes):
+        barreira = threading.Barrier(threads + 1)
+
+        def trabalhador():
+            barreira.wait()
+            for _ in range(chamadas):
+                limiter.check_limit('pubmed')
+
+        grupo = [threading.Thread(target=trabalhador) for _ in range(threads)]
+        for t in grupo:
+            t.start()
+        barreira.wait()
+        inicio = time.perf_counter()
+        for t in grupo:
+            t.join()
+        tempos.append((time.perf_counter() - inicio) / (threads * chamadas) * 1e6)
+    return {
+        'numero': threads * chamadas, 'repeticoes': repeticoes, 'threads': threads,
+        'min_us': min(tempos), 'mediana_us': statistics.median(tempos), 'max_us': max(tempos),
+        'ops_s': 1e6 / min(tempos), 'metrica': 'mediana_us',
+    }
+
+
+def bench_rate_limiter(escala: int, threads=(1, 8)) -> dict:
+    # Limite inatingível: mede o custo da verificação, não as rejeições
+    limites = {'pubmed': {'calls': 10 ** 9, 'period': 1, 'wait': 0}}
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for armazenamento, path in (('memoria', ':memory:'), ('ficheiro', Path(tmp) / 'rl.db')):
+            limiter = RateLimiter(path, limits=limites)
+            for n in threads:
+                resultados[f'rate_limiter.{armazenamento}.{n}t'] = _contencao(
+                    limiter, n, 500 * escala // n, repeticoes=3)
+            if limiter._conn is not None:
+                limiter._conn.close()
+    return resultados
+
+
+def bench_exportacao(escala: int) -> dict:
+    docs = [doc for _, doc in documentos(200)]
+    rapido, stdlib = Serializer(), Serializer('json')
+    casos = {
+        'exportacao.json_stdlib.legivel': lambda d: json.dumps(d, indent=2, ensure_ascii=False),
+        'exportacao.legivel': lambda d: rapido.dumps(d, pretty=True),
+        'exportacao.compacto': rapido.dumps,
+        'exportacao.stdlib.compacto': stdlib.dumps,
+    }
+    resultados = {}
+    for nome, func in casos.items():
+        ciclo = itertools.cycle(docs)
+        resultados[nome] = medir(lambda: func(next(ciclo)), 2000 * escala)
+        resultados[nome]['backend'] = stdlib.nome if 'stdlib' in nome else rapido.nome
+    return resultados
+
+
+def bench_audio(escala: int) -> dict:
+    roteiro = generators.gerar_roteiro_video('Entorse do tornozelo', 'Entorse do tornozelo', 'Atleta',
+                                             'Português', 90, 'Explicativo')
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        destino = Path(tmp) / 'narracao.wav'
+        caches = (Path(tmp) / f'frio-{i}' for i in itertools.count())
+        resultados['audio.narracao.sem_cache'] = medir(
+            lambda: Narrador('offline', next(caches)).renderizar(roteiro, destino), 10 * escala)
+        quente = Narrador('offline', Path(tmp) / 'quente')
+        resultados['audio.narracao.em_cache'] = medir(lambda: quente.renderizar(roteiro, destino), 20 * escala)
+    return resultados
+
+
+def bench_infografico(escala: int) -> dict:
+    estrutura = generators.gerar_estrutura_infografico('Entorse do tornozelo', 'Entorse do tornozelo', 'Atleta',
+                                                        'Português', 'Detalhado')
+    resultados = {
+        'infografico.png': medir(lambda: codificar(desenhar(estrutura), 'png'), 5 * escala),
+        'infografico.miniatura': medir(lambda: codificar(desenhar(estrutura, LARGURA_MINIATURA), 'png'),
+                                       10 * escala),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        rasterizador = Rasterizador(tmp)
+        resultados['infografico.miniatura.em_cache'] = medir(lambda: rasterizador.miniatura(estrutura),
+                                                             200 * escala)
+    return resultados
+
+
+def bench_semelhantes(escala: int) -> dict:
+    aspetos = ('tratamento', 'prevenção', 'reabilitação', 'diagnóstico', 'retorno ao desporto', 'cirurgia',
+               'exercícios', 'fisioterapia', 'imagiologia', 'prognóstico')
+    populacoes = ('futebolistas', 'corredores', 'basquetebolistas', 'atletas jovens', 'atletas veteranos',
+                  'ginastas', 'tenistas', 'nadadores', 'ciclistas', 'andebolistas')
+    combinacoes = list(zip(range(5000), itertools.cycle(itertools.product(aspetos, knowledge_base.nomes(),
+                                                                          populacoes))))
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        indice = IndiceSemelhantes(Path(tmp) / 'semelhantes.db', max_entradas=5000)
+        for i, (aspeto, lesao, populacao) in combinacoes:
+            indice.adicionar(f"Qual a evidência sobre {aspeto} de {lesao} em {populacao} (estudo {i})?", str(i))
+        reformuladas = itertools.cycle([f"{aspeto} {lesao} {populacao} estudo {i}"
+                                        for i, (aspeto, lesao, populacao) in combinacoes])
+        resultados['semelhantes.procurar.reformulada'] = medir(lambda: indice.procurar(next(reformuladas)),
+                                                               2000 * escala)
+        resultados['semelhantes.procurar.sem_semelhante'] = medir(
+            lambda: indice.procurar("Qual o protocolo de carga para tendinopatia de Aquiles em maratonistas?"),
+            2000 * escala)
+    return resultados
+
+
+def bench_video(escala: int) -> dict:
+    import requests
+
+    resultados = {}
+    aleatorio = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'video.mp4'
+        with open(path, 'wb') as f:
+            f.write(os.urandom(32 * 1024 * 1024))
+        servidor = ServidorVideos(cache_dir=Path(tmp) / 'cache')
+        url = servidor.registar(str(path))
+        with requests.Session() as sessao:
+            def seek():
+                inicio = aleatorio.randrange(32 * 1024 * 1024 - BLOCO)
+                sessao.get(url, headers={'Range': f'bytes={inicio}-{inicio + BLOCO - 1}'}).content
+            resultados['video.seek_256k'] = medir(seek, 50 * escala)
+            resultados['video.ficheiro_32mb'] = medir(lambda: sessao.get(url).content, 2 * escala)
+        servidor.parar()
+    return resultados
+
+
+def bench_historico(escala: int) -> dict:
+    lesoes = ('Entorse do tornozelo', 'Rotura do LCA', 'Tendinopatia patelar', 'Lesão dos isquiotibiais')
+    publicos = ('Atleta', 'Fisioterapeuta', 'Treinador')
+    combinacoes = [(lesao, publico) for lesao in lesoes for publico in publicos]
+    docs = [generators.gerar_estrutura_infografico(lesao, lesao, publico, 'Português', 'Standard')
+            for lesao, publico in combinacoes]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        historico = Historico(Path(tmp) / 'historico.db')
+        for i in range(20000):
+            lesao, publico = combinacoes[i % len(docs)]
+            historico.guardar('infografico', {'fonte': f'{i}', 'tema': f'{lesao} {i}', 'publico': publico,
+                                              'idioma': 'Português'}, docs[i % len(docs)])
+        entradas = {'fonte': '0', 'tema': f"{lesoes[0]} 0", 'publico': publicos[0], 'idioma': 'Português'}
+        lesao = historico.valores('lesao')[0]
+        _, cursor = historico.listar(lesao=lesao)
+        resultados['historico.obter'] = medir(lambda: historico.obter('infografico', entradas), 500 * escala)
+        resultados['historico.pagina'] = medir(lambda: historico.listar(), 500 * escala)
+        resultados['historico.pagina.filtro_cursor'] = medir(
+            lambda: historico.listar(cursor=cursor, lesao=lesao), 500 * escala)
+        resultados['historico.pagina.texto'] = medir(lambda: historico.listar(texto='tendinopatia'), 100 * escala)
+    return resultados
+
+
+def executar(escala: int = 1) -> dict:
+    """Todos os microbenchmarks; escala multiplica o número de iterações"""
+    resultados = {}
+    for bench in (bench_geradores, bench_fontes, bench_rate_limiter, bench_exportacao, bench_audio,
+                  bench_infografico, bench_semelhantes, bench_video, bench_historico):
+        resultados.update(bench(escala))
+    return resultados
+
+
+def imprimir(resultados: dict):
+    print(f"{'benchmark':<38} {'mediana µs':>11} {'min µs':>9} {'ops/s':>12}")
+    for nome, r in resultados.items():
+        print(f"{nome:<38} {r['mediana_us']:>11.2f} {r['min_us']:>9.2f} {r['ops_s']:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks dos caminhos quentes")
+    parser.add_argument("--escala", type=int, default=5, help="Multiplicador do número de iterações")
+    parser.add_argument("--rapido", action="store_true", help="Escala 1 (verificação rápida)")
+    parser.add_argument("-o", "--output", help="Ficheiro JSON de resultados")
+    args = parser.parse_args()
+
+    resultados = executar(1 if args.rapido else args.escala)
+    imprimir(resultados)
+    if args.output:
+        print(f"\nResultados em {guardar(resultados, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
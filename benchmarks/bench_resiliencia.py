@@ -0,0 +1,160 @@
+"""Disjuntores e hedging de Sports Injury AI Studio contra stubs locais com falhas injetadas
+Criado: 17 Outubro 2026
+
+- hedging: NewsAPI com uma cauda lenta (uma fração dos pedidos demora muito
+  mais); latências p50/p95/p99 de buscar_noticias sem e com hedging, e
+  repetições enviadas/ganhas
+- disjuntor: PubMed a devolver só erros lentos; latência das chamadas até o
+  disjuntor abrir e com ele aberto (falha rápida), último valor servido da
+  cache para uma consulta já feita e fecho depois de a fonte recuperar
+
+Como no teste de carga, cada chamada usa uma consulta única e os limites do
+rate limiter são levantados.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_resiliencia [-n 300] [--cauda 0.05] [-o resultados.json]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import sources
+from utils.disjuntores import CircuitoAberto, disjuntores
+from utils.disk_cache import disk_cache
+from utils.http_client import http_client
+from utils.rate_limiter import rate_limiter
+
+from .resultados import guardar, percentis
+from .stubs import SERVICOS, StubServer
+
+
+def _latencias(chamar, consultas, concorrencia: int) -> tuple:
+    """(latências em s, erros) de chamar(consulta) para cada consulta"""
+    def medir(consulta):
+        inicio = time.perf_counter()
+        try:
+            chamar(consulta)
+            erro = False
+        except Exception:
+            erro = True
+        return time.perf_counter() - inicio, erro
+
+    with ThreadPoolExecutor(concorrencia, thread_name_prefix='resiliencia') as executor:
+        medidas = list(executor.map(medir, consultas))
+    return [t for t, _ in medidas], sum(erro for _, erro in medidas)
+
+
+def bench_hedging(stub: StubServer, prefixo: str, pedidos: int, concorrencia: int, cauda: float,
+                  latencia_cauda: float) -> dict:
+    stub.configurar('newsapi', latencia=0.01, jitter=0.005, cauda=cauda, latencia_cauda=latencia_cauda)
+    resultados = {}
+    for hedge in (False, True):
+        http_client.configure('newsapi', hedge=hedge)
+        antes = dict(http_client.get_stats().get('newsapi', {'hedges': 0, 'ganhos': 0}))
+        consultas = [f'{prefixo} hedge={hedge} {i}' for i in range(pedidos)]
+        latencias, erros = _latencias(lambda c: sources.buscar_noticias(c, 'stub'), consultas, concorrencia)
+        depois = http_client.get_stats().get('newsapi', {'hedges': 0, 'ganhos': 0})
+        hedges = depois['hedges'] - antes['hedges']
+        ganhos = depois['ganhos'] - antes['ganhos']
+        resultados[f"resiliencia.hedging_{'com' if hedge else 'sem'}"] = {
+            'pedidos': pedidos, 'erros': erros, **percentis(latencias),
+            'hedges': hedges, 'ganhos': ganhos, 'win_rate': ganhos / hedges if hedges else 0.0,
+            'metrica': 'p99_ms',
+        }
+    return resultados
+
+
+def bench_disjuntor(stub: StubServer, prefixo: str, latencia_erro: float = 0.2, pausa: float = 1.0) -> dict:
+    disjuntores.configurar('pubmed', pausa_s=pausa)
+    http_client.configure('pubmed', retries=0, hedge=False)
+    conhecida = f'{prefixo} conhecida'
+    guardado = sources.buscar_pubmed(conhecida)
+
+    # Fonte degradada: erros lentos; a entrada guardada passa a estar fora da janela stale
+    stub.configurar('pubmed', latencia=latencia_erro, taxa_erro=1.0, status_erro=503)
+    politicas = dict(disk_cache.politicas)
+    disk_cache.politicas['pubmed'] = {'ttl': 0, 'stale': 0}
+    disjuntor = disjuntores.get('pubmed')
+    try:
+        antes, i = [], 0
+        while disjuntor.estado != 'aberto' and i < 50:
+            antes += _latencias(sources.buscar_pubmed, [f'{prefixo} degradada {i}'], 1)[0]
+            i += 1
+        aberto, _ = _latencias(sources.buscar_pubmed, [f'{prefixo} aberta {i}' for i in range(50)], 1)
+        try:
+            servido = sources.buscar_pubmed(conhecida) == guardado
+        except CircuitoAberto:
+            servido = False
+
+        # Recuperação: depois da pausa, o pedido de teste fecha o disjuntor
+        stub.configurar('pubmed', latencia=0.0, taxa_erro=0.0)
+        time.sleep(pausa)
+        sources.buscar_pubmed(f'{prefixo} recuperada')
+        estado_final = disjuntor.estado
+    finally:
+        disk_cache.politicas = politicas
+    return {
+        'resiliencia.disjuntor_antes_de_abrir': {'pedidos': len(antes), **percentis(antes), 'metrica': 'p50_ms'},
+        'resiliencia.disjuntor_aberto': {
+            'pedidos': len(aberto), **percentis(aberto), 'ultimo_valor_servido': servido,
+            'estado_final': estado_final, 'metrica': 'p95_ms',
+        },
+    }
+
+
+def executar(pedidos: int = 300, concorrencia: int = 4, cauda: float = 0.05, latencia_cauda: float = 0.3,
+             seed: int = 42) -> dict:
+    """Cenários de hedging e do disjuntor; resultados por 'resiliencia.<cenario>'"""
+    limites = rate_limiter.limits
+    endpoints = {s: dict(http_client.endpoints[s]) for s in SERVICOS}
+    politicas = {fonte: dict(p) for fonte, p in disjuntores.politicas.items()}
+    rate_limiter.limits = {}
+    disjuntores.repor()
+    prefixo = f'resiliencia-{time.time_ns()}'
+    resultados = {}
+    try:
+        with StubServer(seed=seed) as stub:
+            stub.apontar(http_client)
+            resultados.update(bench_hedging(stub, prefixo, pedidos, concorrencia, cauda, latencia_cauda))
+            resultados.update(bench_disjuntor(stub, prefixo))
+    finally:
+        rate_limiter.limits = limites
+        for servico, config in endpoints.items():
+            http_client.configure(servico, **config)
+        disjuntores.politicas = politicas
+        disjuntores.repor()
+    return resultados
+
+
+def imprimir(resultados: dict):
+    print(f"{'cenário':<40} {'pedidos':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  detalhe")
+    for nome, r in resultados.items():
+        if 'hedges' in r:
+            detalhe = f"hedges {r['hedges']} · ganhos {r['ganhos']} ({r['win_rate']:.0%})"
+        elif 'estado_final' in r:
+            detalhe = (f"último valor servido: {'sim' if r['ultimo_valor_servido'] else 'não'} · "
+                       f"depois da recuperação: {r['estado_final']}")
+        else:
+            detalhe = ''
+        print(f"{nome:<40} {r['pedidos']:>7} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}  {detalhe}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Disjuntores e hedging contra stubs com falhas injetadas")
+    parser.add_argument("-n", "--pedidos", type=int, default=300, help="Chamadas por cenário de hedging")
+    parser.add_argument("-c", "--concorrencia", type=int, default=4, help="Chamadas em simultâneo")
+    parser.add_argument("--cauda", type=float, default=0.05, help="Fração de pedidos lentos da NewsAPI")
+    parser.add_argument("--latencia-cauda", type=float, default=0.3, help="Latência extra dos pedidos lentos (s)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente da latência/erros do stub")
+    parser.add_argument("-o", "--output", help="Ficheiro JSON de resultados")
+    args = parser.parse_args()
+
+    resultados = executar(args.pedidos, args.concorrencia, args.cauda, args.latencia_cauda, args.seed)
+    imprimir(resultados)
+    if args.output:
+        print(f"\nResultados em {guardar(resultados, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
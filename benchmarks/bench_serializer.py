@@ -0,0 +1,106 @@
+"""Benchmark de serialização para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Compara os backends disponíveis (json, orjson, msgspec) nos modos compacto e
+legível: tempo para serializar N documentos gerados e tamanho médio do
+payload. Mede também o tamanho de um pacote JSONL com e sem gzip e o custo da
+validação por esquema.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_serializer -n 20000
+"""
+
+import argparse
+import gzip
+import itertools
+import time
+
+from utils import generators
+from utils.knowledge_base import knowledge_base
+from utils.schemas import validar
+from utils.serializer import BACKENDS, GZIP_NIVEL, Serializer
+
+# Pacote de pesquisa típico (3 artigos, 2 notícias, resumo Perplexity)
+PESQUISA = {
+    'pubmed': [{
+        'pmid': str(38000000 + i), 'title': f'Ankle sprain rehabilitation outcomes in athletes ({i})',
+        'authors': 'Silva J, Costa M, Pereira A', 'journal': 'Br J Sports Med', 'pubdate': '2024 Mar',
+        'url': f'https://pubmed.ncbi.nlm.nih.gov/{38000000 + i}/'
+    } for i in range(3)],
+    'newsapi': [{
+        'title': f'Lesões no futebol: o que diz a ciência ({i})', 'description': 'Resumo da notícia. ' * 6,
+        'url': f'https://example.com/noticia/{i}', 'source': 'Exemplo', 'publishedAt': '2026-10-01T10:00:00Z'
+    } for i in range(2)],
+    'perplexity': 'Resumo da evidência científica sobre a lesão, com diagnóstico e tratamento. ' * 8,
+    'pendentes': [], 'erros': {},
+}
+
+
+def documentos(n: int) -> list:
+    """N documentos (metade infográficos, metade roteiros; 1 em 4 com pesquisa)"""
+    temas = itertools.cycle(knowledge_base.nomes())
+    resultado = []
+    for i in range(n):
+        tema = next(temas)
+        pesquisa = PESQUISA if i % 4 == 0 else None
+        if i % 2:
+            resultado.append(('video', generators.gerar_roteiro_video(
+                tema, tema, 'Atleta', 'Português', 90, 'Explicativo', pesquisa=pesquisa)))
+        else:
+            resultado.append(('infografico', generators.gerar_estrutura_infografico(
+                tema, tema, 'Fisioterapeuta', 'Português', 'Detalhado', pesquisa=pesquisa)))
+    return resultado
+
+
+def medir(serializer: Serializer, docs: list, pretty: bool, repeticoes: int) -> tuple:
+    """(melhor tempo em segundos, bytes totais)"""
+    dumps = serializer.dumps
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        total = sum(len(dumps(doc, pretty)) for _, doc in docs)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de serialização")
+    parser.add_argument("-n", type=int, default=20_000, help="Documentos a serializar")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Melhor de N medições")
+    args = parser.parse_args()
+
+    docs = documentos(args.n)
+    # json primeiro: é a referência (o json.dumps(indent=2) usado antes)
+    ordem = ['json'] + [nome for nome in BACKENDS if nome != 'json']
+    backends = [s for nome, s in ((nome, Serializer(nome)) for nome in ordem) if s.nome == nome]
+
+    print(f"{args.n} documentos | backends disponíveis: {', '.join(s.nome for s in backends)}")
+    print(f"{'backend':>8} {'modo':>9} {'tempo (s)':>10} {'µs/doc':>8} {'bytes/doc':>10}")
+    referencia = None
+    for serializer in backends:
+        for pretty in (True, False):
+            tempo, total = medir(serializer, docs, pretty, args.repeticoes)
+            referencia = referencia or tempo
+            modo = 'legivel' if pretty else 'compacto'
+            print(f"{serializer.nome:>8} {modo:>9} {tempo:>10.3f} {tempo / args.n * 1e6:>8.2f} "
+                  f"{total / args.n:>10.0f}  ({referencia / tempo:.1f}x vs json legível)")
+
+    rapido = backends[-1]
+    legivel = b''.join(rapido.dumps(doc, True) + b'\n' for _, doc in docs)
+    jsonl = b''.join(rapido.dumps(doc) + b'\n' for _, doc in docs)
+    inicio = time.perf_counter()
+    comprimido = gzip.compress(jsonl, compresslevel=GZIP_NIVEL)
+    tempo_gzip = time.perf_counter() - inicio
+    print(f"\nPacote: legível {len(legivel) / 1e6:.1f} MB | JSONL {len(jsonl) / 1e6:.1f} MB | "
+          f"JSONL.gz {len(comprimido) / 1e6:.2f} MB ({len(legivel) / len(comprimido):.0f}x menor, "
+          f"gzip {tempo_gzip:.2f}s)")
+
+    inicio = time.perf_counter()
+    for tipo, doc in docs:
+        validar(tipo, doc)
+    tempo = time.perf_counter() - inicio
+    print(f"Validação por esquema: {tempo / args.n * 1e6:.1f} µs/doc")
+
+
+if __name__ == "__main__":
+    main()
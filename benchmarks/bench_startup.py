@@ -0,0 +1,145 @@
+"""Benchmark de arranque de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+- Arranque a frio: tempo cumulativo de importação (python -X importtime)
+  dos módulos do núcleo e dos que app.py importa, num processo novo de cada
+  vez. O Streamlit fica de fora (custo fixo, igual em todas as versões).
+- Rerun: tempo de execução do script app.py em reruns sucessivos, medido
+  dentro da thread do script (streamlit.testing.AppTest): é o que cada
+  interação com um widget paga.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_startup [-n 10] [-o resultados.json]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from functools import lru_cache
+
+from .resultados import RAIZ, guardar
+
+# Nome -> módulos importados (app: os módulos utils que app.py importa)
+ALVOS = {
+    'geradores': ['utils.generators'],
+    'fontes': ['utils.sources'],
+    'app': ['utils.logger', 'utils.rate_limiter', 'utils.sources', 'utils.article_index',
+            'utils.research', 'utils.generators', 'utils.metrics', 'utils.serializer',
+            'utils.webhook_queue'],
+}
+
+
+def _importtime(modulos: list) -> tuple:
+    """(µs cumulativos das importações de topo, ms de parede do processo)"""
+    codigo = '; '.join(f'import {m}' for m in modulos)
+    inicio = time.perf_counter()
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo], cwd=RAIZ,
+                              capture_output=True, text=True, check=True)
+    parede = (time.perf_counter() - inicio) * 1000
+    total = 0
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|')
+        # Só os módulos de topo (sem indentação): o cumulativo já inclui os filhos
+        if not nome.startswith('  ') and nome.strip() not in ('site', 'encodings'):
+            total += int(cumulativo)
+    return total, parede
+
+
+def bench_importacao(repeticoes: int) -> dict:
+    resultados = {}
+    for nome, modulos in ALVOS.items():
+        medidas = [_importtime(modulos) for _ in range(repeticoes)]
+        tempos = [us for us, _ in medidas]
+        resultados[f'arranque.importacao.{nome}'] = {
+            'modulos': modulos,
+            'repeticoes': repeticoes,
+            'min_us': min(tempos),
+            'mediana_us': statistics.median(tempos),
+            'max_us': max(tempos),
+            'processo_ms': statistics.median(ms for _, ms in medidas),
+            'metrica': 'mediana_us',
+        }
+    return resultados
+
+
+# Tempos de execução de app.py medidos dentro da thread do script
+TEMPOS_RERUN = []
+
+_SCRIPT_RERUN = """
+import time
+
+from benchmarks.bench_startup import TEMPOS_RERUN, executar_app
+
+inicio = time.perf_counter()
+executar_app()
+TEMPOS_RERUN.append(time.perf_counter() - inicio)
+"""
+
+
+@lru_cache(maxsize=1)
+def _codigo_app():
+    # Como o Streamlit, compila o script uma vez e reutiliza o bytecode nos reruns
+    app = RAIZ / 'app.py'
+    return compile(app.read_text(encoding='utf-8'), str(app), 'exec')
+
+
+def executar_app():
+    exec(_codigo_app(), {'__name__': '__main__', '__file__': str(RAIZ / 'app.py')})
+
+
+def bench_rerun(repeticoes: int) -> dict:
+    """Tempo do script app.py por rerun (sem a espera por mensagens do AppTest)"""
+    from streamlit.testing.v1 import AppTest
+
+    # Com python -m este módulo é __main__: a lista partilhada é a do módulo importado
+    from benchmarks.bench_startup import TEMPOS_RERUN as medidos
+
+    app = AppTest.from_string(_SCRIPT_RERUN, default_timeout=60)
+    medidos.clear()
+    for _ in range(repeticoes + 1):
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"app.py falhou: {app.exception[0].message}")
+    primeira, tempos = medidos[0] * 1e6, [t * 1e6 for t in medidos[1:]]
+    return {
+        'arranque.rerun': {
+            'repeticoes': repeticoes,
+            'primeira_us': primeira,
+            'min_us': min(tempos),
+            'mediana_us': statistics.median(tempos),
+            'max_us': max(tempos),
+            'metrica': 'mediana_us',
+        }
+    }
+
+
+def executar(repeticoes: int = 10) -> dict:
+    resultados = bench_importacao(max(3, repeticoes // 2))
+    resultados.update(bench_rerun(repeticoes))
+    return resultados
+
+
+def imprimir(resultados: dict):
+    print(f"{'benchmark':<38} {'mediana ms':>11} {'min ms':>9}")
+    for nome, r in resultados.items():
+        print(f"{nome:<38} {r['mediana_us'] / 1000:>11.1f} {r['min_us'] / 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque a frio e custo por rerun da app")
+    parser.add_argument("-n", type=int, default=10, help="Repetições")
+    parser.add_argument("-o", "--output", help="Ficheiro JSON de resultados")
+    args = parser.parse_args()
+
+    resultados = executar(args.n)
+    imprimir(resultados)
+    if args.output:
+        print(f"\nResultados em {guardar(resultados, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
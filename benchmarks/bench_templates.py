@@ -0,0 +1,91 @@
+"""Micro-benchmark do motor de templates para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Gera N estruturas (infográficos e roteiros) com os construtores de referência
+e com os protótipos compilados, percorrendo combinações de tema, público,
+idioma, nível de detalhe, duração e tom. Antes de medir, confirma que ambos
+produzem o mesmo JSON em português.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_templates -n 100000
+"""
+
+import argparse
+import itertools
+import json
+import time
+
+from benchmarks import referencia_geradores as referencia
+from utils import generators
+from utils.knowledge_base import knowledge_base
+
+PUBLICOS = ["Fisioterapeuta", "Atleta", "Treinador", "Paciente leigo"]
+IDIOMAS = ["Português", "English", "Español"]
+NIVEIS = ["Conciso", "Standard", "Detalhado"]
+DURACOES = [30, 60, 90, 120]
+TONS = ["Explicativo", "Motivacional", "Técnico"]
+DATA_FIXA = "2026-10-17T00:00:00"
+
+
+def _temas():
+    return knowledge_base.nomes() + ["Dor lombar em corredores", "12345678"]
+
+
+def _entradas(n: int):
+    """N combinações de parâmetros, sempre pela mesma ordem"""
+    combinacoes = itertools.cycle(itertools.product(
+        _temas(), PUBLICOS, IDIOMAS, NIVEIS, DURACOES, TONS
+    ))
+    return list(itertools.islice(combinacoes, n))
+
+
+def verificar_equivalencia() -> int:
+    """Compara referência e templates em português. Retorna o nº de combinações verificadas"""
+    total = 0
+    for tema, publico, nivel, duracao, tom in itertools.product(_temas(), PUBLICOS, NIVEIS, DURACOES, TONS):
+        antigo = referencia.gerar_estrutura_infografico(tema, tema, publico, "Português", nivel)
+        antigo["metadata"]["data_criacao"] = DATA_FIXA
+        novo = generators.gerar_estrutura_infografico(tema, tema, publico, "Português", nivel,
+                                                      data_criacao=DATA_FIXA)
+        assert json.dumps(antigo) == json.dumps(novo), (tema, publico, nivel)
+
+        antigo = referencia.gerar_roteiro_video(tema, tema, publico, "Português", duracao, tom)
+        antigo["metadata"]["data_criacao"] = DATA_FIXA
+        novo = generators.gerar_roteiro_video(tema, tema, publico, "Português", duracao, tom,
+                                              data_criacao=DATA_FIXA)
+        assert json.dumps(antigo) == json.dumps(novo), (tema, publico, duracao, tom)
+        total += 2
+    return total
+
+
+def medir(modulo, entradas) -> float:
+    """Segundos para gerar um infográfico e um roteiro por entrada"""
+    infografico, roteiro = modulo.gerar_estrutura_infografico, modulo.gerar_roteiro_video
+    inicio = time.perf_counter()
+    for tema, publico, idioma, nivel, duracao, tom in entradas:
+        infografico(tema, tema, publico, idioma, nivel)
+        roteiro(tema, tema, publico, idioma, duracao, tom)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos construtores de estruturas")
+    parser.add_argument("-n", type=int, default=100_000, help="Estruturas de cada tipo a gerar")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Melhor de N medições")
+    args = parser.parse_args()
+
+    print(f"Equivalência verificada em {verificar_equivalencia()} estruturas")
+    entradas = _entradas(args.n)
+    # Aquecimento: índices da base de conhecimento e protótipos compilados
+    medir(referencia, entradas[:2000])
+    medir(generators, entradas[:2000])
+
+    tempos = {}
+    for nome, modulo in (("referencia", referencia), ("templates", generators)):
+        tempos[nome] = min(medir(modulo, entradas) for _ in range(args.repeticoes))
+        print(f"{nome:>10}: {tempos[nome]:.3f}s  ({tempos[nome] / (2 * args.n) * 1e6:.2f} µs/estrutura)")
+    print(f"  speedup: {tempos['referencia'] / tempos['templates']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Teste de carga das pesquisas de Sports Injury AI Studio contra stubs locais
+Criado: 17 Outubro 2026
+
+Corre buscar_pubmed, buscar_noticias e buscar_perplexity com C pedidos em
+simultâneo contra benchmarks.stubs.StubServer, com latência e erros
+injetados. Cada chamada usa uma consulta única, para passar pela pilha
+completa (singleflight, cache em disco, rate limiter, cliente HTTP com
+retry) em vez de acertar na cache. Os limites do rate limiter são levantados
+por omissão (--com-limites mantém os reais).
+
+Por serviço: débito, latência p50/p95/p99 e contagem de chamadas ok, vazias
+(ex: NewsAPI com status != ok) e com erro (exceção após os retries).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.loadtest -n 300 -c 16 --latencia 0.05 --jitter 0.05 --taxa-erro 0.05
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import sources
+from utils.disjuntores import disjuntores
+from utils.http_client import http_client
+from utils.rate_limiter import rate_limiter
+
+from .resultados import guardar, percentis
+from .stubs import SERVICOS, StubServer
+
+# Chamada de cada serviço para uma consulta; a chave de API é aceite pelo stub
+CHAMADAS = {
+    'pubmed': lambda consulta: sources.buscar_pubmed(consulta),
+    'newsapi': lambda consulta: sources.buscar_noticias(consulta, 'stub'),
+    'perplexity': lambda consulta: sources.buscar_perplexity(consulta, 'stub'),
+}
+
+
+def _chamar(servico: str, consulta: str) -> tuple:
+    inicio = time.perf_counter()
+    try:
+        resultado = 'ok' if CHAMADAS[servico](consulta) else 'vazio'
+    except Exception:
+        resultado = 'erro'
+    return resultado, time.perf_counter() - inicio
+
+
+def carga(servico: str, pedidos: int, concorrencia: int, prefixo: str) -> dict:
+    """Débito e latências de 'pedidos' chamadas com 'concorrencia' threads"""
+    consultas = [f'{prefixo} {servico} {i}' for i in range(pedidos)]
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(concorrencia, thread_name_prefix=f'carga-{servico}') as executor:
+        respostas = list(executor.map(lambda c: _chamar(servico, c), consultas))
+    duracao = time.perf_counter() - inicio
+
+    contagens = {'ok': 0, 'vazio': 0, 'erro': 0}
+    for resultado, _ in respostas:
+        contagens[resultado] += 1
+    return {
+        'pedidos': pedidos,
+        'concorrencia': concorrencia,
+        'duracao_s': duracao,
+        'debito_s': pedidos / duracao,
+        **percentis([latencia for _, latencia in respostas]),
+        **contagens,
+        'metrica': 'p95_ms',
+    }
+
+
+def executar(pedidos: int = 200, concorrencia: int = 16, latencia: float = 0.02, jitter: float = 0.02,
+             taxa_erro: float = 0.0, status_erro: int = 503, servicos=SERVICOS,
+             com_limites: bool = False, seed: int = 42) -> dict:
+    """Teste de carga de cada serviço; resultados por 'carga.<servico>'"""
+    limites = rate_limiter.limits
+    endpoints = {s: dict(http_client.endpoints[s]) for s in SERVICOS}
+    if not com_limites:
+        rate_limiter.limits = {}
+    disjuntores.repor()
+    # A execução é identificada no texto das consultas: nunca acerta em caches anteriores
+    prefixo = f'carga-{time.time_ns()}'
+    resultados = {}
+    try:
+        with StubServer(seed=seed) as stub:
+            for servico in SERVICOS:
+                stub.configurar(servico, latencia=latencia, jitter=jitter, taxa_erro=taxa_erro,
+                                status_erro=status_erro)
+            stub.apontar(http_client)
+            for servico in servicos:
+                resultado = carga(servico, pedidos, concorrencia, prefixo)
+                resultado['pedidos_http'] = dict(stub.pedidos[servico])
+                resultados[f'carga.{servico}'] = resultado
+    finally:
+        rate_limiter.limits = limites
+        for servico, config in endpoints.items():
+            http_client.configure(servico, **config)
+    return resultados
+
+
+def imprimir(resultados: dict):
+    print(f"{'serviço':<18} {'pedidos/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'ok':>5} {'vazio':>5} {'erro':>5}  http (ok/erro)")
+    for nome, r in resultados.items():
+        http = r['pedidos_http']
+        print(f"{nome:<18} {r['debito_s']:>10.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['ok']:>5} {r['vazio']:>5} {r['erro']:>5}  {http.get('ok', 0)}/{http.get('erro', 0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga das pesquisas contra stubs locais")
+    parser.add_argument("-n", "--pedidos", type=int, default=200, help="Chamadas por serviço")
+    parser.add_argument("-c", "--concorrencia", type=int, default=16, help="Chamadas em simultâneo")
+    parser.add_argument("--latencia", type=float, default=0.02, help="Latência fixa do stub (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Latência aleatória adicional (s)")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de respostas com erro")
+    parser.add_argument("--status-erro", type=int, default=503, help="Status HTTP dos erros injetados")
+    parser.add_argument("--servico", action="append", choices=SERVICOS, help="Apenas estes serviços")
+    parser.add_argument("--com-limites", action="store_true", help="Manter os limites do rate limiter")
+    parser.add_argument("--seed", type=int, default=42, help="Semente da latência/erros do stub")
+    parser.add_argument("-o", "--output", help="Ficheiro JSON de resultados")
+    args = parser.parse_args()
+
+    resultados = executar(args.pedidos, args.concorrencia, args.latencia, args.jitter, args.taxa_erro,
+                          args.status_erro, tuple(args.servico or SERVICOS), args.com_limites, args.seed)
+    imprimir(resultados)
+    if args.output:
+        print(f"\nResultados em {guardar(resultados, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
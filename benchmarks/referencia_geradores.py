@@ -0,0 +1,237 @@
+"""Construtores de referência para os benchmarks de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Implementação de gerar_estrutura_infografico e gerar_roteiro_video anterior ao
+motor de templates (literais de dicionários reconstruídos em cada chamada),
+mantida só para comparar desempenho e verificar que os protótipos compilados
+produzem a mesma estrutura.
+"""
+
+from datetime import datetime
+
+from utils.generators import extrair_tipo_fonte
+from utils.knowledge_base import itens, knowledge_base, timeline
+from utils.research import resumo_evidencia
+
+
+def _lesao(fonte, tema):
+    """Entrada da base de conhecimento correspondente ao tema (ou à fonte)"""
+    return knowledge_base.encontrar(tema) or knowledge_base.encontrar(fonte)
+
+
+def _preencher_infografico(estrutura, lesao, publico, nivel_detalhe):
+    """Substitui os placeholders das secções pelo conteúdo da base de conhecimento"""
+    listas = {
+        "sintomas": itens(lesao["sintomas"], nivel_detalhe),
+        "tratamento": itens(lesao["tratamento"], nivel_detalhe),
+        "prevencao": itens(lesao["prevencao"], nivel_detalhe),
+    }
+    for secao in estrutura["conteudo"]["secoes"]:
+        if secao["tipo"] == "introducao":
+            secao["conteudo"] = lesao["descricao"]
+        elif secao["tipo"] in listas:
+            secao["conteudo"] = "; ".join(listas[secao["tipo"]])
+            secao["itens"] = listas[secao["tipo"]]
+    secoes = estrutura["conteudo"]["secoes"]
+    secoes.append({
+        "id": len(secoes) + 1,
+        "tipo": "recuperacao",
+        "titulo": "Recuperação",
+        "conteudo": " → ".join(f"{f['fase']} ({f['periodo']})" for f in timeline(lesao, publico)),
+        "itens": timeline(lesao, publico),
+        "visual_hint": "timeline"
+    })
+    if nivel_detalhe == "Detalhado" and lesao.get("sinais_alerta"):
+        secoes[1]["sinais_alerta"] = lesao["sinais_alerta"]
+    estrutura["metadata"]["lesao_id"] = lesao["id"]
+
+
+def _minuscula(texto):
+    return texto[:1].lower() + texto[1:]
+
+
+def _preencher_roteiro(roteiro, lesao, publico):
+    """Substitui os textos genéricos do narrador pelo conteúdo da base de conhecimento"""
+    fases = timeline(lesao, publico)
+    textos = {
+        "contexto": lesao["descricao"],
+        "explicacao": "Sintomas principais: " + ", ".join(map(_minuscula, lesao["sintomas"][:3])) + ".",
+        "solucao": "Tratamento: " + ", ".join(map(_minuscula, lesao["tratamento"][:3])) + "."
+                   + (f" Regresso ao desporto: {fases[-1]['periodo']}." if fases else ""),
+        "encerramento": f"Para prevenir: {_minuscula(lesao['prevencao'][0])}. Partilha este vídeo com a tua equipa!",
+    }
+    for cena in roteiro["cenas"]:
+        if cena["tipo"] in textos:
+            cena["narrador"]["texto"] = textos[cena["tipo"]]
+    roteiro["metadata"]["lesao_id"] = lesao["id"]
+
+
+# Função para gerar estrutura de infográfico
+def gerar_estrutura_infografico(fonte, tema, publico, idioma, nivel_detalhe, pesquisa=None):
+    """Gera estrutura JSON para infográfico
+    Se for dado um pacote de pesquisa, 'fonte_dados' contém a evidência recolhida.
+    """
+        
+    # Detect tipo de fonte
+    tipo_fonte, emoji = extrair_tipo_fonte(fonte)
+    
+    estrutura = {
+        "metadata": {
+            "titulo": f"Infográfico: {tema}",
+            "data_criacao": datetime.now().isoformat(),
+            "publico_alvo": publico,
+            "idioma": idioma,
+            "nivel_detalhe": nivel_detalhe
+        },
+        "conteudo": {
+            "titulo_principal": tema,
+            "subtitulo": f"Informação para {publico}",
+            "secoes": [
+                {
+                    "id": 1,
+                    "tipo": "introducao",
+                    "titulo": "O que é?",
+                    "conteudo": f"Introdução sobre {tema}",
+                    "visual_hint": "ícone anatômico"
+                },
+                {
+                    "id": 2,
+                    "tipo": "sintomas",
+                    "titulo": "Sintomas",
+                    "conteudo": "Lista de sintomas principais",
+                    "visual_hint": "ícones de sintomas"
+                },
+                {
+                    "id": 3,
+                    "tipo": "tratamento",
+                    "titulo": "Tratamento",
+                    "conteudo": "Opções de tratamento",
+                    "visual_hint": "fluxograma"
+                },
+                {
+                    "id": 4,
+                    "tipo": "prevencao",
+                    "titulo": "Prevenção",
+                    "conteudo": "Dicas de prevenção",
+                    "visual_hint": "checklist visual"
+                }
+            ],
+            "layout": {
+                "tipo": "vertical",
+                "cores_principais": ["#2E86AB", "#A23B72", "#F18F01"],
+                "fonte_titulo": "Montserrat Bold",
+                "fonte_corpo": "Open Sans"
+            }
+        },
+        "integracao": {
+            "plataforma_destino": "Canva",
+            "fonte_dados": resumo_evidencia(fonte, pesquisa) if pesquisa else fonte
+        }
+    }
+    lesao = _lesao(fonte, tema)
+    if lesao:
+        _preencher_infografico(estrutura, lesao, publico, nivel_detalhe)
+    return estrutura
+
+
+# Função para gerar roteiro de vídeo
+def gerar_roteiro_video(fonte, tema, publico, idioma, duracao, tom, pesquisa=None):
+    """Gera roteiro JSON para vídeo
+    Se for dado um pacote de pesquisa, 'fonte_dados' contém a evidência recolhida.
+    """
+    roteiro = {
+        "metadata": {
+            "titulo": f"Vídeo: {tema}",
+            "data_criacao": datetime.now().isoformat(),
+            "publico_alvo": publico,
+            "idioma": idioma,
+            "duracao_alvo": duracao,
+            "tom": tom
+        },
+        "cenas": [
+            {
+                "id": 1,
+                "duracao": int(duracao * 0.15),
+                "tipo": "abertura",
+                "narrador": {
+                    "role": "especialista",
+                    "texto": f"Bem-vindo! Hoje vamos falar sobre {tema}",
+                    "tom_voz": tom
+                },
+                "visual": {
+                    "tipo": "título animado",
+                    "elementos": ["logo", "título", "subtítulo"]
+                }
+            },
+            {
+                "id": 2,
+                "duracao": int(duracao * 0.25),
+                "tipo": "contexto",
+                "narrador": {
+                    "role": "especialista",
+                    "texto": "Contextualização da lesão",
+                    "tom_voz": tom
+                },
+                "visual": {
+                    "tipo": "animação anatômica",
+                    "elementos": ["diagrama", "setas", "legendas"]
+                }
+            },
+            {
+                "id": 3,
+                "duracao": int(duracao * 0.30),
+                "tipo": "explicacao",
+                "narrador": {
+                    "role": "especialista",
+                    "texto": "Explicação detalhada dos sintomas e diagnóstico",
+                    "tom_voz": tom
+                },
+                "visual": {
+                    "tipo": "infográfico animado",
+                    "elementos": ["lista", "ícones", "transições"]
+                }
+            },
+            {
+                "id": 4,
+                "duracao": int(duracao * 0.20),
+                "tipo": "solucao",
+                "narrador": {
+                    "role": "especialista",
+                    "texto": "Tratamentos e reabilitação",
+                    "tom_voz": tom
+                },
+                "visual": {
+                    "tipo": "demonstração",
+                    "elementos": ["exercícios", "técnicas", "equipamento"]
+                }
+            },
+            {
+                "id": 5,
+                "duracao": int(duracao * 0.10),
+                "tipo": "encerramento",
+                "narrador": {
+                    "role": "especialista",
+                    "texto": "Conclusão e call-to-action",
+                    "tom_voz": tom
+                },
+                "visual": {
+                    "tipo": "tela final",
+                    "elementos": ["resumo", "contatos", "redes sociais"]
+                }
+            }
+        ],
+        "audio": {
+            "narrador_voz": "Português nativo profissional" if idioma == "Português" else "Native speaker",
+            "musica_fundo": "corporativa suave",
+            "efeitos_sonoros": ["transições", "highlights"]
+        },
+        "integracao": {
+            "plataforma_video": "HeyGen/Synthesia",
+            "plataforma_audio": "ElevenLabs",
+            "fonte_dados": resumo_evidencia(fonte, pesquisa) if pesquisa else fonte
+        }
+    }
+    lesao = _lesao(fonte, tema)
+    if lesao:
+        _preencher_roteiro(roteiro, lesao, publico)
+    return roteiro
@@ -0,0 +1,110 @@
+"""Medição e ficheiros de resultados dos benchmarks de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+medir() corre uma função em repetições e devolve estatísticas por operação;
+percentis() resume amostras de latência. Os resultados de uma execução são
+guardados em JSON com metadados do ambiente (commit, Python, CPU, backend
+JSON) e comparar() assinala regressões face a uma execução anterior.
+Cada resultado indica em 'metrica' o campo usado na comparação (menor é
+melhor).
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+FORMATO = 1
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def medir(func: Callable, numero: int, repeticoes: int = 5, aquecimento: int = 1) -> Dict:
+    """Corre func() 'numero' vezes em cada repetição. Tempos por operação em µs"""
+    for _ in range(aquecimento):
+        for _ in range(min(numero, 1000)):
+            func()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(numero):
+            func()
+        tempos.append((time.perf_counter() - inicio) / numero * 1e6)
+    return {
+        'numero': numero,
+        'repeticoes': repeticoes,
+        'min_us': min(tempos),
+        'mediana_us': statistics.median(tempos),
+        'max_us': max(tempos),
+        'ops_s': 1e6 / min(tempos),
+        'metrica': 'mediana_us',
+    }
+
+
+def percentis(amostras: List[float], escala: float = 1000.0) -> Dict:
+    """p50/p95/p99/máximo de amostras em segundos, convertidos (por omissão para ms)"""
+    if not amostras:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    ordenadas = sorted(amostras)
+
+    def p(q):
+        return ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] * escala
+    return {'p50_ms': p(0.50), 'p95_ms': p(0.95), 'p99_ms': p(0.99), 'max_ms': ordenadas[-1] * escala}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def metadados() -> Dict:
+    from utils.serializer import serializer
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'backend_json': serializer.nome,
+    }
+
+
+def guardar(resultados: Dict[str, Dict], path) -> Path:
+    """Escreve os resultados (nome -> estatísticas) com os metadados da execução"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'formato': FORMATO, 'metadados': metadados(), 'resultados': resultados},
+                  f, indent=2, ensure_ascii=False, sort_keys=True)
+    return path
+
+
+def carregar(path) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def comparar(anterior: Dict, atual: Dict, tolerancia: float = 0.10) -> List[Dict]:
+    """Resultados em que a métrica piorou mais do que a tolerância (fração)"""
+    regressoes = []
+    antes = anterior.get('resultados', {})
+    for nome, resultado in atual.get('resultados', {}).items():
+        metrica = resultado.get('metrica')
+        if nome not in antes or not metrica or metrica not in antes[nome]:
+            continue
+        valor_antes, valor = antes[nome][metrica], resultado[metrica]
+        if valor_antes > 0 and valor > valor_antes * (1 + tolerancia):
+            regressoes.append({'nome': nome, 'metrica': metrica, 'antes': valor_antes, 'depois': valor,
+                               'variacao': valor / valor_antes - 1})
+    return regressoes
+
+
+__all__ = ['medir', 'percentis', 'metadados', 'guardar', 'carregar', 'comparar']
@@ -0,0 +1,213 @@
+"""Servidores stub das APIs externas para os benchmarks de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Um ThreadingHTTPServer local que imita as respostas usadas pela app:
+PubMed (esearch/esummary), NewsAPI (/v2/everything) e Perplexity
+(/chat/completions, em SSE com "stream": true), e um webhook (/webhook) que
+guarda os corpos recebidos. Por serviço é possível injetar latência (fixa +
+jitter), uma cauda lenta (fração de pedidos com latência extra) e uma taxa de
+erros (status configurável). Os pedidos são contados por serviço e resultado,
+e as ligações TCP aceites em stub.ligacoes (para verificar o keep-alive).
+
+Uso:
+    with StubServer() as stub:
+        stub.configurar('pubmed', latencia=0.05, jitter=0.02, taxa_erro=0.1)
+        stub.apontar(http_client)
+        ...
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SERVICOS = ('pubmed', 'newsapi', 'perplexity')
+# Destino de webhooks (URL completo em stub.url_webhook, não é um endpoint do HttpClient)
+WEBHOOK = 'webhook'
+
+_DOI_STUB = re.compile(r'"10\.5555/stub\.(\d+)"\[doi\]', re.IGNORECASE)
+
+_ROTAS = {
+    '/entrez/eutils/esearch.fcgi': 'pubmed',
+    '/entrez/eutils/esummary.fcgi': 'pubmed',
+    '/v2/everything': 'newsapi',
+    '/chat/completions': 'perplexity',
+    '/webhook': WEBHOOK,
+}
+
+
+def _resposta(caminho: str, params: dict, corpo: dict) -> dict:
+    if caminho.endswith('esearch.fcgi'):
+        retmax = int(params.get('retmax', ['5'])[0])
+        termo = params.get('term', [''])[0]
+        # DOIs do próprio stub ("10.5555/stub.<pmid>"[doi]) resolvem para o PMID
+        dois = _DOI_STUB.findall(termo)
+        if dois:
+            return {'esearchresult': {'idlist': dois}}
+        base = 30000000 + (zlib.crc32(termo.encode('utf-8')) % 1000000) * 10
+        return {'esearchresult': {'idlist': [str(base + i) for i in range(retmax)]}}
+    if caminho.endswith('esummary.fcgi'):
+        ids = params.get('id', [''])[0].split(',')
+        resultado = {'uids': ids}
+        for pmid in ids:
+            resultado[pmid] = {
+                'title': f'Sports injury rehabilitation outcomes ({pmid})',
+                'authors': [{'name': 'Silva J'}, {'name': 'Costa M'}, {'name': 'Pereira A'}],
+                'source': 'Br J Sports Med', 'pubdate': '2024 Mar',
+                'articleids': [{'idtype': 'pubmed', 'value': pmid},
+                               {'idtype': 'doi', 'value': f'10.5555/stub.{pmid}'}]
+            }
+        return {'result': resultado}
+    if caminho.endswith('everything'):
+        tamanho = int(params.get('pageSize', ['5'])[0])
+        return {'status': 'ok', 'articles': [{
+            'title': f'Notícia {i}', 'source': {'name': 'Stub'}, 'description': 'Resumo. ' * 10,
+            'url': f'https://example.com/{i}', 'publishedAt': '2026-10-01T10:00:00Z'
+        } for i in range(tamanho)]}
+    if caminho == '/webhook':
+        return {'status': 'ok'}
+    return {'choices': [{'message': {'content': _texto_perplexity(corpo)}}]}
+
+
+def _texto_perplexity(corpo: dict) -> str:
+    pergunta = corpo.get('messages', [{}])[-1].get('content', '')
+    return f'Resposta simulada: {pergunta} ' + 'Evidência. ' * 50
+
+
+def _eventos_sse(texto: str, partes: int = 8) -> bytes:
+    """Stream SSE da Perplexity com o texto em 'partes' deltas"""
+    tamanho = -(-len(texto) // partes)
+    eventos = [{'choices': [{'delta': {'content': texto[i:i + tamanho]}}]} for i in range(0, len(texto), tamanho)]
+    return b''.join(f'data: {json.dumps(e)}\n\n'.encode('utf-8') for e in eventos) + b'data: [DONE]\n\n'
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    # A fila de ligações padrão (5) transborda com dezenas de clientes em
+    # simultâneo e o SYN é repetido ao fim de 1 s, criando uma cauda falsa
+    request_queue_size = 128
+
+
+class StubServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, seed: int = None):
+        self.config = {s: {'latencia': 0.0, 'jitter': 0.0, 'cauda': 0.0, 'latencia_cauda': 0.0,
+                           'taxa_erro': 0.0, 'status_erro': 500}
+                       for s in SERVICOS + (WEBHOOK,)}
+        self.pedidos = defaultdict(lambda: defaultdict(int))
+        # Corpos JSON recebidos pelo webhook, pela ordem de chegada
+        self.webhooks = []
+        self.ligacoes = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._servidor = _Servidor((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._servidor.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def url_webhook(self) -> str:
+        return f'{self.url}/webhook'
+
+    def configurar(self, servico: str, latencia: float = None, jitter: float = None,
+                   taxa_erro: float = None, status_erro: int = None, cauda: float = None,
+                   latencia_cauda: float = None):
+        """Latência (s), jitter (s, uniforme), fração de erros e status devolvido nos erros;
+        'cauda' é a fração de pedidos que demora mais 'latencia_cauda' segundos
+        """
+        opcoes = {'latencia': latencia, 'jitter': jitter, 'taxa_erro': taxa_erro, 'status_erro': status_erro,
+                  'cauda': cauda, 'latencia_cauda': latencia_cauda}
+        self.config[servico].update({k: v for k, v in opcoes.items() if v is not None})
+
+    def apontar(self, cliente):
+        """Redireciona os endpoints do HttpClient para este stub"""
+        for servico in SERVICOS:
+            cliente.configure(servico, base_url=self.url)
+
+    def _sortear(self, servico: str) -> tuple:
+        config = self.config[servico]
+        with self._lock:
+            atraso = config['latencia'] + self._random.uniform(0, config['jitter'])
+            if config['cauda'] and self._random.random() < config['cauda']:
+                atraso += config['latencia_cauda']
+            falhar = self._random.random() < config['taxa_erro']
+        return atraso, falhar
+
+    def _contar(self, servico: str, resultado: str):
+        with self._lock:
+            self.pedidos[servico][resultado] += 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.ligacoes += 1
+
+            def _responder(self):
+                partes = urlsplit(self.path)
+                servico = _ROTAS.get(partes.path)
+                tamanho = int(self.headers.get('Content-Length') or 0)
+                corpo = json.loads(self.rfile.read(tamanho) or b'{}') if tamanho else {}
+                if servico is None:
+                    return self._enviar(404, {'error': 'not found'})
+                atraso, falhar = stub._sortear(servico)
+                if atraso:
+                    time.sleep(atraso)
+                if falhar:
+                    stub._contar(servico, 'erro')
+                    return self._enviar(stub.config[servico]['status_erro'], {'error': 'injected'})
+                stub._contar(servico, 'ok')
+                if servico == WEBHOOK:
+                    with stub._lock:
+                        stub.webhooks.append(corpo)
+                if servico == 'perplexity' and corpo.get('stream'):
+                    return self._enviar_bytes(200, _eventos_sse(_texto_perplexity(corpo)), 'text/event-stream')
+                self._enviar(200, _resposta(partes.path, parse_qs(partes.query), corpo))
+
+            def _enviar(self, status: int, dados: dict):
+                self._enviar_bytes(status, json.dumps(dados).encode('utf-8'), 'application/json')
+
+            def _enviar_bytes(self, status: int, corpo: bytes, tipo: str):
+                self.send_response(status)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def do_GET(self):
+                self._responder()
+
+            def do_POST(self):
+                self._responder()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def iniciar(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
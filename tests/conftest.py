@@ -0,0 +1,34 @@
+"""Configuração comum dos testes: caches e bases SQLite numa pasta temporária"""
+
+import os
+import tempfile
+
+import pytest
+
+# Tem de ser definido antes de importar utils (as instâncias globais leem-no no arranque)
+os.environ.setdefault('SIA_CACHE_DIR', tempfile.mkdtemp(prefix='sia-testes-'))
+
+
+@pytest.fixture
+def stub():
+    """Servidor stub das APIs externas (benchmarks/stubs.py) com o cliente HTTP apontado para ele
+
+    Os disjuntores começam fechados; endpoints e políticas dos disjuntores são
+    repostos no fim (como em benchmarks/bench_resiliencia.py).
+    """
+    from benchmarks.stubs import SERVICOS, StubServer
+    from utils.disjuntores import disjuntores
+    from utils.http_client import http_client
+
+    endpoints = {s: dict(http_client.endpoints[s]) for s in SERVICOS}
+    politicas = {fonte: dict(p) for fonte, p in disjuntores.politicas.items()}
+    disjuntores.repor()
+    try:
+        with StubServer(seed=20261017) as servidor:
+            servidor.apontar(http_client)
+            yield servidor
+    finally:
+        for servico, config in endpoints.items():
+            http_client.configure(servico, **config)
+        disjuntores.politicas = politicas
+        disjuntores.repor()
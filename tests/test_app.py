@@ -0,0 +1,30 @@
+"""Testes da app Streamlit (app.py) com o AppTest"""
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+
+def _correr(token=None, pedido=None) -> AppTest:
+    app = AppTest.from_file('../app.py', default_timeout=60)
+    if token is not None:
+        app.secrets['ADMIN_TOKEN'] = token
+    if pedido is not None:
+        app.query_params['admin'] = pedido
+    return app.run()
+
+
+def _painel_admin(app: AppTest) -> bool:
+    return any(expander.label == "📈 Métricas" for expander in app.sidebar.expander)
+
+
+@pytest.mark.parametrize('token, pedido', [(None, '1'), ('segredo', '1'), ('segredo', None), ('', '')])
+def test_painel_admin_exige_token(token, pedido):
+    app = _correr(token, pedido)
+    assert not app.exception
+    assert not _painel_admin(app)
+
+
+def test_painel_admin_com_token():
+    app = _correr('segredo', 'segredo')
+    assert not app.exception
+    assert _painel_admin(app)
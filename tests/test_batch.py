@@ -0,0 +1,74 @@
+"""Testes da geração em lote (batch.py)"""
+
+import csv
+import os
+
+import pytest
+
+import batch
+
+
+class _Saida:
+    def __init__(self):
+        self.linhas = []
+
+    def escrever(self, documento):
+        self.linhas.append(documento)
+
+
+def _csv(path, linhas):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=list(linhas[0]))
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    return path
+
+
+@pytest.mark.parametrize('duracao', ['-30', '0', '29', '181'])
+def test_duracao_fora_do_intervalo_e_erro_da_linha(duracao):
+    documento = batch.processar_entrada(
+        (1, {'fonte': 'Entorse do tornozelo', 'duracao': duracao}, 'video', False, True, None, None, {}))
+    assert not documento['ok'] and 'duracao' in documento['erro']
+
+
+def test_duracao_no_intervalo():
+    documento = batch.processar_entrada(
+        (1, {'fonte': 'Entorse do tornozelo', 'duracao': '30'}, 'video', False, True, None, None, {}))
+    assert documento['ok'] and documento['resultado']['metadata']['duracao_alvo'] == 30
+
+
+_processar_entrada = batch.processar_entrada
+
+
+def _morrer_na_linha_2(tarefa):
+    if tarefa[0] == 2:
+        os._exit(1)
+    return _processar_entrada(tarefa)
+
+
+def test_processo_do_pool_morto_marca_linha_com_erro(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, 'processar_entrada', _morrer_na_linha_2)
+    entrada = _csv(tmp_path / 'temas.csv', [{'fonte': f'Entorse do tornozelo {i}'} for i in range(1, 5)])
+    saida = _Saida()
+
+    resumo = batch.executar(entrada, saida, workers=1, tipo_padrao='infografico', pesquisa=False, max_pendentes=1)
+
+    por_linha = {documento['linha']: documento for documento in saida.linhas}
+    assert sorted(por_linha) == [1, 2, 3, 4]
+    assert [n for n, documento in por_linha.items() if not documento['ok']] == [2]
+    assert 'BrokenProcessPool' in por_linha[2]['erro']
+    assert (resumo['processadas'], resumo['erros']) == (4, 1)
+
+
+def test_pesquisa_busca_temas_no_pubmed_em_lote(tmp_path, stub):
+    temas = ['Rotura do tendão de Aquiles em corredores', 'Pubalgia em futebolistas', 'Lesão do ombro em nadadores']
+    entrada = _csv(tmp_path / 'temas.csv', [{'fonte': f'Fonte {i}', 'tema': temas[i % 3]} for i in range(6)])
+    saida = _Saida()
+
+    resumo = batch.executar(entrada, saida, workers=2, tipo_padrao='infografico', pesquisa=True)
+
+    assert resumo['erros'] == 0
+    # Um esearch por tema no mesmo WebEnv e um esummary para todos os artigos
+    assert stub.pedidos['pubmed']['ok'] == len(temas) + 1
+    for documento in saida.linhas:
+        assert len(documento['resultado']['integracao']['fonte_dados']['artigos_pubmed']) == batch.ARTIGOS_POR_TEMA
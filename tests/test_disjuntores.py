@@ -0,0 +1,66 @@
+"""Testes dos disjuntores por fonte (utils/disjuntores.py) contra o servidor stub"""
+
+import time
+
+import pytest
+
+from utils import sources
+from utils.disjuntores import ABERTO, FECHADO, MEIO_ABERTO, CircuitoAberto, disjuntores
+from utils.disk_cache import disk_cache
+from utils.http_client import http_client
+
+PAUSA = 0.2
+
+
+@pytest.fixture
+def newsapi(stub):
+    """NewsAPI sem repetições nem hedging e um disjuntor que abre com 2 erros"""
+    disjuntores.configurar('newsapi', min_pedidos=2, pausa_s=PAUSA)
+    http_client.configure('newsapi', retries=0, hedge=False)
+    return disjuntores.get('newsapi')
+
+
+def _abrir(stub, disjuntor, prefixo: str):
+    stub.configurar('newsapi', taxa_erro=1.0, status_erro=503)
+    for i in range(5):
+        if disjuntor.estado == ABERTO:
+            return
+        assert sources.buscar_noticias(f'{prefixo} degradada {i}', 'chave') == []
+    assert disjuntor.estado == ABERTO
+
+
+def test_disjuntor_abre_meio_abre_e_fecha(stub, newsapi):
+    _abrir(stub, newsapi, 'ciclo')
+    with pytest.raises(CircuitoAberto):
+        sources.buscar_noticias('ciclo aberta', 'chave')
+    assert stub.pedidos['newsapi']['erro'] == 2 and stub.pedidos['newsapi']['ok'] == 0
+
+    stub.configurar('newsapi', taxa_erro=0.0)
+    time.sleep(PAUSA * 1.5)
+    assert newsapi.estado == MEIO_ABERTO
+    assert sources.buscar_noticias('ciclo recuperada', 'chave')
+    assert newsapi.estado == FECHADO
+
+
+def test_pedido_de_teste_falhado_volta_a_abrir(stub, newsapi):
+    _abrir(stub, newsapi, 'sonda')
+    time.sleep(PAUSA * 1.5)
+    assert newsapi.estado == MEIO_ABERTO
+    assert sources.buscar_noticias('sonda falhada', 'chave') == []
+    assert newsapi.estado == ABERTO
+    assert newsapi.get_stats()['aberturas'] == 2
+
+
+@pytest.mark.parametrize('politica', [{'ttl': 0, 'stale': 0}, {'ttl': 0, 'stale': 3600}])
+def test_valor_guardado_servido_com_disjuntor_aberto(stub, newsapi, monkeypatch, politica):
+    conhecida = f"fallback {politica['stale']}"
+    guardado = sources.buscar_noticias(conhecida, 'chave')
+    assert guardado
+
+    # A entrada guardada expira (ou fica stale) e a fonte degrada-se
+    monkeypatch.setitem(disk_cache.politicas, 'newsapi', politica)
+    _abrir(stub, newsapi, conhecida)
+    pedidos = dict(stub.pedidos['newsapi'])
+
+    assert sources.buscar_noticias(conhecida, 'chave') == guardado
+    assert dict(stub.pedidos['newsapi']) == pedidos
@@ -0,0 +1,79 @@
+"""Testes do histórico de gerações (utils/historico.py) e da versão da base de conhecimento"""
+
+import importlib
+import json
+import os
+
+import pytest
+
+from utils.generators import gerar_estrutura_infografico
+from utils.historico import Historico, _incompleto
+from utils.knowledge_base import KnowledgeBase
+
+# O pacote utils exporta a instância 'historico' com o mesmo nome do módulo
+modulo_historico = importlib.import_module('utils.historico')
+
+ENTRADAS = {'fonte': 'Entorse do tornozelo', 'tema': 'Entorse do tornozelo', 'publico': 'Atleta',
+            'idioma': 'Português', 'nivel': 'Standard'}
+
+
+def _pacote(pendentes=(), erros=None):
+    return {'tema': ENTRADAS['tema'], 'pendentes': list(pendentes), 'erros': erros or {},
+            'pubmed': [], 'newsapi': [], 'perplexity': ''}
+
+
+@pytest.fixture
+def historico(tmp_path):
+    return Historico(tmp_path / 'historico.db')
+
+
+def _gerar(pacote, chamadas):
+    def gerar():
+        chamadas.append(1)
+        return gerar_estrutura_infografico(ENTRADAS['fonte'], ENTRADAS['tema'], 'Atleta', 'Português', 'Standard',
+                                           pesquisa=pacote)
+    return gerar
+
+
+def test_incompleto_le_fonte_dados_da_integracao():
+    assert _incompleto(_gerar(_pacote(pendentes=['perplexity']), [])())
+    assert _incompleto(_gerar(_pacote(erros={'newsapi': 'HTTP 500'}), [])())
+    assert not _incompleto(_gerar(_pacote(), [])())
+    assert not _incompleto(_gerar(None, [])())
+
+
+def test_geracao_com_pesquisa_parcial_nao_fica_guardada(historico):
+    chamadas = []
+    for _ in range(2):
+        _, do_historico = historico.obter_ou_gerar('infografico', ENTRADAS, _gerar(_pacote(['perplexity']), chamadas),
+                                                   pesquisa=True)
+        assert not do_historico
+    assert len(chamadas) == 2
+
+    historico.obter_ou_gerar('infografico', ENTRADAS, _gerar(_pacote(), chamadas), pesquisa=True)
+    _, do_historico = historico.obter_ou_gerar('infografico', ENTRADAS, _gerar(_pacote(), chamadas), pesquisa=True)
+    assert do_historico and len(chamadas) == 3
+
+
+def test_base_de_conhecimento_editada_e_recarregada(tmp_path, monkeypatch):
+    path = tmp_path / 'lesoes.jsonl'
+    registo = {'id': 'teste', 'nome': 'Lesão de Teste', 'aliases': [], 'descricao': 'Descrição antiga',
+               'sintomas': [], 'tratamento': [], 'prevencao': [], 'recuperacao': []}
+    path.write_text(json.dumps(registo) + '\n', encoding='utf-8')
+    kb = KnowledgeBase(path, tmp_path / 'lesoes.idx')
+    monkeypatch.setattr('utils.knowledge_base.VERIFICAR_S', 0.0)
+    versao = kb.versao()
+    assert kb.encontrar('Lesão de Teste')['descricao'] == 'Descrição antiga'
+
+    registo['descricao'] = 'Descrição nova e mais longa'
+    path.write_text(json.dumps(registo) + '\n', encoding='utf-8')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert kb.versao() != versao
+    assert kb.encontrar('Lesão de Teste')['descricao'] == 'Descrição nova e mais longa'
+
+
+def test_chave_inclui_versao_da_base_de_conhecimento(monkeypatch):
+    antes = modulo_historico.chave('infografico', ENTRADAS)
+    monkeypatch.setattr(modulo_historico.knowledge_base, 'versao', lambda: 'outra')
+    assert modulo_historico.chave('infografico', ENTRADAS) != antes
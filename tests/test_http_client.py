@@ -0,0 +1,26 @@
+"""Testes do cliente HTTP partilhado (utils/http_client.py) contra o servidor stub"""
+
+from utils.http_client import http_client
+
+ESEARCH = '/entrez/eutils/esearch.fcgi'
+
+
+def test_sessao_keep_alive_por_endpoint(stub):
+    http_client.configure('pubmed', hedge=False)
+    assert http_client.session('pubmed') is http_client.session('pubmed')
+    assert http_client.session('pubmed') is not http_client.session('newsapi')
+    for i in range(5):
+        assert http_client.get('pubmed', ESEARCH, params={'term': f'keep-alive {i}'}).ok
+    assert stub.pedidos['pubmed']['ok'] == 5
+    assert stub.ligacoes == 1
+
+
+def test_repete_5xx_mas_nao_4xx(stub):
+    http_client.configure('pubmed', retries=1, hedge=False)
+    stub.configurar('pubmed', taxa_erro=1.0, status_erro=503)
+    assert http_client.get('pubmed', ESEARCH, params={'term': 'repetido'}).status_code == 503
+    assert stub.pedidos['pubmed']['erro'] == 2
+
+    stub.configurar('pubmed', status_erro=400)
+    assert http_client.get('pubmed', ESEARCH, params={'term': 'rejeitado'}).status_code == 400
+    assert stub.pedidos['pubmed']['erro'] == 3
@@ -0,0 +1,37 @@
+"""Testes da classificação de fontes (utils/identificadores.py)"""
+
+import pytest
+
+from utils.identificadores import classificar, classificar_lote
+
+
+@pytest.mark.parametrize('texto, pmids', [
+    ('38123456', ('38123456',)),
+    ('38123456, 37012345', ('38123456', '37012345')),
+    ('PMID: 37012345', ('37012345',)),
+    ('https://pubmed.ncbi.nlm.nih.gov/38123456/', ('38123456',)),
+    ('Artigo no PubMed 38123456 sobre entorses', ('38123456',)),
+    ('PMIDs 38123456 e 37012345', ('38123456', '37012345')),
+])
+def test_pmids_com_contexto(texto, pmids):
+    assert classificar(texto).pmids == pmids
+
+
+@pytest.mark.parametrize('texto', [
+    'Estudo com 1500000 atletas amadores',
+    'Contacto da clínica: 912345678',
+    'Registo 20240315 do ensaio clínico',
+])
+def test_numeros_sem_contexto_nao_sao_pmids(texto):
+    fonte = classificar(texto)
+    assert fonte.pmids == () and fonte.tipo == 'texto'
+
+
+def test_numero_sem_contexto_junto_de_doi():
+    fonte = classificar('doi:10.1136/bjsports-2023-107456 (amostra de 1500000 atletas)')
+    assert fonte.pmids == () and fonte.tipo == 'doi'
+
+
+def test_lote_igual_a_classificar():
+    textos = ['38123456', 'Estudo com 1500000 atletas', 'doi:10.1136/bjsports-2023-107456', '', '38123456']
+    assert classificar_lote(textos) == [classificar(t) for t in textos]
@@ -0,0 +1,45 @@
+"""Testes da correspondência entre temas e lesões da base de conhecimento (utils/knowledge_base.py)"""
+
+import json
+
+import pytest
+
+from utils.knowledge_base import KnowledgeBase
+
+
+@pytest.fixture
+def kb(tmp_path):
+    return KnowledgeBase(index_path=tmp_path / 'lesoes.idx.json')
+
+
+@pytest.mark.parametrize('texto, lesao', [
+    ("Rotura do LCA", 'rutura-lca'),
+    ("entorses de tornozelo em futebolistas", 'entorse-tornozelo'),
+    ("entorse do tornozlo", 'entorse-tornozelo'),
+    ("ligamento cruzado anteriro", 'rutura-lca'),
+    ("fascite plantr", 'fascite-plantar'),
+])
+def test_encontra_nomes_aliases_e_erros_de_escrita(kb, texto, lesao):
+    assert kb.encontrar(texto)['id'] == lesao
+
+
+@pytest.mark.parametrize('texto', [
+    "ligamento cruzado posterior",
+    "rotura do menisco",
+    "lesão muscular",
+    "tendinite",
+    "Dor lombar em corredores",
+])
+def test_nao_preenche_com_outra_lesao(kb, texto):
+    assert kb.encontrar(texto) is None
+
+
+def test_indice_em_json(kb, tmp_path):
+    kb.encontrar("LCA")
+    dados = json.loads((tmp_path / 'lesoes.idx.json').read_text(encoding='utf-8'))
+    assert dados['chaves']['lca'] == kb.encontrar_indice("LCA")
+
+    # Um índice corrompido é reconstruído
+    (tmp_path / 'lesoes.idx.json').write_bytes(b'\x80\x04garbage')
+    outra = KnowledgeBase(index_path=tmp_path / 'lesoes.idx.json')
+    assert outra.encontrar("LCA")['id'] == 'rutura-lca'
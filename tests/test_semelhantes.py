@@ -0,0 +1,66 @@
+"""Testes das perguntas semelhantes (utils/semelhantes.py)"""
+
+import pytest
+
+from utils.semelhantes import IndiceSemelhantes, distintivos
+
+
+@pytest.fixture
+def indice(tmp_path):
+    return IndiceSemelhantes(tmp_path / 'semelhantes.db')
+
+
+@pytest.mark.parametrize('indexada, procurada', [
+    ("quanto tempo de recuperação para entorse de tornozelo grau 1",
+     "quanto tempo de recuperação para entorse de tornozelo grau 3"),
+    ("recuperação de entorse do tornozelo grau I", "recuperação de entorse do tornozelo grau III"),
+    ("reabilitação após lesão do LCA no joelho esquerdo", "reabilitação após lesão do LCA no joelho direito"),
+    ("tratamento de rotura muscular leve dos isquiotibiais", "tratamento de rotura muscular grave dos isquiotibiais"),
+    ("return to play after grade 2 hamstring strain", "return to play after grade 3 hamstring strain"),
+    ("hérnia discal L4 L5 em atletas", "hérnia discal L5 S1 em atletas"),
+])
+def test_nao_reutiliza_com_distintivos_diferentes(indice, indexada, procurada):
+    indice.adicionar(indexada, 'a')
+    assert indice.procurar(procurada, limiar=0.5) is None
+
+
+@pytest.mark.parametrize('indexada, procurada', [
+    ("quanto tempo de recuperação para entorse de tornozelo grau 2",
+     "Quanto tempo demora a recuperação de uma entorse do tornozelo grau II?"),
+    ("reabilitação LCA joelho esquerdo atletas", "Reabilitação do LCA do joelho esquerdo em atletas"),
+])
+def test_reutiliza_reformulacoes(indice, indexada, procurada):
+    indice.adicionar(indexada, 'a')
+    semelhante = indice.procurar(procurada, limiar=0.5)
+    assert semelhante is not None and semelhante.chave == 'a'
+
+
+def test_nao_reutiliza_com_negacoes_diferentes(indice):
+    indice.adicionar("recuperação de rotura do LCA com cirurgia", 'a')
+    assert indice.procurar("recuperação de rotura do LCA sem cirurgia", limiar=0.5) is None
+
+
+def test_distintivos():
+    assert distintivos("entorse grau III do tornozelo direito") == {'3', 'direito'}
+    assert distintivos("grade 03 left ankle sprain") == {'3', 'esquerdo'}
+    assert distintivos("Can I return to play?") == frozenset()
+
+
+@pytest.mark.parametrize('indexada, procurada', [
+    ("protocolo de reabilitação após reconstrução do ligamento cruzado anterior em futebolistas",
+     "protocolo de reabilitação após reconstrução do ligamento cruzado posterior em futebolistas"),
+    ("rehabilitation protocol after anterior cruciate ligament reconstruction surgery",
+     "rehabilitation protocol after posterior cruciate ligament reconstruction surgery"),
+    ("programa de prevenção de lesões musculares dos isquiotibiais com exercício excêntrico em futebolistas",
+     "programa de prevenção de lesões musculares dos isquiotibiais com exercício excêntrico em crianças"),
+    ("protocolo de reabilitação do LCA em atletas", "protocolo de reabilitação do LCA em atletas profissionais"),
+])
+def test_nao_reutiliza_com_estrutura_ou_populacao_diferente(indice, indexada, procurada):
+    indice.adicionar(indexada, 'a')
+    assert indice.procurar(procurada) is None
+
+
+def test_reutiliza_com_termos_neutros(indice):
+    indice.adicionar("evidência recente tratamento tendinopatia patelar", 'a')
+    semelhante = indice.procurar("Quais as evidências mais recentes sobre o tratamento da tendinopatia patelar?")
+    assert semelhante is not None and semelhante.chave == 'a'
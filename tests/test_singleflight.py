@@ -0,0 +1,41 @@
+"""Testes da coalescência de pedidos (utils/singleflight.py)"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_stream_partilhado_entre_pedidos_concorrentes():
+    singleflight = SingleFlight()
+    liberar, chamadas = threading.Event(), []
+
+    def gerar():
+        chamadas.append(1)
+        yield 'a'
+        liberar.wait(5)
+        yield 'b'
+        yield 'c'
+
+    leitores = [singleflight.stream('pergunta', gerar) for _ in range(3)]
+    assert [next(leitor) for leitor in leitores] == ['a', 'a', 'a']
+    with ThreadPoolExecutor(3) as executor:
+        futuros = [executor.submit(list, leitor) for leitor in leitores]
+        liberar.set()
+        assert [f.result(5) for f in futuros] == [['b', 'c']] * 3
+    assert chamadas == [1]
+    assert singleflight.get_stats()['pergunta'] == {'chamadas': 3, 'coalescidas': 2}
+
+
+def test_stream_propaga_erro_e_liberta_chave():
+    singleflight = SingleFlight()
+
+    def falhar():
+        yield 'a'
+        raise ValueError('HTTP 500')
+
+    with pytest.raises(ValueError):
+        list(singleflight.stream('pergunta', falhar))
+    assert list(singleflight.stream('pergunta', lambda: iter(['b']))) == ['b']
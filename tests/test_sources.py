@@ -0,0 +1,50 @@
+"""Testes das fontes externas (utils/sources.py)"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import sources
+from utils.disk_cache import disk_cache
+from utils.semelhantes import IndiceSemelhantes
+
+
+@pytest.fixture
+def perguntas(tmp_path, monkeypatch):
+    indice = IndiceSemelhantes(tmp_path / 'semelhantes.db')
+    monkeypatch.setattr(sources, 'perguntas_semelhantes', indice)
+    return indice
+
+
+def test_resposta_reutilizada_indica_pergunta_e_nao_e_guardada(perguntas, monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(sources, 'perguntar_perplexity', lambda query, api_key: chamadas.append(query) or 'Resposta A')
+    original = "reabilitação LCA joelho esquerdo atletas amadores"
+    reformulada = "Reabilitação do LCA do joelho esquerdo em atletas amadores"
+
+    assert sources.buscar_perplexity_detalhado(original, 'chave') == ('Resposta A', None)
+    resposta, semelhante = sources.buscar_perplexity_detalhado(reformulada, 'chave')
+
+    assert resposta == 'Resposta A' and semelhante.pergunta == original
+    assert chamadas == [original]
+    assert disk_cache.get('perplexity', disk_cache.chave('perplexity', query=reformulada))[1] == 'miss'
+
+
+def test_stream_guarda_resposta_para_stream_e_pedido_normal(stub, perguntas):
+    pergunta = "Protocolo de retorno ao desporto após pubalgia em futebolistas"
+    partes = list(sources.buscar_perplexity_stream(pergunta, 'chave'))
+    assert len(partes) > 1 and pergunta in ''.join(partes)
+
+    assert list(sources.buscar_perplexity_stream(pergunta, 'chave')) == [''.join(partes)]
+    assert sources.buscar_perplexity(pergunta, 'chave') == ''.join(partes)
+    assert stub.pedidos['perplexity']['ok'] == 1
+
+
+def test_streams_concorrentes_partilham_um_pedido(stub, perguntas):
+    stub.configurar('perplexity', latencia=0.2)
+    pergunta = "Prevenção de lesões do ombro em nadadores de competição"
+    with ThreadPoolExecutor(3) as executor:
+        respostas = list(executor.map(lambda _: ''.join(sources.buscar_perplexity_stream(pergunta, 'chave')),
+                                      range(3)))
+    assert respostas[0] and respostas.count(respostas[0]) == 3
+    assert stub.pedidos['perplexity']['ok'] == 1
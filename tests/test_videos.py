@@ -0,0 +1,65 @@
+"""Testes do servidor de streaming de vídeo (utils/videos.py)"""
+
+import socket
+
+import requests
+
+from utils.videos import ServidorVideos, publico
+
+
+def _servidor(tmp_path, **kwargs) -> ServidorVideos:
+    return ServidorVideos(cache_dir=tmp_path / 'cache', **kwargs)
+
+
+def test_url_publico_exige_porta(tmp_path):
+    assert not _servidor(tmp_path, url_publico='https://exemplo.pt/video', porta=0).disponivel
+    assert _servidor(tmp_path, url_publico='https://exemplo.pt/video', porta=8600).disponivel
+    assert not _servidor(tmp_path, porta=8600).disponivel
+
+
+def test_token_servido_por_outro_processo(tmp_path):
+    video = tmp_path / 'treino.mp4'
+    video.write_bytes(bytes(range(256)) * 64)
+    registo, servidor = _servidor(tmp_path), _servidor(tmp_path)
+    try:
+        caminho = registo.registar(str(video)).split('/v/', 1)[1]
+        resposta = requests.get(f'{servidor.iniciar()}/v/{caminho}', headers={'Range': 'bytes=256-511'}, timeout=5)
+        assert resposta.status_code == 206
+        assert resposta.content == bytes(range(256))
+        assert requests.get(f'{servidor.iniciar()}/v/{"0" * 32}/x.mp4', timeout=5).status_code == 404
+    finally:
+        registo.parar()
+        servidor.parar()
+
+
+def test_porta_fixa_ocupada_por_outro_worker(tmp_path):
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        porta = s.getsockname()[1]
+    primeiro, segundo = _servidor(tmp_path, porta=porta), _servidor(tmp_path, porta=porta)
+    try:
+        assert primeiro.iniciar() == segundo.iniciar() == f'http://localhost:{porta}'
+        assert segundo._servidor is None
+    finally:
+        primeiro.parar()
+        segundo.parar()
+
+
+def test_enderecos_nao_publicos():
+    for url in ('http://127.0.0.1/v.mp4', 'http://localhost:8080/v.mp4', 'http://10.1.2.3/v.mp4',
+                'http://192.168.0.10/v.mp4', 'http://169.254.169.254/latest/meta-data.mp4',
+                'http://100.64.0.1/v.mp4', 'http://[::1]/v.mp4', 'http://[fe80::1]/v.mp4',
+                'http://[::ffff:127.0.0.1]/v.mp4', 'http://0.0.0.0/v.mp4', 'http:///v.mp4'):
+        assert not publico(url), url
+    assert publico('https://93.184.215.14/v.mp4')
+    assert publico('http://[2606:4700::1111]/v.mp4')
+
+
+def test_proxy_recusa_origem_privada(tmp_path, stub):
+    servidor = _servidor(tmp_path)
+    try:
+        url = servidor.registar(f'{stub.url}/clip.mp4')
+        assert requests.get(url, headers={'Range': 'bytes=0-99'}, timeout=5).status_code == 403
+        assert stub.ligacoes == 0
+    finally:
+        servidor.parar()
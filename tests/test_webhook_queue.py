@@ -0,0 +1,84 @@
+"""Testes da fila de webhooks (utils/webhook_queue.py)"""
+
+import pytest
+
+from utils.webhook_queue import WebhookQueue
+
+
+@pytest.fixture
+def filas(tmp_path):
+    """Dois processos (instâncias) a partilhar a mesma base; os workers não arrancam"""
+    filas = [WebhookQueue(tmp_path / 'webhooks.db', workers=0) for _ in range(2)]
+    yield filas
+    for fila in filas:
+        fila.parar()
+
+
+def test_destino_usa_configuracao_guardada_em_qualquer_processo(filas):
+    configurou, outro = filas
+    configurou.configurar_destino('make', 'http://127.0.0.1:9/make', max_concorrencia=1, tamanho_lote=3)
+    for i in range(5):
+        configurou.enfileirar('make', {'id': i})
+
+    destino, tamanho_lote, _, linhas = outro._reclamar()
+    assert (destino, tamanho_lote, len(linhas)) == ('make', 3, 3)
+    # max_concorrencia=1 vale entre processos: o primeiro lote ainda está em envio
+    assert configurou._reclamar() is None
+
+
+def test_nao_reclama_destinos_sem_configuracao(filas):
+    fila = filas[0]
+    fila.configurar_destino('make', 'http://127.0.0.1:9/make')
+    fila.enfileirar('make', {'id': 1})
+    # Documentos de um destino sem configuração na base (ex: fila de uma versão anterior) ficam na fila
+    fila._conn().execute("DELETE FROM destinos")
+    assert fila._reclamar() is None
+
+
+def _fila(tmp_path, **opcoes):
+    return WebhookQueue(tmp_path / 'webhooks.db', workers=1, backoff_base=0.01, backoff_max=0.02, **opcoes)
+
+
+def test_falhas_repetidas_vao_para_dead_letter(tmp_path, stub):
+    fila = _fila(tmp_path, max_tentativas=3)
+    try:
+        fila.configurar_destino('make', stub.url_webhook)
+        stub.configurar('webhook', taxa_erro=1.0, status_erro=503)
+        envio = fila.enfileirar('make', {'titulo': 'Entorse'})
+        assert fila.esperar([envio], timeout=10)
+    finally:
+        fila.parar()
+    estado = fila.estado(envio)
+    assert (estado['estado'], estado['tentativas']) == ('falhado', 3)
+    assert stub.pedidos['webhook']['erro'] == 3
+    assert [morto['id'] for morto in fila.dead_letters()] == [envio]
+
+
+def test_4xx_vai_para_dead_letter_sem_repetir(tmp_path, stub):
+    fila = _fila(tmp_path)
+    try:
+        fila.configurar_destino('make', stub.url_webhook)
+        stub.configurar('webhook', taxa_erro=1.0, status_erro=400)
+        envio = fila.enfileirar('make', {'titulo': 'Entorse'})
+        assert fila.esperar([envio], timeout=10)
+    finally:
+        fila.parar()
+    assert fila.estado(envio)['tentativas'] == 1
+    assert stub.pedidos['webhook']['erro'] == 1
+
+
+@pytest.mark.parametrize('tamanho_lote, corpos', [(1, [{'n': i} for i in range(5)]),
+                                                  (3, [[{'n': 0}, {'n': 1}, {'n': 2}], [{'n': 3}, {'n': 4}]])])
+def test_forma_do_corpo_por_tamanho_de_lote(tmp_path, stub, tamanho_lote, corpos):
+    # Um processo configura e enfileira sem workers; outro, sem configuração própria, envia
+    enfileira = WebhookQueue(tmp_path / 'webhooks.db', workers=0)
+    envia = _fila(tmp_path)
+    try:
+        enfileira.configurar_destino('make', stub.url_webhook, tamanho_lote=tamanho_lote)
+        envios = [enfileira.enfileirar('make', {'n': i}) for i in range(5)]
+        envia.iniciar()
+        assert envia.esperar(envios, timeout=10)
+    finally:
+        envia.parar()
+    assert stub.webhooks == corpos
+    assert {envia.estado(i)['estado'] for i in envios} == {'enviado'}
@@ -0,0 +1 @@
+"""Camada Streamlit de Sports Injury AI Studio (o núcleo sem UI está em utils)"""
@@ -0,0 +1,177 @@
+"""Painéis Streamlit de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Estado dos envios para automação (fragmento atualizado sozinho), navegação no
+histórico de gerações e painel de métricas para administração.
+"""
+
+import hmac
+from datetime import datetime
+
+import streamlit as st
+
+from utils.aquecimento import aquecedor
+from utils.disjuntores import disjuntores
+from utils.historico import historico
+from utils.http_client import http_client
+from utils.metrics import metrics
+from utils.serializer import serializer
+from utils.rate_limiter import rate_limiter
+from utils.webhook_queue import webhook_queue
+
+
+@st.fragment(run_every=3)
+def mostrar_envios():
+    """Estado dos últimos envios desta sessão, atualizado sem recarregar a página"""
+    icones = {'pendente': '⏳', 'enviando': '📤', 'enviado': '✅', 'falhado': '❌'}
+    st.subheader("📤 Envios para automação")
+    for envio_id in reversed(st.session_state.get('envios', [])[-5:]):
+        envio = webhook_queue.estado(envio_id)
+        if not envio:
+            continue
+        detalhe = f" · tentativas: {envio['tentativas']}" if envio['tentativas'] else ""
+        if envio.get('ultimo_erro') and envio['estado'] != 'enviado':
+            detalhe += f" · {envio['ultimo_erro']}"
+        st.caption(f"{icones.get(envio['estado'], '')} #{envio_id} → {envio['destino']}: {envio['estado']}{detalhe}")
+
+
+HISTORICO_POR_PAGINA = 20
+
+
+def mostrar_historico():
+    """Separador do histórico: filtros, páginas por cursor e o documento escolhido"""
+    st.header("🗂️ Histórico de Gerações")
+    stats = historico.estatisticas()
+    if not stats['geracoes']:
+        st.info("Ainda não há gerações guardadas. Os infográficos e roteiros gerados aparecem aqui.")
+        return
+    st.caption(f"{stats['geracoes']} gerações · {stats['documentos']} documentos distintos · "
+               f"{stats['bytes_comprimidos'] / 1024:.0f} KB comprimidos ({stats['bytes'] / 1024:.0f} KB sem compressão) · "
+               f"{stats['reutilizacoes']} reutilizações")
+
+    col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 2])
+    filtros = {
+        'tipo': col1.selectbox("Tipo", [None, 'infografico', 'video'], key="historico_tipo",
+                               format_func=lambda v: v or "Todos"),
+        'lesao': col2.selectbox("Lesão", [None] + historico.valores('lesao'), key="historico_lesao",
+                                format_func=lambda v: v or "Todas"),
+        'publico': col3.selectbox("Público", [None] + historico.valores('publico'), key="historico_publico",
+                                  format_func=lambda v: v or "Todos"),
+        'idioma': col4.selectbox("Idioma", [None] + historico.valores('idioma'), key="historico_idioma",
+                                 format_func=lambda v: v or "Todos"),
+    }
+    texto = col5.text_input("Pesquisar no tema", key="historico_texto")
+
+    # Pilha de cursores: o topo é o início da página atual; volta ao início quando os filtros mudam
+    assinatura = (tuple(filtros.values()), texto)
+    if st.session_state.get('historico_assinatura') != assinatura:
+        st.session_state.historico_assinatura = assinatura
+        st.session_state.historico_cursores = [None]
+    cursores = st.session_state.historico_cursores
+
+    itens, seguinte = historico.listar(HISTORICO_POR_PAGINA, cursores[-1], texto, **filtros)
+    total = historico.contar(texto, **filtros)
+    if not itens:
+        st.warning("Nenhuma geração com estes filtros.")
+        return
+
+    st.dataframe(
+        [{'id': i['id'], 'data': datetime.fromtimestamp(i['criado']).strftime('%Y-%m-%d %H:%M'), 'tipo': i['tipo'],
+          'tema': i['tema'], 'lesão': i['lesao_id'] or '', 'público': i['publico'], 'idioma': i['idioma'],
+          'pesquisa': '🔎' if i['pesquisa'] else '', 'reutilizações': i['acessos']} for i in itens],
+        hide_index=True, use_container_width=True
+    )
+
+    col_anterior, col_pagina, col_seguinte = st.columns([1, 2, 1])
+    if col_anterior.button("⬅️ Anterior", disabled=len(cursores) == 1, key="historico_anterior"):
+        cursores.pop()
+        st.rerun()
+    col_pagina.caption(f"Página {len(cursores)} · {total} resultados")
+    if col_seguinte.button("Seguinte ➡️", disabled=seguinte is None, key="historico_seguinte"):
+        cursores.append(seguinte)
+        st.rerun()
+
+    escolhido = st.selectbox("Ver documento", [i['id'] for i in itens], key="historico_escolhido",
+                             format_func=lambda gid: next(f"#{i['id']} · {i['tema']}" for i in itens if i['id'] == gid))
+    documento = historico.documento(escolhido)
+    if documento:
+        st.json(documento, expanded=False)
+        st.download_button(
+            label="📥 Download JSON",
+            data=serializer.dumps(documento, pretty=True),
+            file_name=f"historico_{escolhido}.json",
+            mime="application/json",
+            key="historico_download"
+        )
+
+
+def admin_autorizado() -> bool:
+    """O URL tem ?admin=<token> com o token do secret ADMIN_TOKEN (sem o secret, o painel fica desligado)"""
+    try:
+        token = st.secrets.get('ADMIN_TOKEN', '')
+    except Exception:
+        token = ''
+    pedido = st.query_params.get('admin', '')
+    return bool(token) and hmac.compare_digest(pedido.encode('utf-8'), str(token).encode('utf-8'))
+
+
+def mostrar_painel_admin():
+    """Painel de métricas (ativado com ?admin=<ADMIN_TOKEN> no URL)"""
+    with st.sidebar.expander("📈 Métricas", expanded=True):
+        snapshot = metrics.snapshot()
+
+        st.markdown("**Latência por fonte**")
+        latencias = snapshot['latencias'].get('api_request_seconds', [])
+        if latencias:
+            st.dataframe(latencias, hide_index=True, use_container_width=True)
+        else:
+            st.caption("Sem chamadas registadas.")
+
+        st.markdown("**Taxa de erro**")
+        for fonte in rate_limiter.limits:
+            ok = metrics.counter('api_requests_total', source=fonte, status='ok')
+            erros = metrics.counter('api_requests_total', source=fonte, status='error')
+            total = ok + erros
+            st.caption(f"{fonte}: {erros:.0f}/{total:.0f} ({(erros / total * 100) if total else 0:.1f}%)")
+
+        st.markdown("**Quotas (rate limiter)**")
+        for api in rate_limiter.limits:
+            uso = rate_limiter.get_usage_stats(api)
+            st.progress(min(uso['percentage'] / 100, 1.0),
+                        text=f"{api}: {uso['current']:.0f}/{uso['max']} · rejeitadas {uso['rejections']}")
+
+        st.markdown("**Disjuntores e hedging**")
+        st.dataframe([{'fonte': fonte, **stats} for fonte, stats in disjuntores.get_stats().items()],
+                     hide_index=True, use_container_width=True)
+        hedging = http_client.get_stats()
+        if hedging:
+            st.dataframe([{'endpoint': nome, **stats} for nome, stats in hedging.items()],
+                         hide_index=True, use_container_width=True)
+
+        st.markdown("**Cache e geração**")
+        if snapshot['estado']:
+            st.dataframe(snapshot['estado'], hide_index=True, use_container_width=True)
+        geracao = snapshot['latencias'].get('generation_seconds', [])
+        if geracao:
+            st.dataframe(geracao, hide_index=True, use_container_width=True)
+
+        st.markdown("**Aquecimento da cache**")
+        if aquecedor.em_execucao():
+            st.dataframe(aquecedor.estado(), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Parado (SIA_AQUECIMENTO=0).")
+
+        st.markdown("**Fila de webhooks**")
+        fila = webhook_queue.contagens()
+        if fila:
+            st.dataframe([{'destino': d, **estados} for d, estados in fila.items()],
+                         hide_index=True, use_container_width=True)
+        else:
+            st.caption("Sem envios.")
+
+        st.download_button(
+            label="📥 Exportar (Prometheus)",
+            data=metrics.render_prometheus(),
+            file_name="metrics.prom",
+            mime="text/plain"
+        )
@@ -0,0 +1,270 @@
+"""Serviços Streamlit de Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Funções com cache do Streamlit (chaves de API, pesquisas, webhooks) que
+envolvem o núcleo em utils e apresentam os erros na página. Ficam fora de
+app.py para que os decoradores (st.cache_data / st.cache_resource, que
+calculam a chave a partir do código-fonte) corram uma vez por processo e não
+em cada rerun do script.
+"""
+
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import streamlit as st
+
+from utils import sources
+from utils.aquecimento import aquecedor
+from utils.disjuntores import CircuitoAberto
+from utils.historico import historico
+from utils.logger import log_error, log_user_action
+from utils.rate_limiter import RateLimitExceeded
+from utils.research import pesquisar_fontes
+from utils.webhook_queue import webhook_queue
+
+
+@st.cache_data(ttl=3600)
+def get_api_keys():
+    """Obtém as API keys do Streamlit secrets"""
+    try:
+        return {
+            'newsapi': st.secrets.get('NEWSAPI_KEY', ''),
+            'perplexity': st.secrets.get('PERPLEXITY_API_KEY', ''),
+            'openai': st.secrets.get('OPENAI_API_KEY', '')
+        }
+    except Exception:
+        log_error('get_api_keys', Exception('Erro ao carregar API keys'))
+        return {'newsapi': '', 'perplexity': '', 'openai': ''}
+
+
+# Destinos de webhook na fila -> secret com o URL
+WEBHOOKS = {
+    'make_infografico': 'MAKE_WEBHOOK_INFOGRAPHIC',
+    'make_video': 'MAKE_WEBHOOK_VIDEO',
+    'activepieces': 'ACTIVEPIECES_WEBHOOK',
+}
+
+
+@st.cache_resource
+def configurar_webhooks() -> Dict[str, str]:
+    """Regista na fila de envio os webhooks definidos nos secrets. Retorna destino -> URL"""
+    destinos = {}
+    for destino, segredo in WEBHOOKS.items():
+        try:
+            url = st.secrets.get(segredo, '')
+        except Exception:
+            url = ''
+        if url:
+            webhook_queue.configurar_destino(destino, url)
+            destinos[destino] = url
+    if destinos:
+        # Retoma envios pendentes de execuções anteriores
+        webhook_queue.iniciar()
+    return destinos
+
+
+@st.cache_resource
+def _arrancar_aquecimento() -> bool:
+    """Arranca uma vez por processo o aquecimento da cache (SIA_AQUECIMENTO=0 desativa)"""
+    if os.environ.get('SIA_AQUECIMENTO', '1') == '0':
+        return False
+    aquecedor.iniciar(get_api_keys())
+    return True
+
+
+def aquecer_cache():
+    """Regista a atividade deste rerun (o aquecimento só corre sem utilizadores ativos)"""
+    aquecedor.marcar_atividade()
+    _arrancar_aquecimento()
+
+
+def registar_procura(tipo: str, texto: str):
+    """Conta um pedido de um 'tema' ou 'pergunta' para a prioridade do aquecimento"""
+    try:
+        aquecedor.registar(tipo, texto)
+    except sqlite3.Error as e:
+        log_error('registar_procura', e)
+
+
+def destino_webhook(tipo: str) -> Optional[str]:
+    """Destino para um tipo de documento: Make.com do tipo, senão Activepieces"""
+    destinos = configurar_webhooks()
+    for destino in (f'make_{tipo}', 'activepieces'):
+        if destino in destinos:
+            return destino
+    return None
+
+
+def enfileirar_envio(destino: str, documento: Dict, tipo: str):
+    """Coloca o documento na fila de envio (o POST é feito em segundo plano)"""
+    try:
+        envio_id = webhook_queue.enfileirar(destino, documento)
+    except Exception as e:
+        st.error(f"⚠️ Erro ao colocar o envio na fila: {str(e)}")
+        log_error('enfileirar_envio', e)
+        return
+    st.session_state.setdefault('envios', []).append(envio_id)
+    st.info(f"📤 Em fila para {destino} (envio #{envio_id}). O estado aparece em baixo.")
+    log_user_action('webhook_enqueue', {'destino': destino, 'tipo': tipo, 'envio': envio_id})
+
+
+def mostrar_perplexity_stream(query: str, api_key: str, reutilizar: bool = True) -> str:
+    """Mostra a resposta da Perplexity à medida que chega e devolve o texto completo
+
+    Com 'reutilizar', uma pergunta sem resposta própria em cache mostra a
+    resposta guardada de uma pergunta semelhante, indicando qual.
+    """
+    try:
+        reutilizada = sources.resposta_semelhante(query) if reutilizar else None
+        if reutilizada:
+            semelhante, resposta = reutilizada
+            st.info(f"♻️ Resposta reutilizada da pergunta semelhante ({semelhante.similaridade:.0%}): "
+                    f"“{semelhante.pergunta}”")
+            st.markdown(resposta)
+            log_user_action('perplexity_reuse', {'similaridade': round(semelhante.similaridade, 2)})
+            return resposta
+        resultado = st.write_stream(sources.buscar_perplexity_stream(query, api_key))
+        return resultado if isinstance(resultado, str) else ''.join(map(str, resultado))
+    except RateLimitExceeded:
+        st.warning('⚠️ Muitas requisições. Aguarde um momento.')
+        return ""
+    except CircuitoAberto as e:
+        st.warning(f'⚠️ Fonte {e}.')
+        return ""
+    except Exception as e:
+        st.error(f"⚠️ Erro ao consultar Perplexity AI: {str(e)}")
+        log_error('buscar_perplexity_stream', e)
+        return ""
+
+
+def gerar_com_historico(tipo: str, entradas: Dict, gerar: Callable[[], Dict],
+                        pesquisa: bool = False) -> Tuple[Dict, bool]:
+    """(documento, veio do histórico); sem histórico disponível, gera diretamente"""
+    try:
+        return historico.obter_ou_gerar(tipo, entradas, gerar, pesquisa)
+    except sqlite3.Error as e:
+        log_error('gerar_com_historico', e)
+        return gerar(), False
+
+
+def mostrar_imagem_infografico(estrutura: Dict):
+    """Miniatura do infográfico desenhado localmente e download da imagem completa"""
+    from utils.rasterizador import rasterizador
+
+    try:
+        miniatura = rasterizador.miniatura(estrutura)
+    except Exception as e:
+        st.error(f"⚠️ Erro ao desenhar o infográfico: {str(e)}")
+        log_error('mostrar_imagem_infografico', e)
+        return
+    st.image(miniatura, caption="Pré-visualização (desenho local)")
+    # A imagem completa só é desenhada (ou lida da cache) quando o download é pedido
+    st.download_button(
+        label="🖼️ Download PNG",
+        data=lambda: rasterizador.renderizar(estrutura, 'png'),
+        file_name=f"infografico_{estrutura['metadata'].get('lesao_id') or 'tema'}.png",
+        mime="image/png",
+        key="download_info_png"
+    )
+
+
+def mostrar_lesao(documento: Dict):
+    """Indica a lesão da base de conhecimento usada para preencher o documento"""
+    from utils.knowledge_base import knowledge_base
+
+    lesao_id = (documento.get('metadata') or {}).get('lesao_id')
+    if not lesao_id:
+        st.caption("📚 Sem lesão correspondente na base de conhecimento: conteúdo genérico.")
+        return
+    entrada = knowledge_base.encontrar(lesao_id)
+    nome = entrada['nome'] if entrada else lesao_id
+    st.info(f"📚 Conteúdo preenchido com a lesão **{nome}** da base de conhecimento. "
+            "Se não for a lesão pretendida, escreve o nome exato no tema.")
+
+
+def mostrar_narracao(roteiro: Dict):
+    """Sintetiza a narração das cenas do roteiro e mostra o leitor de áudio"""
+    from utils.audio import narrador
+
+    try:
+        with st.spinner("🎧 A sintetizar a narração..."), tempfile.TemporaryDirectory() as tmp:
+            faixa = narrador.renderizar(roteiro, Path(tmp) / 'narracao.wav')
+            st.audio(faixa.path.read_bytes(), format='audio/wav')
+    except Exception as e:
+        st.error(f"⚠️ Erro ao gerar a narração: {str(e)}")
+        log_error('mostrar_narracao', e)
+        return
+    cortadas = [str(cena['id']) for cena in faixa.cenas if cena['cortada']]
+    st.caption(f"🎧 {faixa.duracao_s:.0f}s · {narrador.backend.nome} · {faixa.sintetizados} cenas sintetizadas, "
+               f"{faixa.reutilizados} da cache"
+               + (f" · fala cortada nas cenas {', '.join(cortadas)}" if cortadas else ""))
+    log_user_action('narracao', {'cenas': len(faixa.cenas), 'sintetizadas': faixa.sintetizados})
+
+
+def streaming_video_disponivel() -> bool:
+    """O servidor de vídeo tem um endereço público configurado (SIA_VIDEO_URL)"""
+    from utils import videos
+
+    return videos.servidor_videos.disponivel
+
+
+def mostrar_leitor_video(origem: str, streaming: bool = True):
+    """Leitor do separador de vídeo
+
+    Com 'streaming' e SIA_VIDEO_URL configurado, ficheiros locais e links
+    diretos para vídeos passam pelo servidor com pedidos Range
+    (utils/videos.py) em vez de serem lidos inteiros para a memória; YouTube,
+    Vimeo e afins (e tudo o resto sem SIA_VIDEO_URL) vão diretamente para o
+    st.video.
+    """
+    from utils import videos
+
+    try:
+        url = origem
+        if streaming and videos.servidor_videos.disponivel and videos.suportado(origem):
+            url = videos.servidor_videos.registar(origem)
+        st.video(url)
+        st.caption(f"📍 Fonte: {origem}" + (" · streaming com Range" if url != origem else ""))
+    except Exception as e:
+        st.error(f"⚠️ Erro ao carregar vídeo: {str(e)}")
+        st.info("💡 Dica: Certifica-te que o URL é válido e acessível. Para YouTube, usa o formato: https://youtu.be/VIDEO_ID")
+        log_error('mostrar_leitor_video', e)
+
+
+class _PacoteParcial(Exception):
+    """Pesquisa com fontes fora do prazo ou em erro (não fica na cache)"""
+
+    def __init__(self, pacote: Dict):
+        super().__init__(pacote['tema'])
+        self.pacote = pacote
+
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def _pesquisar_evidencia_completa(tema: str) -> Dict:
+    pacote = pesquisar_fontes(tema, get_api_keys())
+    if pacote['pendentes'] or pacote['erros']:
+        raise _PacoteParcial(pacote)
+    return pacote
+
+
+def pesquisar_evidencia(tema: str) -> Dict:
+    """Consulta PubMed, NewsAPI e Perplexity em paralelo para um tema
+
+    Só os pacotes completos ficam em cache: com uma fonte fora do prazo ou em
+    erro, o pedido seguinte volta a pesquisar. Indica a pergunta semelhante
+    cuja resposta da Perplexity foi reutilizada, se for o caso.
+    """
+    try:
+        pacote = _pesquisar_evidencia_completa(tema)
+    except _PacoteParcial as e:
+        pacote = e.pacote
+        for nome in pacote['pendentes']:
+            st.info(f"⏱️ {nome} não respondeu a tempo; resultados parciais.")
+        for nome, erro in pacote['erros'].items():
+            st.warning(f"⚠️ Erro em {nome}: {erro}")
+    if pacote.get('perplexity_semelhante'):
+        st.caption(f"♻️ Resumo da Perplexity reutilizado da pergunta semelhante: “{pacote['perplexity_semelhante']}”")
+    return pacote
@@ -1,13 +1,45 @@
 """Utils package for Sports Injury AI Studio
+
+Núcleo importável sem Streamlit (geradores, deteção da fonte, clientes das
+APIs). Os objetos abaixo são carregados na primeira utilização: importar
+utils.generators não arrasta requests nem as bases SQLite.
 """
-from .logger import logger, log_api_call, log_error, log_user_action, log_generation
-from .rate_limiter import rate_limiter
-
-__all__ = [
-    'logger',
-    'log_api_call',
-    'log_error',
-    'log_user_action',
-    'log_generation',
-    'rate_limiter'
-]
+from importlib import import_module
+
+# Nome exportado -> módulo que o define
+_EXPORTS = {
+    'logger': 'logger',
+    'log_api_call': 'logger',
+    'log_error': 'logger',
+    'log_user_action': 'logger',
+    'log_generation': 'logger',
+    'rate_limiter': 'rate_limiter',
+    'http_client': 'http_client',
+    'disjuntores': 'disjuntores',
+    'disk_cache': 'disk_cache',
+    'singleflight': 'singleflight',
+    'metrics': 'metrics',
+    'serializer': 'serializer',
+    'webhook_queue': 'webhook_queue',
+    'narrador': 'audio',
+    'rasterizador': 'rasterizador',
+    'historico': 'historico',
+    'aquecedor': 'aquecimento',
+    'perguntas_semelhantes': 'semelhantes',
+    'servidor_videos': 'videos',
+}
+
+
+def __getattr__(nome):
+    if nome not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(import_module(f'.{_EXPORTS[nome]}', __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
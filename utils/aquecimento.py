@@ -0,0 +1,358 @@
+"""Aquecimento da cache para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Uma thread de fundo mantém na cache em disco (disk_cache) as respostas das
+consultas mais procuradas: as lesões comuns (gerar_lesoes_comuns) pesquisadas
+no PubMed, NewsAPI e Perplexity como em pesquisar_fontes(), as perguntas
+rápidas do separador Perplexity e os temas/perguntas mais pedidos pelos
+utilizadores. Cada resposta é obtida antes de alguém a pedir e renovada antes
+de o TTL da fonte expirar, por isso o primeiro pedido encontra-a fresca.
+
+- Prioridade: primeiro as consultas com mais procura. A procura é uma contagem
+  com decaimento exponencial (meia-vida MEIA_VIDA) guardada em SQLite e
+  partilhada pelos processos do host; as consultas de catálogo sem procura
+  vêm no fim.
+- Quotas: o aquecimento tem um orçamento próprio por fonte (FRACAO_QUOTA dos
+  limites do rate limiter) e só consulta uma fonte se o rate limiter global
+  tiver pelo menos RESERVA das vagas livres, para não tirar capacidade aos
+  utilizadores. Fontes com o disjuntor aberto são saltadas.
+- Ocioso: só trabalha depois de OCIOSO_S segundos sem atividade de
+  utilizadores neste processo e, sem nada para renovar, dorme até à próxima
+  expiração.
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from . import sources
+from .article_index import article_index
+from .disjuntores import ABERTO, disjuntores
+from .disk_cache import CACHE_DIR, POLITICA_PADRAO, disk_cache, normalizar
+from .generators import gerar_lesoes_comuns
+from .logger import log_error, logger
+from .metrics import metrics
+from .rate_limiter import RateLimiter, rate_limiter
+from .research import PERGUNTAS_RAPIDAS, pergunta_perplexity
+from .semelhantes import perguntas_semelhantes
+
+# Renovar quando faltar esta fração do TTL
+MARGEM = 0.1
+# Fração dos limites de cada API disponível para o aquecimento
+FRACAO_QUOTA = 0.2
+# Fração das vagas do rate limiter global que tem de estar livre
+RESERVA = 0.5
+# Segundos sem atividade de utilizadores antes de aquecer
+OCIOSO_S = 30.0
+# Espera máxima entre ciclos (para apanhar procura nova) e com a quota esgotada
+INTERVALO_MAX = 300.0
+INTERVALO_QUOTA = 60.0
+# Espera antes de repetir uma consulta que falhou (duplica a cada falha, até ao TTL)
+ESPERA_ERRO = 300.0
+# Número de temas/perguntas mais procurados a manter quentes, além do catálogo
+MAX_PROCURADOS = 20
+MEIA_VIDA = 7 * 86400
+MAX_RESULTADOS = 5
+
+# A procura guarda a soma de 2^((t - EPOCA)/MEIA_VIDA) de cada pedido: a
+# ordem por esta coluna é a ordem pela contagem com decaimento, sem reescrever
+# as linhas antigas
+_EPOCA = 1_760_000_000
+
+
+@dataclass(frozen=True)
+class Consulta:
+    """Pedido a uma fonte, como feito pela app (mesma chave da cache em disco)"""
+    fonte: str
+    texto: str
+    origem: tuple
+
+    def argumentos(self, api_keys: Dict) -> Dict:
+        if self.fonte == 'pubmed':
+            return {'query': self.texto, 'max_results': MAX_RESULTADOS}
+        if self.fonte == 'newsapi':
+            return {'query': self.texto, 'api_key': api_keys.get('newsapi', ''), 'max_results': MAX_RESULTADOS}
+        return {'query': self.texto, 'api_key': api_keys.get('perplexity', '')}
+
+
+# Pedidos às fontes sem as caches à frente (a resposta é escrita depois na cache em disco).
+# A Perplexity é chamada diretamente: renovar com uma resposta semelhante não a renovaria
+FUNCOES = {
+    'pubmed': sources.buscar_pubmed.uncached,
+    'newsapi': sources.buscar_noticias.uncached,
+    'perplexity': sources.perguntar_perplexity,
+}
+
+
+def consultas(tipo: str, texto: str) -> List[Consulta]:
+    """Pedidos feitos para um 'tema' (pesquisa de evidência) ou uma 'pergunta' à Perplexity"""
+    origem = (tipo, texto)
+    if tipo == 'tema':
+        return [Consulta('pubmed', texto, origem), Consulta('newsapi', texto, origem),
+                Consulta('perplexity', pergunta_perplexity(texto), origem)]
+    return [Consulta('perplexity', texto, origem)]
+
+
+def catalogo() -> List[tuple]:
+    """Temas e perguntas mantidos quentes mesmo sem procura registada"""
+    return ([('tema', nome) for nome in gerar_lesoes_comuns()]
+            + [('pergunta', pergunta) for pergunta in PERGUNTAS_RAPIDAS.values()])
+
+
+class Aquecedor:
+    def __init__(self, path=None, ocioso_s: float = OCIOSO_S, fracao_quota: float = FRACAO_QUOTA,
+                 reserva: float = RESERVA, max_procurados: int = MAX_PROCURADOS, cache=None, limitador=None):
+        self.path = Path(path) if path else CACHE_DIR / 'aquecimento.db'
+        self.ocioso_s = ocioso_s
+        self.fracao_quota = fracao_quota
+        self.reserva = reserva
+        self.max_procurados = max_procurados
+        self.cache = cache or disk_cache
+        self.limitador = limitador or rate_limiter
+        self.api_keys = {}
+        self._orcamento = None
+        # chave da cache -> (falhas seguidas, não repetir antes de)
+        self._adiadas = {}
+        self._ultima_atividade = time.monotonic()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._thread = None
+        self._parar = threading.Event()
+        self._arranque_lock = threading.Lock()
+
+    # ---- SQLite ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._init_db()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS procura (
+                    tipo TEXT NOT NULL,
+                    chave TEXT NOT NULL,
+                    texto TEXT NOT NULL,
+                    pontuacao REAL NOT NULL,
+                    pedidos INTEGER NOT NULL,
+                    ultimo REAL NOT NULL,
+                    PRIMARY KEY (tipo, chave)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_procura_pontuacao ON procura(pontuacao);
+            """)
+            conn.close()
+            self._initialized = True
+
+    # ---- Procura e atividade ----
+
+    def marcar_atividade(self):
+        """Um utilizador está ativo: o aquecimento espera por OCIOSO_S sem atividade"""
+        self._ultima_atividade = time.monotonic()
+
+    def registar(self, tipo: str, texto: str):
+        """Conta um pedido de um 'tema' (pesquisa de evidência) ou 'pergunta' (Perplexity)"""
+        self.marcar_atividade()
+        texto = (texto or '').strip()
+        if not texto:
+            return
+        agora = time.time()
+        self._conn().execute(
+            'INSERT INTO procura (tipo, chave, texto, pontuacao, pedidos, ultimo) VALUES (?, ?, ?, ?, 1, ?) '
+            'ON CONFLICT (tipo, chave) DO UPDATE SET texto = excluded.texto, '
+            'pontuacao = pontuacao + excluded.pontuacao, pedidos = pedidos + 1, ultimo = excluded.ultimo',
+            (tipo, normalizar(texto), texto, 2 ** ((agora - _EPOCA) / MEIA_VIDA), agora))
+
+    def procura(self, limite: int = None) -> Dict[tuple, float]:
+        """(tipo, texto) -> pedidos com decaimento, dos mais procurados para os menos"""
+        fator = 2 ** (-(time.time() - _EPOCA) / MEIA_VIDA)
+        linhas = self._conn().execute('SELECT tipo, texto, pontuacao FROM procura ORDER BY pontuacao DESC LIMIT ?',
+                                      (limite or self.max_procurados,))
+        return {(tipo, texto): pontuacao * fator for tipo, texto, pontuacao in linhas}
+
+    # ---- Plano ----
+
+    def plano(self) -> List[Dict]:
+        """Consultas a manter quentes, por prioridade, com o momento (time.time) da próxima renovação"""
+        try:
+            procura = self.procura()
+        except sqlite3.Error as e:
+            log_error('Aquecedor.procura', e)
+            procura = {}
+        origens = dict(procura)
+        vistos = {(tipo, normalizar(texto)) for tipo, texto in origens}
+        for tipo, texto in catalogo():
+            if (tipo, normalizar(texto)) not in vistos:
+                origens[(tipo, texto)] = 0.0
+
+        agora = time.time()
+        itens = []
+        for (tipo, texto), pedidos in origens.items():
+            for consulta in consultas(tipo, texto):
+                argumentos = consulta.argumentos(self.api_keys)
+                if 'api_key' in argumentos and not argumentos['api_key']:
+                    continue
+                chave = self.cache.chave(consulta.fonte, **argumentos)
+                ttl = self.cache.politicas.get(consulta.fonte, POLITICA_PADRAO)['ttl']
+                idade = self.cache.idade(chave)
+                proxima = agora if idade is None else agora + ttl * (1 - MARGEM) - idade
+                adiada = self._adiadas.get(chave)
+                if adiada:
+                    proxima = max(proxima, adiada[1])
+                itens.append({'consulta': consulta, 'chave': chave, 'argumentos': argumentos, 'procura': pedidos,
+                              'idade': idade, 'ttl': ttl, 'proxima': proxima})
+        # Estável: com a mesma procura, fica a ordem do catálogo
+        itens.sort(key=lambda item: -item['procura'])
+        return itens
+
+    # ---- Quotas ----
+
+    def _pode_consultar(self, fonte: str) -> bool:
+        """Há vagas livres no rate limiter global e orçamento do aquecimento para a fonte"""
+        disjuntor = disjuntores.get(fonte)
+        if disjuntor is not None and disjuntor.estado == ABERTO:
+            return False
+        if fonte in self.limitador.limits:
+            if self.limitador.get_usage_stats(fonte)['percentage'] > (1 - self.reserva) * 100:
+                return False
+        if self._orcamento is None:
+            self._orcamento = RateLimiter(':memory:', limits={
+                api: {'calls': max(1, int(limite['calls'] * self.fracao_quota)), 'period': limite['period'],
+                      'wait': 0}
+                for api, limite in self.limitador.limits.items()
+            })
+        return self._orcamento.check_limit(fonte)[0]
+
+    # ---- Renovação ----
+
+    def renovar(self, item: Dict) -> str:
+        """Obtém a resposta na fonte e escreve-a na cache. Retorna 'ok', 'vazio' ou 'erro'"""
+        consulta = item['consulta']
+        inicio = time.perf_counter()
+        try:
+            valor = FUNCOES[consulta.fonte](**item['argumentos'])
+            if valor:
+                self.cache.set(consulta.fonte, item['chave'], valor)
+                if consulta.fonte == 'pubmed':
+                    article_index.indexar(valor)
+                elif consulta.fonte == 'perplexity':
+                    perguntas_semelhantes.adicionar(consulta.texto, item['chave'])
+        except Exception as e:
+            falhas = self._adiadas.get(item['chave'], (0, 0))[0] + 1
+            espera = min(item['ttl'], ESPERA_ERRO * 2 ** (falhas - 1))
+            self._adiadas[item['chave']] = (falhas, time.time() + espera)
+            log_error('Aquecedor.renovar', e)
+            resultado = 'erro'
+        else:
+            self._adiadas.pop(item['chave'], None)
+            resultado = 'ok' if valor else 'vazio'
+        metrics.inc('warmup_refreshes_total', source=consulta.fonte, result=resultado)
+        metrics.observe('warmup_refresh_seconds', time.perf_counter() - inicio, source=consulta.fonte)
+        return resultado
+
+    def ciclo(self) -> float:
+        """Renova, por prioridade, as consultas que o precisam. Retorna os segundos até ao próximo ciclo"""
+        ocioso = time.monotonic() - self._ultima_atividade
+        if ocioso < self.ocioso_s:
+            return self.ocioso_s - ocioso
+        proxima = time.time() + INTERVALO_MAX
+        for item in self.plano():
+            if self._parar.is_set():
+                return 0.0
+            if item['proxima'] > time.time():
+                proxima = min(proxima, item['proxima'])
+                continue
+            ocioso = time.monotonic() - self._ultima_atividade
+            if ocioso < self.ocioso_s:
+                # Um utilizador voltou: cede-lhe as fontes e retoma mais tarde
+                return self.ocioso_s - ocioso
+            fonte = item['consulta'].fonte
+            if not self._pode_consultar(fonte):
+                metrics.inc('warmup_skipped_total', source=fonte)
+                # Tenta de novo quando o rate limiter tiver recuperado uma vaga
+                limite = self.limitador.limits.get(fonte)
+                recuperacao = limite['period'] / limite['calls'] if limite else INTERVALO_QUOTA
+                proxima = min(proxima, time.time() + min(INTERVALO_QUOTA, recuperacao))
+                continue
+            self.renovar(item)
+        return max(1.0, proxima - time.time())
+
+    # ---- Thread ----
+
+    def iniciar(self, api_keys: Dict = None):
+        """Arranca a thread de aquecimento (idempotente)"""
+        if api_keys is not None:
+            self.api_keys = dict(api_keys)
+        with self._arranque_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name='cache-warmup', daemon=True)
+            self._thread.start()
+        logger.info("Aquecimento da cache iniciado")
+
+    def parar(self, timeout: float = 5.0):
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                espera = self.ciclo()
+            except Exception as e:
+                log_error('Aquecedor.ciclo', e)
+                espera = INTERVALO_QUOTA
+            self._parar.wait(espera)
+
+    # ---- Monitorização ----
+
+    def estado(self) -> List[Dict]:
+        """Plano atual para o painel de administração"""
+        agora = time.time()
+        return [{
+            'fonte': item['consulta'].fonte,
+            'consulta': item['consulta'].origem[1][:60],
+            'procura': round(item['procura'], 1),
+            'idade_min': None if item['idade'] is None else round(item['idade'] / 60),
+            'renovar_em_min': max(0, round((item['proxima'] - agora) / 60)),
+        } for item in self.plano()]
+
+    def em_execucao(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+
+# Instância global
+aquecedor = Aquecedor()
+
+
+@metrics.register_collector
+def _estado_aquecimento() -> list:
+    """Consultas em cache dentro do TTL ('quente') e as restantes ('fria'), por fonte"""
+    if not aquecedor.em_execucao():
+        return []
+    contagens = {}
+    for item in aquecedor.plano():
+        estado = 'quente' if item['idade'] is not None and item['idade'] <= item['ttl'] else 'fria'
+        chave = (item['consulta'].fonte, estado)
+        contagens[chave] = contagens.get(chave, 0) + 1
+    return [('warmup_queries', {'source': fonte, 'state': estado}, n, 'gauge')
+            for (fonte, estado), n in contagens.items()]
+
+
+__all__ = ['Aquecedor', 'Consulta', 'aquecedor', 'catalogo', 'consultas']
@@ -0,0 +1,164 @@
+"""Índice local de artigos para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Índice SQLite FTS5 sobre os artigos PubMed já obtidos (PMID, título, autores,
+revista, data). O texto é indexado já normalizado (sem acentos, stopwords
+PT/EN/ES, radicais) e a pesquisa é ordenada por BM25. pesquisar_artigos()
+responde localmente e só consulta o NCBI quando há poucos resultados ou
+estes são demasiado antigos.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from . import sources
+from .disk_cache import CACHE_DIR
+from .logger import log_error
+from .metrics import metrics
+from .textnorm import termos, tokenizar
+
+# Pesos BM25 por coluna: título, autores, revista, ano
+PESOS_BM25 = (10.0, 2.0, 1.0, 0.5)
+MAX_IDADE_PADRAO = 30 * 86400
+
+
+class ArticleIndex:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else CACHE_DIR / 'artigos.db'
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._init_db()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS artigos (
+                    pmid INTEGER PRIMARY KEY,
+                    title TEXT, authors TEXT, journal TEXT, pubdate TEXT, url TEXT,
+                    atualizado REAL NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS artigos_fts USING fts5(
+                    titulo, autores, revista, ano,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+            """)
+            conn.close()
+            self._initialized = True
+
+    def indexar(self, artigos: Iterable[Dict]) -> int:
+        """Insere ou atualiza artigos no índice. Retorna quantos foram indexados"""
+        agora = time.time()
+        linhas = []
+        for artigo in artigos:
+            pmid = str(artigo.get('pmid', ''))
+            if not pmid.isdigit():
+                continue
+            linhas.append((int(pmid), artigo))
+        if not linhas:
+            return 0
+
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for pmid, artigo in linhas:
+                conn.execute(
+                    'INSERT OR REPLACE INTO artigos (pmid, title, authors, journal, pubdate, url, atualizado) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (pmid, artigo.get('title'), artigo.get('authors'), artigo.get('journal'),
+                     artigo.get('pubdate'), artigo.get('url'), agora)
+                )
+                conn.execute('DELETE FROM artigos_fts WHERE rowid = ?', (pmid,))
+                conn.execute(
+                    'INSERT INTO artigos_fts (rowid, titulo, autores, revista, ano) VALUES (?, ?, ?, ?, ?)',
+                    (pmid, ' '.join(termos(artigo.get('title', ''))),
+                     ' '.join(tokenizar(artigo.get('authors', ''))),
+                     ' '.join(tokenizar(artigo.get('journal', ''))),
+                     ' '.join(tokenizar(artigo.get('pubdate', ''))[:1]))
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(linhas)
+
+    def pesquisar(self, query: str, limite: int = 5) -> List[Dict]:
+        """Pesquisa BM25 no índice local
+
+        Cada artigo inclui '_idade_s', '_score' e '_todos' (False nos que só
+        entraram pela pesquisa com qualquer termo).
+        """
+        # Radicais para o título; tokens simples para autores/revista/ano
+        radicais, tokens = termos(query), termos(query, stem=False)
+        if not radicais:
+            return []
+        sql = (
+            'SELECT a.pmid, a.title, a.authors, a.journal, a.pubdate, a.url, a.atualizado, '
+            f'bm25(artigos_fts, {", ".join(map(str, PESOS_BM25))}) AS score '
+            'FROM artigos_fts JOIN artigos a ON a.pmid = artigos_fts.rowid '
+            'WHERE artigos_fts MATCH ? ORDER BY score LIMIT ?'
+        )
+        # Todos os termos primeiro (seletivo e rápido); qualquer termo se não chegar
+        exigir_todos = ' AND '.join(
+            f'("{r}" OR "{t}")' if r != t else f'"{r}"' for r, t in zip(radicais, tokens)
+        )
+        qualquer = ' OR '.join(f'"{p}"' for p in sorted(set(radicais) | set(tokens)))
+        agora = time.time()
+        conn = self._conn()
+        linhas = [(*linha, True) for linha in conn.execute(sql, (exigir_todos, limite)).fetchall()]
+        if len(linhas) < limite:
+            vistos = {linha[0] for linha in linhas}
+            linhas += [(*linha, False) for linha in conn.execute(sql, (qualquer, limite + len(linhas))).fetchall()
+                       if linha[0] not in vistos][:limite - len(linhas)]
+        return [{
+            'pmid': str(pmid), 'title': title, 'authors': authors, 'journal': journal,
+            'pubdate': pubdate, 'url': url, '_idade_s': agora - atualizado, '_score': -score, '_todos': todos
+        } for pmid, title, authors, journal, pubdate, url, atualizado, score, todos in linhas]
+
+    def pesquisar_artigos(self, query: str, max_results: int = 5,
+                          max_idade: float = MAX_IDADE_PADRAO) -> List[Dict]:
+        """Pesquisa local primeiro; recorre ao PubMed numa falha ou com resultados antigos
+
+        Só os artigos com todos os termos contam como acerto local: se foi
+        preciso recorrer a qualquer termo, a pesquisa vai ao PubMed.
+        """
+        try:
+            locais = self.pesquisar(query, max_results)
+        except sqlite3.Error as e:
+            log_error('ArticleIndex.pesquisar', e)
+            locais = []
+        if len(locais) >= max_results and all(a['_todos'] and a['_idade_s'] <= max_idade for a in locais):
+            metrics.inc('article_index_total', result='hit')
+            return [{k: v for k, v in a.items() if not k.startswith('_')} for a in locais]
+
+        metrics.inc('article_index_total', result='miss')
+        artigos = sources.buscar_pubmed(query, max_results)
+        try:
+            self.indexar(artigos)
+        except sqlite3.Error as e:
+            log_error('ArticleIndex.indexar', e)
+        return artigos
+
+    def count(self) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM artigos').fetchone()[0]
+
+
+# Instância global
+article_index = ArticleIndex()
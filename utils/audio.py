@@ -0,0 +1,274 @@
+"""Narração em áudio para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Converte a narração de um roteiro (cenas[].narrador.texto) numa faixa WAV
+temporizada. Cada cena é sintetizada em paralelo por um backend TTS e colocada
+na posição da cena: com silêncio até ao fim da sua 'duracao', ou cortada se a
+fala for mais longa.
+
+Backends (SIA_TTS_BACKEND=gtts|offline força um):
+- gtts: Google Text-to-Speech (pacote gTTS + ffmpeg para descodificar o MP3)
+- offline: sintetizador local e determinístico (tons por palavra), sem rede,
+  para testes e benchmarks; só é usado quando pedido explicitamente (não é
+  fala, não pode substituir o gTTS em silêncio)
+Outros backends podem ser adicionados com registar_backend().
+
+Os clips ficam em cache no disco (PCM WAV, ver cache_ficheiros), indexados
+pelo hash do backend + voz + texto: cenas inalteradas nunca são sintetizadas
+de novo. A faixa é escrita em blocos diretamente no ficheiro, sem juntar o
+áudio em memória.
+"""
+
+import io
+import math
+import os
+import shutil
+import subprocess
+import wave
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+from .cache_ficheiros import CacheFicheiros, chave_conteudo
+from .disk_cache import CACHE_DIR
+from .logger import logger
+from .metrics import metrics
+
+# PCM 16 bits mono a 24 kHz (a taxa nativa do gTTS)
+TAXA = 24000
+LARGURA = 2
+
+# Frames lidas/escritas de cada vez ao montar a faixa (~0,5 s)
+BLOCO_FRAMES = TAXA // 2
+_SILENCIO = bytes(BLOCO_FRAMES * LARGURA)
+
+# Idioma da app -> (língua, variante regional do gTTS)
+IDIOMAS = {
+    'Português': ('pt', 'pt'),
+    'English': ('en', 'co.uk'),
+    'Español': ('es', 'es'),
+}
+
+
+class BackendIndisponivel(RuntimeError):
+    """O backend TTS não pode ser usado neste ambiente (pacote ou binário em falta)"""
+
+
+@dataclass(frozen=True)
+class Voz:
+    idioma: str = 'pt'
+    variante: str = 'pt'
+    tom: str = 'Explicativo'
+
+    @classmethod
+    def para(cls, idioma: str, tom: str = 'Explicativo') -> 'Voz':
+        """Voz de um idioma da app ('Português', 'English', 'Español')"""
+        lingua, variante = IDIOMAS.get(idioma, IDIOMAS['Português'])
+        return cls(lingua, variante, tom)
+
+
+class _Offline:
+    """Um tom por palavra (frequência derivada da palavra), pausas na pontuação"""
+    nome = 'offline'
+
+    # Frequência base por tom de voz (Hz)
+    BASES = {'Explicativo': 180, 'Motivacional': 220, 'Técnico': 150}
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _periodo(frequencia: int) -> array:
+        n = max(2, TAXA // frequencia)
+        return array('h', (int(8000 * math.sin(2 * math.pi * k / n)) for k in range(n)))
+
+    def sintetizar(self, texto: str, voz: Voz) -> bytes:
+        base = self.BASES.get(voz.tom, 180)
+        pcm = array('h')
+        for palavra in texto.split():
+            frequencia = base + zlib.crc32(palavra.lower().encode('utf-8')) % base
+            frames = int(TAXA * min(0.5, max(0.12, 0.06 * len(palavra))))
+            periodo = self._periodo(frequencia)
+            pcm.extend((periodo * (frames // len(periodo) + 1))[:frames])
+            pausa = 0.25 if palavra[-1] in '.,;:!?' else 0.05
+            pcm.frombytes(bytes(int(TAXA * pausa) * LARGURA))
+        return pcm.tobytes()
+
+
+class _GTTS:
+    """gTTS devolve MP3: descodificado para PCM com o ffmpeg"""
+    nome = 'gtts'
+
+    def __init__(self):
+        try:
+            from gtts import gTTS
+        except ImportError as e:
+            raise BackendIndisponivel("pacote gTTS não instalado") from e
+        self._gtts = gTTS
+        self._ffmpeg = shutil.which('ffmpeg')
+        if not self._ffmpeg:
+            raise BackendIndisponivel("gTTS precisa do ffmpeg no PATH para descodificar o MP3")
+
+    def sintetizar(self, texto: str, voz: Voz) -> bytes:
+        mp3 = io.BytesIO()
+        self._gtts(texto, lang=voz.idioma, tld=voz.variante).write_to_fp(mp3)
+        processo = subprocess.run(
+            [self._ffmpeg, '-v', 'error', '-i', 'pipe:0', '-f', 's16le', '-ac', '1', '-ar', str(TAXA), 'pipe:1'],
+            input=mp3.getvalue(), capture_output=True, check=True
+        )
+        return processo.stdout
+
+
+# Por ordem de preferência
+BACKENDS = {'gtts': _GTTS, 'offline': _Offline}
+# Só usados quando pedidos pelo nome
+SO_EXPLICITOS = {'offline'}
+
+
+def registar_backend(nome: str, fabrica):
+    """Regista um backend: fabrica() devolve um objeto com 'nome' e
+    sintetizar(texto, voz) -> PCM 16 bits mono a TAXA Hz"""
+    BACKENDS[nome] = fabrica
+
+
+def escolher_backend(nome: str = None):
+    """O backend pedido ou o primeiro disponível; BackendIndisponivel se nenhum servir"""
+    nome = nome or os.environ.get('SIA_TTS_BACKEND')
+    if nome:
+        if nome not in BACKENDS:
+            raise ValueError(f"backend TTS desconhecido: {nome!r} (disponíveis: {', '.join(BACKENDS)})")
+        return BACKENDS[nome]()
+    motivos = []
+    for nome, fabrica in BACKENDS.items():
+        if nome in SO_EXPLICITOS:
+            continue
+        try:
+            return fabrica()
+        except BackendIndisponivel as e:
+            logger.debug(f"Backend TTS indisponível: {e}")
+            motivos.append(str(e))
+    raise BackendIndisponivel("nenhum backend TTS disponível (" + '; '.join(motivos)
+                              + "); SIA_TTS_BACKEND=offline usa o sintetizador de teste")
+
+
+@dataclass
+class Faixa:
+    """Faixa montada: ficheiro WAV e a posição de cada cena"""
+    path: Path
+    duracao_s: float
+    cenas: List[Dict] = field(default_factory=list)
+    sintetizados: int = 0
+    reutilizados: int = 0
+
+
+def _wav(pcm: bytes) -> bytes:
+    dados = io.BytesIO()
+    with wave.open(dados, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(LARGURA)
+        w.setframerate(TAXA)
+        w.writeframes(pcm)
+    return dados.getvalue()
+
+
+class Narrador:
+    def __init__(self, backend: str = None, cache_dir=None, workers: int = 4,
+                 max_bytes: int = 512 * 1024 * 1024):
+        self._nome_backend = backend
+        self._backend = None
+        self.cache = CacheFicheiros(Path(cache_dir) if cache_dir else CACHE_DIR / 'audio', max_bytes)
+        self.workers = workers
+
+    @property
+    def backend(self):
+        # Escolhido na primeira utilização: importar o módulo não carrega o gTTS
+        if self._backend is None:
+            self._backend = escolher_backend(self._nome_backend)
+        return self._backend
+
+    def chave(self, texto: str, voz: Voz) -> str:
+        return chave_conteudo(self.backend.nome, voz.idioma, voz.variante, voz.tom, texto)
+
+    def sintetizar(self, texto: str, voz: Voz) -> tuple:
+        """(caminho do clip, True se veio da cache)"""
+        chave = self.chave(texto, voz)
+        path = self.cache.obter(chave, 'wav')
+        if path:
+            metrics.inc('tts_clips_total', resultado='cache', backend=self.backend.nome)
+            return path, True
+        with metrics.timer('tts_synthesis_seconds', backend=self.backend.nome):
+            pcm = self.backend.sintetizar(texto, voz)
+        path = self.cache.guardar(chave, 'wav', _wav(pcm))
+        metrics.inc('tts_clips_total', resultado='sintetizado', backend=self.backend.nome)
+        return path, False
+
+    def sintetizar_cenas(self, cenas: List[Dict], idioma: str) -> List[tuple]:
+        """Clip de cada cena, sintetizados em paralelo (textos repetidos uma só vez)"""
+        pedidos = [(cena['narrador']['texto'], Voz.para(idioma, cena['narrador'].get('tom_voz', 'Explicativo')))
+                   for cena in cenas]
+        unicos = list(dict.fromkeys(pedidos))
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(unicos))),
+                                thread_name_prefix='tts') as executor:
+            clips = dict(zip(unicos, executor.map(lambda p: self.sintetizar(*p), unicos)))
+        return [clips[pedido] for pedido in pedidos]
+
+    def renderizar(self, roteiro: Dict, destino) -> Faixa:
+        """Sintetiza e monta a narração de um roteiro em 'destino' (WAV)"""
+        cenas = roteiro['cenas']
+        clips = self.sintetizar_cenas(cenas, roteiro['metadata'].get('idioma', 'Português'))
+        destino = Path(destino)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        faixa = Faixa(destino, 0.0)
+        # Montada ao lado e movida no fim: 'destino' nunca fica com uma faixa a meio
+        parcial = destino.with_name(destino.name + '.parcial')
+        try:
+            with wave.open(str(parcial), 'wb') as saida:
+                saida.setnchannels(1)
+                saida.setsampwidth(LARGURA)
+                saida.setframerate(TAXA)
+                for cena, (clip, reutilizado) in zip(cenas, clips):
+                    self._colocar(saida, cena, clip, reutilizado, faixa)
+            os.replace(parcial, destino)
+        except BaseException:
+            parcial.unlink(missing_ok=True)
+            raise
+        faixa.reutilizados = sum(1 for _, reutilizado in clips if reutilizado)
+        faixa.sintetizados = len(clips) - faixa.reutilizados
+        return faixa
+
+    @staticmethod
+    def _colocar(saida, cena: Dict, clip: Path, reutilizado: bool, faixa: Faixa):
+        """Copia o clip para a faixa em blocos e completa com silêncio até à duração da cena"""
+        alvo = int(cena['duracao'] * TAXA)
+        escritas = 0
+        with wave.open(str(clip), 'rb') as entrada:
+            fala = entrada.getnframes()
+            while escritas < min(fala, alvo):
+                bloco = entrada.readframes(min(BLOCO_FRAMES, alvo - escritas))
+                if not bloco:
+                    break
+                saida.writeframesraw(bloco)
+                escritas += len(bloco) // LARGURA
+        while escritas < alvo:
+            n = min(BLOCO_FRAMES, alvo - escritas)
+            saida.writeframesraw(_SILENCIO[:n * LARGURA])
+            escritas += n
+        faixa.cenas.append({
+            'id': cena['id'],
+            'inicio_s': faixa.duracao_s,
+            'duracao_s': alvo / TAXA,
+            'fala_s': fala / TAXA,
+            'cortada': fala > alvo,
+            'cache': reutilizado,
+        })
+        faixa.duracao_s += alvo / TAXA
+
+
+# Instância global
+narrador = Narrador()
+
+
+__all__ = ['BACKENDS', 'BackendIndisponivel', 'Faixa', 'Narrador', 'TAXA', 'Voz', 'escolher_backend',
+           'narrador', 'registar_backend']
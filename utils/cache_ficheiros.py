@@ -0,0 +1,88 @@
+"""Cache de ficheiros endereçada por conteúdo para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Guarda artefactos gerados (clips de áudio, imagens) num diretório, um ficheiro
+por chave (hash do conteúdo que os produz) em <dir>/<2 primeiros>/<chave>.<ext>.
+A escrita é atómica (ficheiro temporário + rename), por isso vários processos
+podem partilhar o diretório; a leitura de um ficheiro existente atualiza a sua
+data de modificação, usada como último acesso na poda LRU por tamanho. A
+poda percorre o diretório só depois de escritos ~5% de max_bytes desde a
+anterior, não em cada escrita.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .logger import logger
+
+
+def chave_conteudo(*partes: str) -> str:
+    """sha256 das partes (separadas por \\0, para 'ab'+'c' != 'a'+'bc')"""
+    return hashlib.sha256('\0'.join(partes).encode('utf-8')).hexdigest()
+
+
+class CacheFicheiros:
+    def __init__(self, diretorio, max_bytes: int):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max_bytes
+        # Bytes escritos desde a última poda (None: ainda não podada neste processo)
+        self._escritos = None
+        self._lock = threading.Lock()
+
+    def caminho(self, chave: str, extensao: str) -> Path:
+        return self.diretorio / chave[:2] / f'{chave}.{extensao}'
+
+    def obter(self, chave: str, extensao: str) -> Optional[Path]:
+        """Caminho do ficheiro em cache, ou None"""
+        path = self.caminho(chave, extensao)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def guardar(self, chave: str, extensao: str, dados: bytes) -> Path:
+        path = self.caminho(chave, extensao)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dados)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            self._escritos = None if self._escritos is None else self._escritos + len(dados)
+            podar = self._escritos is None or self._escritos >= self.max_bytes // 20
+            if podar:
+                self._escritos = 0
+        if podar:
+            self.podar()
+        return path
+
+    def podar(self):
+        """Remove os ficheiros menos usados enquanto o total exceder max_bytes"""
+        try:
+            ficheiros = [(p.stat(), p) for p in self.diretorio.glob('*/*.*') if p.suffix != '.tmp']
+        except OSError:
+            return
+        total = sum(s.st_size for s, _ in ficheiros)
+        if total <= self.max_bytes:
+            return
+        for estado, path in sorted(ficheiros, key=lambda f: f[0].st_mtime):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= estado.st_size
+            if total <= self.max_bytes:
+                break
+        logger.info(f"Cache {self.diretorio} podada para {total / 1e6:.1f} MB")
+
+
+__all__ = ['CacheFicheiros', 'chave_conteudo']
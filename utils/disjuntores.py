@@ -0,0 +1,207 @@
+"""Disjuntores (circuit breakers) por fonte para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Quando uma API externa se degrada (erros 5xx, timeouts ou respostas muito
+lentas), cada pedido esperaria o timeout completo. O disjuntor da fonte conta
+os resultados numa janela deslizante e, acima dos limites de erros ou de
+pedidos lentos, abre: os pedidos seguintes falham de imediato com
+CircuitoAberto (a cache em disco serve então o último valor guardado). Depois
+da pausa, um único pedido de teste (meio-aberto) decide se fecha ou se volta a
+abrir com o dobro da pausa.
+
+O estado é por processo (todas as sessões Streamlit de um servidor partilham
+os mesmos disjuntores).
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+FECHADO = 'fechado'
+MEIO_ABERTO = 'meio-aberto'
+ABERTO = 'aberto'
+
+# Valor exportado para as métricas (gauge)
+CODIGOS = {FECHADO: 0, MEIO_ABERTO: 1, ABERTO: 2}
+
+POLITICA_PADRAO = {
+    'janela_s': 60.0,     # resultados considerados
+    'min_pedidos': 5,     # abaixo disto nunca abre
+    'taxa_erro': 0.5,     # fração de erros que abre
+    'lento_s': 10.0,      # pedido acima disto conta como lento
+    'taxa_lentos': 0.5,   # fração de pedidos lentos que abre
+    'pausa_s': 30.0,      # tempo aberto antes do pedido de teste
+    'pausa_max_s': 300.0,
+}
+
+# Limites por fonte (o resto vem de POLITICA_PADRAO)
+POLITICAS = {
+    'pubmed': {'lento_s': 5.0},
+    'newsapi': {'lento_s': 5.0},
+    'perplexity': {'lento_s': 20.0},
+}
+
+
+class CircuitoAberto(Exception):
+    """Fonte em falha: o pedido foi recusado sem chamar a API"""
+
+    def __init__(self, fonte: str, restante: float):
+        super().__init__(f"{fonte} temporariamente indisponível (nova tentativa em {int(restante) + 1}s)")
+        self.fonte = fonte
+        self.restante = restante
+
+
+class Disjuntor:
+    def __init__(self, nome: str, **politica):
+        self.nome = nome
+        self.politica = {**POLITICA_PADRAO, **politica}
+        self._lock = threading.Lock()
+        self._resultados = deque()  # (instante, erro, lento)
+        self._erros = 0
+        self._lentos = 0
+        self._estado = FECHADO
+        self._aberto_ate = 0.0
+        self._pausa = self.politica['pausa_s']
+        self._sonda = False
+        self.aberturas = 0
+        self.rejeitados = 0
+
+    def _atualizar(self, agora: float):
+        if self._estado == ABERTO and agora >= self._aberto_ate:
+            self._estado = MEIO_ABERTO
+            self._sonda = False
+
+    def _abrir(self, agora: float, pausa: float):
+        self._estado = ABERTO
+        self._pausa = min(pausa, self.politica['pausa_max_s'])
+        self._aberto_ate = agora + self._pausa
+        self._resultados.clear()
+        self._erros = self._lentos = 0
+        self.aberturas += 1
+
+    def _fechar(self):
+        self._estado = FECHADO
+        self._pausa = self.politica['pausa_s']
+
+    def verificar(self):
+        """Lança CircuitoAberto se o pedido seria recusado (sem ocupar o pedido de teste)"""
+        with self._lock:
+            agora = time.monotonic()
+            self._atualizar(agora)
+            if self._estado == ABERTO or (self._estado == MEIO_ABERTO and self._sonda):
+                self.rejeitados += 1
+                raise CircuitoAberto(self.nome, max(0.0, self._aberto_ate - agora))
+
+    def permitir(self):
+        """Autoriza um pedido (no estado meio-aberto, apenas um de cada vez) ou lança CircuitoAberto
+
+        Cada pedido autorizado tem de ser seguido de registar().
+        """
+        with self._lock:
+            agora = time.monotonic()
+            self._atualizar(agora)
+            if self._estado == FECHADO:
+                return
+            if self._estado == MEIO_ABERTO and not self._sonda:
+                self._sonda = True
+                return
+            self.rejeitados += 1
+            raise CircuitoAberto(self.nome, max(0.0, self._aberto_ate - agora))
+
+    def registar(self, sucesso: bool, duracao: float):
+        """Resultado de um pedido autorizado por permitir()"""
+        lento = duracao > self.politica['lento_s']
+        with self._lock:
+            agora = time.monotonic()
+            if self._estado == MEIO_ABERTO:
+                self._sonda = False
+                if sucesso and not lento:
+                    self._fechar()
+                else:
+                    self._abrir(agora, self._pausa * 2)
+                return
+            if self._estado == ABERTO:
+                return  # pedido iniciado antes de abrir
+
+            erro = not sucesso
+            self._resultados.append((agora, erro, lento))
+            self._erros += erro
+            self._lentos += lento
+            limite = agora - self.politica['janela_s']
+            while self._resultados[0][0] < limite:
+                _, erro_antigo, lento_antigo = self._resultados.popleft()
+                self._erros -= erro_antigo
+                self._lentos -= lento_antigo
+
+            n = len(self._resultados)
+            if n >= self.politica['min_pedidos'] and (
+                    self._erros >= self.politica['taxa_erro'] * n or
+                    self._lentos >= self.politica['taxa_lentos'] * n):
+                self._abrir(agora, self.politica['pausa_s'])
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            self._atualizar(time.monotonic())
+            return self._estado
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            agora = time.monotonic()
+            self._atualizar(agora)
+            return {
+                'estado': self._estado,
+                'pedidos': len(self._resultados),
+                'erros': self._erros,
+                'lentos': self._lentos,
+                'aberturas': self.aberturas,
+                'rejeitados': self.rejeitados,
+                'reabre_em_s': round(max(0.0, self._aberto_ate - agora), 1) if self._estado == ABERTO else 0.0,
+            }
+
+
+class Disjuntores:
+    def __init__(self, politicas: dict = None):
+        self.politicas = {nome: dict(p) for nome, p in (POLITICAS if politicas is None else politicas).items()}
+        self._disjuntores = {}
+        self._lock = threading.Lock()
+
+    def get(self, fonte: str) -> Optional[Disjuntor]:
+        """Disjuntor da fonte, ou None se a fonte não tiver política (ex: webhooks)"""
+        disjuntor = self._disjuntores.get(fonte)
+        if disjuntor is None and fonte in self.politicas:
+            with self._lock:
+                disjuntor = self._disjuntores.get(fonte)
+                if disjuntor is None:
+                    disjuntor = self._disjuntores[fonte] = Disjuntor(fonte, **self.politicas[fonte])
+        return disjuntor
+
+    def verificar(self, fonte: str):
+        """Falha rápida antes de gastar quota: lança CircuitoAberto se a fonte estiver aberta"""
+        disjuntor = self.get(fonte)
+        if disjuntor is not None:
+            disjuntor.verificar()
+
+    def configurar(self, fonte: str, **politica):
+        """Altera os limites de uma fonte (o disjuntor recomeça fechado)"""
+        with self._lock:
+            self.politicas.setdefault(fonte, {}).update(politica)
+            self._disjuntores.pop(fonte, None)
+
+    def repor(self):
+        """Volta a fechar todos os disjuntores"""
+        with self._lock:
+            self._disjuntores.clear()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Estado e contadores por fonte"""
+        return {fonte: self.get(fonte).get_stats() for fonte in self.politicas}
+
+
+# Instância global
+disjuntores = Disjuntores()
+
+
+__all__ = ['CircuitoAberto', 'Disjuntor', 'Disjuntores', 'disjuntores', 'ABERTO', 'FECHADO', 'MEIO_ABERTO',
+           'CODIGOS']
@@ -0,0 +1,258 @@
+"""Cache persistente de respostas para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Cache em SQLite partilhada por todos os processos do mesmo host. As entradas
+são indexadas pela consulta normalizada + parâmetros, expiram com um TTL por
+fonte e são removidas por ordem de último acesso (LRU) quando o tamanho total
+excede o limite. Depois do TTL, uma entrada ainda é servida durante a janela
+'stale' enquanto é atualizada em segundo plano. Com o disjuntor da fonte
+aberto (CircuitoAberto), é servido o último valor guardado, seja qual for a
+idade.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from pathlib import Path
+
+from .disjuntores import CircuitoAberto
+from .logger import logger, log_error
+
+CACHE_DIR = Path(os.environ.get('SIA_CACHE_DIR', 'cache'))
+
+# TTL e janela stale-while-revalidate por fonte (segundos)
+POLITICAS = {
+    'pubmed': {'ttl': 86400, 'stale': 7 * 86400},
+    'newsapi': {'ttl': 3600, 'stale': 86400},
+    'perplexity': {'ttl': 21600, 'stale': 3 * 86400},
+}
+POLITICA_PADRAO = {'ttl': 1800, 'stale': 0}
+
+# Argumentos que não fazem parte da chave (segredos)
+ARGS_IGNORADOS = ('api_key',)
+
+
+def normalizar(valor):
+    """Normaliza consultas para que variações triviais partilhem a mesma entrada"""
+    if isinstance(valor, str):
+        return ' '.join(valor.lower().split())
+    return valor
+
+
+class DiskCache:
+    def __init__(self, path=None, max_bytes: int = 256 * 1024 * 1024, politicas: dict = None):
+        self.path = Path(path) if path else CACHE_DIR / 'respostas.db'
+        self.max_bytes = max_bytes
+        self.politicas = {**POLITICAS, **(politicas or {})}
+        self._local = threading.local()
+        self._stats = defaultdict(lambda: defaultdict(int))
+        self._stats_lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # ---- SQLite ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._init_db()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entradas (
+                    chave TEXT PRIMARY KEY,
+                    fonte TEXT NOT NULL,
+                    valor TEXT NOT NULL,
+                    criado REAL NOT NULL,
+                    acedido REAL NOT NULL,
+                    tamanho INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_entradas_acedido ON entradas(acedido);
+            """)
+            conn.close()
+            self._initialized = True
+
+    # ---- API ----
+
+    def chave(self, fonte: str, *args, **kwargs) -> str:
+        """Chave estável a partir da fonte e dos parâmetros normalizados"""
+        dados = [fonte, [normalizar(a) for a in args],
+                 {k: normalizar(v) for k, v in sorted(kwargs.items()) if k not in ARGS_IGNORADOS}]
+        return hashlib.sha256(json.dumps(dados, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get(self, fonte: str, chave: str):
+        """Retorna (valor, estado) com estado em 'fresh', 'stale' ou 'miss'"""
+        politica = self.politicas.get(fonte, POLITICA_PADRAO)
+        agora = time.time()
+        row = self._conn().execute(
+            'SELECT valor, criado FROM entradas WHERE chave = ?', (chave,)
+        ).fetchone()
+        if row is None:
+            self._contar(fonte, 'misses')
+            return None, 'miss'
+        idade = agora - row[1]
+        if idade > politica['ttl'] + politica['stale']:
+            self._contar(fonte, 'misses')
+            return None, 'miss'
+        self._conn().execute('UPDATE entradas SET acedido = ? WHERE chave = ?', (agora, chave))
+        estado = 'fresh' if idade <= politica['ttl'] else 'stale'
+        self._contar(fonte, 'hits' if estado == 'fresh' else 'stale_hits')
+        return json.loads(row[0]), estado
+
+    def idade(self, chave: str):
+        """Segundos desde a escrita da entrada, ou None se não existir (não conta como acesso)"""
+        row = self._conn().execute('SELECT criado FROM entradas WHERE chave = ?', (chave,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def ultimo(self, fonte: str, chave: str):
+        """Último valor guardado, mesmo fora da janela stale, ou None (fonte indisponível)"""
+        row = self._conn().execute('SELECT valor FROM entradas WHERE chave = ?', (chave,)).fetchone()
+        if row is None:
+            return None
+        self._contar(fonte, 'fallbacks')
+        return json.loads(row[0])
+
+    def set(self, fonte: str, chave: str, valor):
+        agora = time.time()
+        dados = json.dumps(valor, ensure_ascii=False)
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO entradas (chave, fonte, valor, criado, acedido, tamanho) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (chave, fonte, dados, agora, agora, len(dados))
+        )
+        self._contar(fonte, 'writes')
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Remove as entradas menos recentemente acedidas até caber no limite"""
+        total = conn.execute('SELECT COALESCE(SUM(tamanho), 0) FROM entradas').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excesso = total - self.max_bytes
+        removidos = 0
+        for chave, tamanho in conn.execute(
+            'SELECT chave, tamanho FROM entradas ORDER BY acedido'
+        ).fetchall():
+            conn.execute('DELETE FROM entradas WHERE chave = ?', (chave,))
+            removidos += tamanho
+            self._contar('_total', 'evictions')
+            if removidos >= excesso:
+                break
+
+    def _refresh(self, fonte: str, chave: str, func, args, kwargs):
+        with self._refresh_lock:
+            if chave in self._refreshing:
+                return
+            self._refreshing.add(chave)
+
+        def tarefa():
+            try:
+                valor = func(*args, **kwargs)
+                if valor:
+                    self.set(fonte, chave, valor)
+                self._contar(fonte, 'refreshes')
+            except CircuitoAberto:
+                pass  # a entrada stale continua a ser servida
+            except Exception as e:
+                log_error('DiskCache.refresh', e)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(chave)
+
+        self._executor.submit(tarefa)
+
+    def cached(self, fonte: str):
+        """Decorador: serve da cache em disco e só chama a função numa falha
+        Resultados vazios não são guardados (podem ser quota esgotada). Se a
+        função lançar CircuitoAberto, devolve o último valor guardado.
+        """
+        def decorator(func):
+            assinatura = inspect.signature(func)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = assinatura.bind(*args, **kwargs)
+                bound.apply_defaults()
+                chave = self.chave(fonte, **bound.arguments)
+                try:
+                    valor, estado = self.get(fonte, chave)
+                except sqlite3.Error as e:
+                    log_error('DiskCache.get', e)
+                    valor, estado = None, 'miss'
+                if estado == 'fresh':
+                    return valor
+                if estado == 'stale':
+                    self._refresh(fonte, chave, func, args, kwargs)
+                    return valor
+                try:
+                    valor = func(*args, **kwargs)
+                except CircuitoAberto:
+                    try:
+                        anterior = self.ultimo(fonte, chave)
+                    except sqlite3.Error:
+                        anterior = None
+                    if anterior is None:
+                        raise
+                    return anterior
+                if valor:
+                    try:
+                        self.set(fonte, chave, valor)
+                    except sqlite3.Error as e:
+                        log_error('DiskCache.set', e)
+                return valor
+
+            wrapper.uncached = func
+            return wrapper
+        return decorator
+
+    # ---- Monitorização ----
+
+    def _contar(self, fonte: str, evento: str):
+        with self._stats_lock:
+            self._stats[fonte][evento] += 1
+
+    def get_stats(self) -> dict:
+        """Contadores de hits/misses por fonte e ocupação da cache"""
+        with self._stats_lock:
+            stats = {fonte: dict(eventos) for fonte, eventos in self._stats.items()}
+        try:
+            entradas, tamanho = self._conn().execute(
+                'SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM entradas'
+            ).fetchone()
+        except sqlite3.Error:
+            entradas, tamanho = 0, 0
+        for eventos in stats.values():
+            pedidos = eventos.get('hits', 0) + eventos.get('stale_hits', 0) + eventos.get('misses', 0)
+            eventos['hit_ratio'] = ((eventos.get('hits', 0) + eventos.get('stale_hits', 0)) / pedidos) if pedidos else 0
+        return {'fontes': stats, 'entradas': entradas, 'bytes': tamanho, 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        self._conn().execute('DELETE FROM entradas')
+        logger.info('Disk cache cleared')
+
+
+# Instância global
+disk_cache = DiskCache()
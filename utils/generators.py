@@ -0,0 +1,74 @@
+"""Geradores de conteúdo para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Funções de geração de infográficos e roteiros de vídeo, separadas da UI
+Streamlit para poderem ser importadas por app.py e pelo modo batch. Quando o
+tema corresponde a uma lesão da base de conhecimento, as secções e cenas são
+preenchidas com conteúdo real em vez de placeholders. A estrutura vem de um
+protótipo compilado (utils.templates) a que só se juntam os campos variáveis.
+"""
+
+from datetime import datetime
+
+from .identificadores import classificar
+from .knowledge_base import knowledge_base
+from .research import resumo_evidencia
+from .templates import compilar_infografico, compilar_roteiro
+
+
+def validar_pubmed_id(texto):
+    """Valida se o texto contém um PubMed ID (rotulado, num URL do PubMed ou número de 7 a 9 dígitos em contexto)"""
+    return bool(classificar(texto).pmids)
+
+
+def extrair_tipo_fonte(texto):
+    """Identifica o tipo de fonte fornecida. Retorna (nome, ícone)"""
+    return classificar(texto).rotulo
+
+
+def gerar_lesoes_comuns():
+    """Retorna lista de lesões desportivas comuns para quick selection"""
+    return knowledge_base.nomes()[:10]
+
+
+def _lesao(fonte, tema):
+    """Índice na base de conhecimento da lesão correspondente ao tema (ou à fonte)"""
+    indice = knowledge_base.encontrar_indice(tema)
+    return indice if indice is not None else knowledge_base.encontrar_indice(fonte)
+
+
+# Função para gerar estrutura de infográfico
+def gerar_estrutura_infografico(fonte, tema, publico, idioma, nivel_detalhe, pesquisa=None, data_criacao=None):
+    """Gera estrutura JSON para infográfico
+    Se for dado um pacote de pesquisa, 'fonte_dados' contém a evidência recolhida.
+    As partes fixas da estrutura são partilhadas e só de leitura (ver utils.templates).
+    """
+    prototipo = compilar_infografico(publico, idioma, nivel_detalhe, _lesao(fonte, tema), knowledge_base.versao())
+    return prototipo.instanciar({
+        "tema": tema,
+        "data_criacao": data_criacao or datetime.now().isoformat(),
+        "fonte_dados": resumo_evidencia(fonte, pesquisa) if pesquisa else fonte
+    })
+
+
+# Função para gerar roteiro de vídeo
+def gerar_roteiro_video(fonte, tema, publico, idioma, duracao, tom, pesquisa=None, data_criacao=None):
+    """Gera roteiro JSON para vídeo
+    Se for dado um pacote de pesquisa, 'fonte_dados' contém a evidência recolhida.
+    As partes fixas da estrutura são partilhadas e só de leitura (ver utils.templates).
+    """
+    prototipo = compilar_roteiro(publico, idioma, duracao, tom, _lesao(fonte, tema), knowledge_base.versao())
+    return prototipo.instanciar({
+        "tema": tema,
+        "data_criacao": data_criacao or datetime.now().isoformat(),
+        "fonte_dados": resumo_evidencia(fonte, pesquisa) if pesquisa else fonte
+    })
+
+
+__all__ = [
+    'validar_pubmed_id',
+    'extrair_tipo_fonte',
+    'gerar_lesoes_comuns',
+    'gerar_estrutura_infografico',
+    'gerar_roteiro_video'
+]
@@ -0,0 +1,321 @@
+"""Histórico de gerações para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Guarda em SQLite cada infográfico/roteiro gerado, indexado pelo hash das
+entradas normalizadas (tipo, fonte, tema, público, idioma, nível/duração, tom
+e se houve pesquisa) e da versão dos templates e da base de conhecimento. Um
+pedido repetido é servido do histórico em vez de ser gerado (e pesquisado) de
+novo; com pesquisa, só enquanto a evidência tiver menos de TTL_PESQUISA.
+Gerações com fontes de pesquisa em falta não são guardadas.
+
+Os documentos são guardados comprimidos (zlib) e endereçados pelo hash do
+próprio conteúdo: gerações diferentes com o mesmo resultado partilham uma
+única cópia. A data de criação não entra no hash; é reposta a partir da
+geração ao ler.
+
+A listagem filtra por tipo, lesão, público, idioma e texto do tema (FTS5) e
+pagina por cursor (o último id: os ids crescem com a data de criação) sobre
+os índices de cada filtro ou a ordem do próprio índice FTS, por isso o custo
+de uma página não cresce com a posição nem com o tamanho do histórico.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .disk_cache import CACHE_DIR, normalizar
+from .knowledge_base import knowledge_base
+from .logger import log_error
+from .metrics import metrics
+from .serializer import serializer
+from .singleflight import singleflight
+from .templates import VERSAO as VERSAO_TEMPLATES
+from .textnorm import termos
+
+# Idade máxima de uma geração com pesquisa para ser reutilizada (segundos)
+TTL_PESQUISA = 86400
+
+# Campos das entradas que identificam um pedido (os restantes são ignorados)
+CAMPOS_ENTRADA = ('fonte', 'tema', 'publico', 'idioma', 'nivel', 'duracao', 'tom')
+
+# Filtros de listar() -> coluna
+FILTROS = {'tipo': 'tipo', 'lesao': 'lesao_id', 'publico': 'publico', 'idioma': 'idioma'}
+
+COMPRESSAO_NIVEL = 6
+
+
+def versao() -> str:
+    """Versão dos templates e da base de conhecimento: uma geração antiga não serve depois de mudarem"""
+    return f'{VERSAO_TEMPLATES}:{knowledge_base.versao()}'
+
+
+def chave(tipo: str, entradas: Dict, pesquisa: bool = False) -> str:
+    """Hash das entradas normalizadas de um pedido (e da versão atual)"""
+    partes = [versao(), tipo, '1' if pesquisa else '0']
+    partes.extend(str(normalizar(entradas.get(campo)) or '') for campo in CAMPOS_ENTRADA)
+    return hashlib.sha256('\0'.join(partes).encode('utf-8')).hexdigest()
+
+
+def _sem_data(documento: Dict) -> Dict:
+    metadata = dict(documento.get('metadata') or {})
+    metadata.pop('data_criacao', None)
+    return {**documento, 'metadata': metadata}
+
+
+def _incompleto(documento: Dict) -> bool:
+    """Gerado com um pacote de pesquisa parcial (fontes fora do prazo ou em erro)"""
+    fonte_dados = (documento.get('integracao') or {}).get('fonte_dados')
+    return isinstance(fonte_dados, dict) and bool(fonte_dados.get('fontes_incompletas'))
+
+
+def _com_data(documento: Dict, criado: float) -> Dict:
+    documento['metadata']['data_criacao'] = datetime.fromtimestamp(criado).isoformat()
+    return documento
+
+
+class Historico:
+    def __init__(self, path=None, ttl_pesquisa: float = TTL_PESQUISA):
+        self.path = Path(path) if path else CACHE_DIR / 'historico.db'
+        self.ttl_pesquisa = ttl_pesquisa
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # ---- SQLite ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._init_db()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documentos (
+                    hash TEXT PRIMARY KEY,
+                    dados BLOB NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    bytes_comprimidos INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS geracoes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chave TEXT NOT NULL UNIQUE,
+                    tipo TEXT NOT NULL,
+                    tema TEXT NOT NULL,
+                    lesao_id TEXT,
+                    publico TEXT,
+                    idioma TEXT,
+                    pesquisa INTEGER NOT NULL,
+                    criado REAL NOT NULL,
+                    acessos INTEGER NOT NULL DEFAULT 0,
+                    documento TEXT NOT NULL REFERENCES documentos(hash)
+                );
+                -- Cada índice termina implicitamente no id: filtro + ordem + cursor
+                CREATE INDEX IF NOT EXISTS geracoes_tipo ON geracoes(tipo);
+                CREATE INDEX IF NOT EXISTS geracoes_lesao ON geracoes(lesao_id);
+                CREATE INDEX IF NOT EXISTS geracoes_publico ON geracoes(publico);
+                CREATE INDEX IF NOT EXISTS geracoes_idioma ON geracoes(idioma);
+                CREATE INDEX IF NOT EXISTS geracoes_documento ON geracoes(documento);
+                CREATE VIRTUAL TABLE IF NOT EXISTS geracoes_fts USING fts5(
+                    tema, tokenize = 'unicode61 remove_diacritics 2'
+                );
+            """)
+            conn.close()
+            self._initialized = True
+
+    # ---- Escrita e leitura ----
+
+    def guardar(self, tipo: str, entradas: Dict, documento: Dict, pesquisa: bool = False) -> int:
+        """Guarda uma geração (substitui a anterior com as mesmas entradas). Retorna o id"""
+        k = chave(tipo, entradas, pesquisa)
+        dados = serializer.dumps(_sem_data(documento))
+        hash_doc = hashlib.sha256(dados).hexdigest()
+        comprimido = zlib.compress(dados, COMPRESSAO_NIVEL)
+        metadata = documento.get('metadata') or {}
+        tema = str(entradas.get('tema') or metadata.get('titulo') or '')
+
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            anterior = conn.execute('SELECT id, documento FROM geracoes WHERE chave = ?', (k,)).fetchone()
+            if anterior:
+                self._remover(conn, *anterior)
+            conn.execute('INSERT OR IGNORE INTO documentos VALUES (?, ?, ?, ?)',
+                         (hash_doc, comprimido, len(dados), len(comprimido)))
+            cursor = conn.execute(
+                'INSERT INTO geracoes (chave, tipo, tema, lesao_id, publico, idioma, pesquisa, criado, documento) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (k, tipo, tema, metadata.get('lesao_id'), entradas.get('publico'), entradas.get('idioma'),
+                 int(pesquisa), time.time(), hash_doc))
+            gid = cursor.lastrowid
+            conn.execute('INSERT INTO geracoes_fts (rowid, tema) VALUES (?, ?)', (gid, ' '.join(termos(tema))))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return gid
+
+    @staticmethod
+    def _remover(conn, gid: int, hash_doc: str):
+        conn.execute('DELETE FROM geracoes WHERE id = ?', (gid,))
+        conn.execute('DELETE FROM geracoes_fts WHERE rowid = ?', (gid,))
+        # O documento só sai quando nenhuma geração o referencia
+        conn.execute('DELETE FROM documentos WHERE hash = ? AND NOT EXISTS '
+                     '(SELECT 1 FROM geracoes WHERE documento = ?)', (hash_doc, hash_doc))
+
+    def _ler(self, linha) -> Dict:
+        gid, criado, dados = linha
+        return _com_data(serializer.loads(zlib.decompress(dados)), criado)
+
+    def obter(self, tipo: str, entradas: Dict, pesquisa: bool = False) -> Optional[Dict]:
+        """Documento de um pedido já gerado, ou None (também se a pesquisa expirou)"""
+        conn = self._conn()
+        linha = conn.execute(
+            'SELECT g.id, g.criado, d.dados FROM geracoes g JOIN documentos d ON d.hash = g.documento '
+            'WHERE g.chave = ?', (chave(tipo, entradas, pesquisa),)).fetchone()
+        if linha is None or (pesquisa and time.time() - linha[1] > self.ttl_pesquisa):
+            metrics.inc('history_lookups_total', resultado='miss', tipo=tipo)
+            return None
+        conn.execute('UPDATE geracoes SET acessos = acessos + 1 WHERE id = ?', (linha[0],))
+        metrics.inc('history_lookups_total', resultado='hit', tipo=tipo)
+        return self._ler(linha)
+
+    def obter_ou_gerar(self, tipo: str, entradas: Dict, gerar: Callable[[], Dict],
+                       pesquisa: bool = False) -> Tuple[Dict, bool]:
+        """(documento, veio do histórico): gera e guarda só se ainda não existir
+
+        Pedidos iguais em simultâneo (várias sessões) geram uma só vez. Uma
+        geração com fontes de pesquisa em falta é devolvida mas não guardada:
+        o pedido seguinte volta a pesquisar.
+        """
+        documento = self.obter(tipo, entradas, pesquisa)
+        if documento is not None:
+            return documento, True
+
+        def gerar_e_guardar():
+            gerado = gerar()
+            if _incompleto(gerado):
+                return gerado
+            try:
+                self.guardar(tipo, entradas, gerado, pesquisa)
+            except sqlite3.Error as e:
+                # Sem histórico (ex: disco cheio) a geração continua a ser devolvida
+                log_error('historico.guardar', e)
+            return gerado
+
+        return singleflight.do(('historico', chave(tipo, entradas, pesquisa)), gerar_e_guardar), False
+
+    def documento(self, gid: int) -> Optional[Dict]:
+        linha = self._conn().execute(
+            'SELECT g.id, g.criado, d.dados FROM geracoes g JOIN documentos d ON d.hash = g.documento '
+            'WHERE g.id = ?', (gid,)).fetchone()
+        return self._ler(linha) if linha else None
+
+    def remover(self, gid: int) -> bool:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            linha = conn.execute('SELECT id, documento FROM geracoes WHERE id = ?', (gid,)).fetchone()
+            if linha:
+                self._remover(conn, *linha)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return linha is not None
+
+    # ---- Listagem ----
+
+    @staticmethod
+    def _filtros(filtros: Dict) -> Tuple[List[str], List]:
+        condicoes, params = [], []
+        for nome, valor in filtros.items():
+            if nome not in FILTROS:
+                raise ValueError(f"filtro inválido: {nome!r} (disponíveis: {', '.join(FILTROS)})")
+            if valor:
+                condicoes.append(f'g.{FILTROS[nome]} = ?')
+                params.append(valor)
+        return condicoes, params
+
+    @staticmethod
+    def _consulta(texto: str = None) -> str:
+        """Consulta FTS5: todos os termos do texto, como prefixos"""
+        return ' '.join(f'"{t}"*' for t in termos(texto or ''))
+
+    def listar(self, limite: int = 20, cursor: int = None, texto: str = None,
+               **filtros) -> Tuple[List[Dict], Optional[int]]:
+        """Página de gerações, da mais recente para a mais antiga
+
+        Retorna (itens, cursor da página seguinte ou None). Os itens têm só os
+        metadados; o documento lê-se com documento(id).
+        """
+        condicoes, params = self._filtros(filtros)
+        consulta = self._consulta(texto)
+        if consulta:
+            # Percorre o índice FTS por rowid decrescente e pára ao encher a página,
+            # em vez de ordenar todas as correspondências
+            origem, ordem = 'geracoes_fts f JOIN geracoes g ON g.id = f.rowid', 'f.rowid'
+            condicoes.insert(0, 'geracoes_fts MATCH ?')
+            params.insert(0, consulta)
+        else:
+            origem, ordem = 'geracoes g', 'g.id'
+        if cursor:
+            condicoes.append(f'{ordem} < ?')
+            params.append(cursor)
+        onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+        linhas = self._conn().execute(
+            'SELECT g.id, g.tipo, g.tema, g.lesao_id, g.publico, g.idioma, g.pesquisa, g.criado, g.acessos, '
+            f'd.bytes, d.bytes_comprimidos FROM {origem} JOIN documentos d ON d.hash = g.documento {onde} '
+            f'ORDER BY {ordem} DESC LIMIT ?', (*params, limite + 1)).fetchall()
+        campos = ('id', 'tipo', 'tema', 'lesao_id', 'publico', 'idioma', 'pesquisa', 'criado', 'acessos',
+                  'bytes', 'bytes_comprimidos')
+        itens = [dict(zip(campos, linha)) for linha in linhas[:limite]]
+        seguinte = itens[-1]['id'] if len(linhas) > limite else None
+        return itens, seguinte
+
+    def contar(self, texto: str = None, **filtros) -> int:
+        condicoes, params = self._filtros(filtros)
+        consulta = self._consulta(texto)
+        if consulta:
+            condicoes.append('g.id IN (SELECT rowid FROM geracoes_fts WHERE geracoes_fts MATCH ?)')
+            params.append(consulta)
+        onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+        return self._conn().execute(f'SELECT COUNT(*) FROM geracoes g {onde}', params).fetchone()[0]
+
+    def valores(self, filtro: str) -> List[str]:
+        """Valores distintos de um filtro (para as caixas de seleção)"""
+        coluna = FILTROS[filtro]
+        return [v for (v,) in self._conn().execute(
+            f'SELECT DISTINCT {coluna} FROM geracoes WHERE {coluna} IS NOT NULL ORDER BY {coluna}')]
+
+    def estatisticas(self) -> Dict:
+        conn = self._conn()
+        geracoes, acessos = conn.execute('SELECT COUNT(*), COALESCE(SUM(acessos), 0) FROM geracoes').fetchone()
+        documentos, brutos, comprimidos = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(bytes), 0), COALESCE(SUM(bytes_comprimidos), 0) FROM documentos'
+        ).fetchone()
+        return {'geracoes': geracoes, 'documentos': documentos, 'reutilizacoes': acessos,
+                'bytes': brutos, 'bytes_comprimidos': comprimidos}
+
+
+# Instância global
+historico = Historico()
+
+
+__all__ = ['Historico', 'TTL_PESQUISA', 'chave', 'historico']
@@ -0,0 +1,262 @@
+"""Cliente HTTP partilhado para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Mantém uma sessão keep-alive por endpoint externo (PubMed, NewsAPI,
+Perplexity, vídeos remotos, webhooks) com pool de ligações limitado, timeouts por endpoint e
+retry com backoff exponencial em respostas 429/5xx. O requests só é
+importado quando a primeira sessão é criada.
+
+Cada pedido passa pelo disjuntor da fonte (disjuntores.py): com a fonte em
+falha, o pedido é recusado de imediato com CircuitoAberto. Nos endpoints com
+'hedge' (GETs idempotentes ao eutils e à NewsAPI), um pedido que demora mais
+do que o p95 recente do endpoint é repetido em paralelo e fica a resposta que
+chegar primeiro; as repetições consomem uma vaga do rate limiter e estão
+limitadas a HEDGE_MAX_FRACAO dos pedidos.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from copy import deepcopy
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .disjuntores import disjuntores
+from .rate_limiter import rate_limiter
+
+if TYPE_CHECKING:
+    import requests
+
+# Configuração por endpoint. 'base_url' pode ser substituído (ex: servidor stub local)
+ENDPOINTS = {
+    'pubmed': {
+        'base_url': 'https://eutils.ncbi.nlm.nih.gov',
+        'timeout': (3.05, 10),  # (connect, read) em segundos
+        'retries': 3,
+        'methods': ['GET', 'POST'],  # POST apenas para epost (idempotente)
+        'hedge': True,
+    },
+    'newsapi': {
+        'base_url': 'https://newsapi.org',
+        'timeout': (3.05, 10),
+        'retries': 2,
+        'methods': ['GET'],
+        'hedge': True,
+    },
+    'perplexity': {
+        'base_url': 'https://api.perplexity.ai',
+        'timeout': (3.05, 30),
+        'retries': 1,
+        'methods': ['POST'],
+    },
+    # Vídeos remotos retransmitidos por videos.py: URL completo por pedido
+    'video': {
+        'base_url': '',
+        'timeout': (3.05, 30),
+        'retries': 1,
+        'methods': ['GET', 'HEAD'],
+    },
+    # Webhooks Make.com/Activepieces: URL completo por pedido; as repetições
+    # são feitas pela fila (webhook_queue), não pelo adapter
+    'webhook': {
+        'base_url': '',
+        'timeout': (3.05, 15),
+        'retries': 0,
+        'methods': ['POST'],
+    },
+}
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Hedging: latências recentes guardadas por endpoint, mínimo de amostras antes
+# de repetir pedidos, atraso mínimo e fração máxima de pedidos repetidos
+HEDGE_AMOSTRAS = 200
+HEDGE_MIN_AMOSTRAS = 20
+HEDGE_MIN_S = 0.05
+HEDGE_MAX_FRACAO = 0.1
+
+
+def _descartar(futuro):
+    """Liberta a ligação da resposta que chegou em segundo lugar"""
+    if not futuro.cancelled() and futuro.exception() is None:
+        futuro.result().close()
+
+
+class HttpClient:
+    def __init__(self, endpoints: dict = None, pool_maxsize: int = 10, backoff_factor: float = 0.5):
+        self.endpoints = deepcopy(endpoints if endpoints is not None else ENDPOINTS)
+        self.pool_maxsize = pool_maxsize
+        self.backoff_factor = backoff_factor
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._latencias = defaultdict(lambda: deque(maxlen=HEDGE_AMOSTRAS))
+        self._hedge_stats = defaultdict(lambda: {'pedidos': 0, 'hedges': 0, 'ganhos': 0})
+        self._stats_lock = threading.Lock()
+        self._executor = None
+
+    def configure(self, nome: str, **opcoes):
+        """Altera a configuração de um endpoint (ex: base_url de um stub)
+        A sessão existente é descartada para aplicar as novas opções.
+        """
+        with self._lock:
+            self.endpoints.setdefault(nome, {}).update(opcoes)
+            session = self._sessions.pop(nome, None)
+        if session is not None:
+            session.close()
+
+    def _criar_sessao(self, config: dict) -> 'requests.Session':
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=config.get('retries', 2),
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset(config.get('methods', ['GET'])),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def session(self, nome: str) -> 'requests.Session':
+        """Retorna a sessão keep-alive do endpoint (criada na primeira utilização)"""
+        session = self._sessions.get(nome)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(nome)
+                if session is None:
+                    session = self._criar_sessao(self.endpoints[nome])
+                    self._sessions[nome] = session
+        return session
+
+    def url(self, nome: str, path: str) -> str:
+        return self.endpoints[nome]['base_url'].rstrip('/') + '/' + path.lstrip('/')
+
+    def request(self, nome: str, method: str, path: str, hedge: bool = None, **kwargs) -> 'requests.Response':
+        """Executa um pedido HTTP através da sessão do endpoint
+
+        hedge=None segue a configuração do endpoint; só GETs sem stream são repetidos.
+        Lança CircuitoAberto se o disjuntor da fonte estiver aberto.
+        """
+        config = self.endpoints[nome]
+        kwargs.setdefault('timeout', config.get('timeout', 10))
+        url = self.url(nome, path)
+        if hedge is None:
+            hedge = config.get('hedge', False)
+        hedge = hedge and method == 'GET' and not kwargs.get('stream')
+
+        disjuntor = disjuntores.get(nome)
+        if disjuntor is None:
+            return self._enviar(nome, method, url, hedge, kwargs)
+        disjuntor.permitir()
+        inicio = time.monotonic()
+        try:
+            response = self._enviar(nome, method, url, hedge, kwargs)
+        except BaseException:
+            disjuntor.registar(False, time.monotonic() - inicio)
+            raise
+        disjuntor.registar(response.status_code < 500, time.monotonic() - inicio)
+        return response
+
+    def _enviar(self, nome: str, method: str, url: str, hedge: bool, kwargs: dict) -> 'requests.Response':
+        if hedge:
+            return self._com_hedge(nome, url, kwargs)
+        return self.session(nome).request(method, url, **kwargs)
+
+    # ---- Hedging ----
+
+    def _atraso_hedge(self, nome: str) -> Optional[float]:
+        """p95 das latências recentes do endpoint, ou None com poucas amostras"""
+        amostras = sorted(self._latencias[nome])
+        if len(amostras) < HEDGE_MIN_AMOSTRAS:
+            return None
+        return max(HEDGE_MIN_S, amostras[int(0.95 * (len(amostras) - 1))])
+
+    def _com_hedge(self, nome: str, url: str, kwargs: dict) -> 'requests.Response':
+        """GET que é repetido em paralelo se não responder dentro do p95; devolve a primeira resposta válida"""
+        session = self.session(nome)
+        latencias = self._latencias[nome]
+        stats = self._hedge_stats[nome]
+
+        def tentativa():
+            inicio = time.monotonic()
+            response = session.request('GET', url, **kwargs)
+            if response.status_code < 500:
+                latencias.append(time.monotonic() - inicio)
+            return response
+
+        atraso = self._atraso_hedge(nome)
+        with self._stats_lock:
+            stats['pedidos'] += 1
+        if atraso is None:
+            return tentativa()
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='http-hedge')
+        primeiro = self._executor.submit(tentativa)
+        try:
+            return primeiro.result(timeout=atraso)
+        except FuturesTimeout:
+            pass
+
+        with self._stats_lock:
+            repetir = stats['hedges'] < HEDGE_MAX_FRACAO * stats['pedidos']
+        # A repetição só sai se houver vaga imediata no rate limiter
+        if not repetir or not rate_limiter.acquire(nome, timeout=0):
+            return primeiro.result()
+        with self._stats_lock:
+            stats['hedges'] += 1
+        segundo = self._executor.submit(tentativa)
+
+        vencedor = None
+        for futuro in as_completed((primeiro, segundo)):
+            vencedor = futuro
+            if futuro.exception() is None and futuro.result().status_code < 500:
+                break
+        if vencedor is segundo:
+            with self._stats_lock:
+                stats['ganhos'] += 1
+        (segundo if vencedor is primeiro else primeiro).add_done_callback(_descartar)
+        return vencedor.result()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Pedidos com hedging, repetições enviadas e ganhas, e o atraso atual (p95) por endpoint"""
+        with self._stats_lock:
+            stats = {nome: dict(s) for nome, s in self._hedge_stats.items()}
+        for nome, s in stats.items():
+            atraso = self._atraso_hedge(nome)
+            s['win_rate'] = s['ganhos'] / s['hedges'] if s['hedges'] else 0.0
+            s['atraso_ms'] = atraso * 1000 if atraso is not None else None
+        return stats
+
+    def get(self, nome: str, path: str, **kwargs) -> 'requests.Response':
+        return self.request(nome, 'GET', path, **kwargs)
+
+    def post(self, nome: str, path: str, **kwargs) -> 'requests.Response':
+        return self.request(nome, 'POST', path, **kwargs)
+
+    def close(self):
+        """Fecha todas as sessões abertas"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for session in sessions:
+            session.close()
+
+
+# Instância global
+http_client = HttpClient()
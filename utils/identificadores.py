@@ -0,0 +1,158 @@
+"""Classificação de fontes para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Extrai numa só passagem de uma expressão regular pré-compilada todos os
+identificadores de um texto colado: PMIDs (com rótulo "PMID" ou números
+isolados de 7 a 9 dígitos), DOIs (com ou sem "doi:"/doi.org) e URLs. Um URL
+do PubMed conta como PMID e um URL doi.org como DOI. Um número isolado só
+conta como PMID se o texto tiver só números ou mencionar o PubMed ("PMID",
+"PubMed" ou um URL do PubMed): "estudo com 1500000 atletas" não tem PMIDs.
+
+classificar_lote() faz o mesmo para milhares de textos (classificando cada
+texto distinto uma só vez) e extrair_lote() devolve os PMIDs e DOIs únicos
+prontos para a resolução em lote (pubmed_bulk.resolver_identificadores).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+# Ordem das alternativas = prioridade numa mesma posição: URL, DOI, PMID.
+# A antecipação inicial e os ramos a começar por um carácter concreto (sem
+# IGNORECASE nem \b) permitem ao motor saltar as posições que não podem
+# iniciar um identificador; as fronteiras dos números são verificadas depois.
+_PADRAO = re.compile(r"""(?=[hHdDpP1-9])(?:
+    (?P<url>[hH][tT][tT][pP][sS]?://[^\s<>"'`]+)
+  | [dD][oO][iI]:[ \t]*(?P<doi_rotulado>10\.\d{4,9}/[^\s<>"'`]+)
+  | (?P<doi>10\.\d{4,9}/[^\s<>"'`]+)
+  | [pP][mM][iI][dD][ \t]*:?[ \t]*(?P<pmid_rotulado>\d{1,9})(?!\d)
+  | (?P<numero>\d{7}[\w.\-/]*)
+)""", re.VERBOSE)
+
+# Um número isolado é PMID se tiver 7 a 9 dígitos e não fizer parte de outra
+# palavra, decimal ou caminho
+_MAX_DIGITOS_PMID = 9
+_ANTES_NUMERO = frozenset('._-/')
+# Contexto que torna PMIDs os números isolados: menção ao PubMed ou texto só com números
+_CONTEXTO_PUBMED = re.compile(r'pmid|pubmed', re.IGNORECASE)
+_SO_NUMEROS = re.compile(r'[\d\s,;]+')
+
+_URL_PUBMED = re.compile(r'(?:pubmed\.ncbi\.nlm\.nih\.gov/|ncbi\.nlm\.nih\.gov/pubmed/)(\d{1,9})\b',
+                         re.IGNORECASE)
+_URL_DOI = re.compile(r'\bdoi\.org/(10\.\d{4,9}/\S+)', re.IGNORECASE)
+
+# Pontuação que termina uma frase e não faz parte do identificador
+_PONTUACAO_FINAL = '.,;:!?'
+
+TIPOS = {
+    'pmid': ("PubMed ID", "🔬"),
+    'doi': ("DOI", "📄"),
+    'url': ("URL", "🌐"),
+    'texto': ("Texto livre", "📝"),
+}
+
+
+@dataclass(frozen=True)
+class Fonte:
+    """Identificadores encontrados num texto (cada tuplo sem repetidos, pela ordem)"""
+    pmids: Tuple[str, ...] = ()
+    dois: Tuple[str, ...] = ()
+    urls: Tuple[str, ...] = ()
+
+    @property
+    def tipo(self) -> str:
+        """'pmid', 'doi', 'url' ou 'texto' (prioridade por esta ordem)"""
+        if self.pmids:
+            return 'pmid'
+        if self.dois:
+            return 'doi'
+        return 'url' if self.urls else 'texto'
+
+    @property
+    def rotulo(self) -> Tuple[str, str]:
+        """(nome, ícone) do tipo, como apresentado na app"""
+        return TIPOS[self.tipo]
+
+
+_VAZIA = Fonte()
+
+
+def _limpar(valor: str) -> str:
+    """Remove pontuação final e parênteses de fecho sem abertura correspondente"""
+    while valor:
+        if valor[-1] in _PONTUACAO_FINAL:
+            valor = valor[:-1]
+        elif valor[-1] == ')' and valor.count('(') < valor.count(')'):
+            valor = valor[:-1]
+        else:
+            break
+    return valor
+
+
+def _acumular(correspondencia, pmids: dict, dois: dict, urls: dict):
+    """Junta o identificador encontrado; em 'pmids', True se rotulado (ou URL) e False se número isolado"""
+    grupo = correspondencia.lastgroup
+    valor = correspondencia.group(grupo)
+    if grupo == 'url':
+        url = _limpar(valor)
+        urls[url] = None
+        pubmed = _URL_PUBMED.search(url)
+        if pubmed:
+            pmids[pubmed.group(1)] = True
+            return
+        doi = _URL_DOI.search(url)
+        if doi:
+            dois[_limpar(doi.group(1)).lower()] = None
+    elif grupo in ('doi', 'doi_rotulado'):
+        # DOIs não distinguem maiúsculas: normalizados em minúsculas
+        dois[_limpar(valor).lower()] = None
+    elif grupo == 'pmid_rotulado':
+        pmids[valor] = True
+    else:
+        valor = _limpar(valor)
+        inicio = correspondencia.start()
+        anterior = correspondencia.string[inicio - 1] if inicio else ' '
+        if (valor.isdigit() and len(valor) <= _MAX_DIGITOS_PMID
+                and not anterior.isalnum() and anterior not in _ANTES_NUMERO):
+            pmids.setdefault(valor, False)
+
+
+def _fonte(pmids: dict, dois: dict, urls: dict) -> Fonte:
+    if not (pmids or dois or urls):
+        return _VAZIA
+    return Fonte(tuple(pmids), tuple(dois), tuple(urls))
+
+
+def classificar(texto: str) -> Fonte:
+    """Identificadores de um texto (PMIDs, DOIs, URLs)"""
+    if not texto:
+        return _VAZIA
+    pmids, dois, urls = {}, {}, {}
+    for correspondencia in _PADRAO.finditer(texto):
+        _acumular(correspondencia, pmids, dois, urls)
+    if not all(pmids.values()) and not (_CONTEXTO_PUBMED.search(texto) or _SO_NUMEROS.fullmatch(texto)):
+        pmids = {pmid: True for pmid, rotulado in pmids.items() if rotulado}
+    return _fonte(pmids, dois, urls)
+
+
+def classificar_lote(textos: Iterable[str]) -> List[Fonte]:
+    """classificar() para muitos textos (ex: todas as linhas de um batch)
+
+    Os textos repetidos são classificados uma vez. O resultado tem a mesma
+    ordem e tamanho que a entrada.
+    """
+    textos = [t or '' for t in textos]
+    por_texto = {texto: classificar(texto) for texto in dict.fromkeys(textos)}
+    return [por_texto[texto] for texto in textos]
+
+
+def extrair_lote(fontes: Iterable[Fonte]) -> Tuple[List[str], List[str]]:
+    """(PMIDs, DOIs) únicos de várias fontes classificadas, pela ordem em que surgem"""
+    pmids, dois = {}, {}
+    for fonte in fontes:
+        pmids.update(dict.fromkeys(fonte.pmids))
+        dois.update(dict.fromkeys(fonte.dois))
+    return list(pmids), list(dois)
+
+
+__all__ = ['Fonte', 'TIPOS', 'classificar', 'classificar_lote', 'extrair_lote']
@@ -0,0 +1,299 @@
+"""Base de conhecimento de lesões para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Ficheiro JSONL (data/lesoes.jsonl) com uma lesão por linha: descrição,
+sintomas, tratamento, prevenção, sinais de alerta e timeline de recuperação.
+O ficheiro é mapeado em memória (mmap) na primeira consulta; só os nomes e
+aliases ficam em memória, indexados por chave normalizada, por radical e (só
+quando é preciso) por trigramas. O índice de nomes é guardado em cache/ (JSON)
+e só é reconstruído quando o ficheiro muda. Cada entrada é descodificada só
+quando é pedida.
+
+Um texto só corresponde a uma lesão pelo nome ou alias exatos, por um nome ou
+alias contido no texto, ou por um erro de escrita num deles (cada termo do
+nome tem de aparecer no texto, igual ou quase igual, e pelo menos um igual):
+"ligamento cruzado posterior" não é o LCA nem "tendinite" a tendinite patelar.
+"""
+
+import json
+import mmap
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .disk_cache import CACHE_DIR
+from .logger import log_error, logger
+from .textnorm import STOPWORDS, radical, tokenizar
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'data' / 'lesoes.jsonl'
+
+# Número de itens por lista consoante o nível de detalhe
+ITENS_POR_NIVEL = {'Conciso': 3, 'Standard': 5, 'Detalhado': None}
+
+# Trigramas mais raros da consulta usados para escolher candidatas na pesquisa aproximada
+TRIGRAMAS_CANDIDATOS = 6
+# Semelhança mínima (Jaccard de trigramas) entre um termo do nome e o termo
+# escrito para contar como erro de escrita ('tornozlo' ~ 'tornozelo': 0,58;
+# 'posterior' ~ 'anterior': 0,31)
+LIMIAR_TERMO = 0.5
+# Entradas descodificadas e pesquisas guardadas por instância
+MAX_ENTRADAS_CACHE = 4096
+MAX_PESQUISAS_CACHE = 8192
+
+# Intervalo mínimo entre verificações de alterações ao ficheiro (segundos)
+VERIFICAR_S = 1.0
+
+
+def _trigramas(chave: str) -> set:
+    texto = f'  {chave} '
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class KnowledgeBase:
+    def __init__(self, path=None, index_path=None):
+        self.path = Path(path) if path else DATA_PATH
+        # Índice de nomes/aliases pré-calculado, invalidado quando o ficheiro muda
+        self.index_path = Path(index_path) if index_path else CACHE_DIR / f'{self.path.stem}.idx.json'
+        self._lock = threading.Lock()
+        self._carregado = False
+        self._mmap = None
+        self._offsets = []           # (início, fim) de cada linha no ficheiro
+        self._nomes = []
+        self._chaves = {}            # chave normalizada -> índice da entrada
+        self._tokens_chave = {}      # chave -> tokens significativos
+        self._por_token = defaultdict(set)    # token -> chaves
+        self._por_trigrama = None    # trigrama -> chaves (construído na 1.ª pesquisa aproximada)
+        self._entradas = {}          # índice -> entrada descodificada
+        self._pesquisas = {}         # texto -> índice (ou None)
+        self._assinatura_carregada = None
+        self._verificado = 0.0
+
+    def _carregar(self):
+        if self._carregado:
+            if time.monotonic() - self._verificado >= VERIFICAR_S:
+                self._verificar()
+            return
+        with self._lock:
+            if not self._carregado:
+                self._ler_ficheiro()
+
+    def _ler_ficheiro(self):
+        self._assinatura_carregada = self._assinatura()
+        self._verificado = time.monotonic()
+        with open(self.path, 'rb') as f:
+            if f.seek(0, 2):
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if not self._ler_indice():
+            self._construir_indice()
+            self._guardar_indice()
+        self._carregado = True
+
+    def _verificar(self):
+        """Recarrega o ficheiro se mudou desde que foi lido"""
+        self._verificado = time.monotonic()
+        try:
+            mudou = self._assinatura() != self._assinatura_carregada
+        except OSError:
+            return
+        if not mudou:
+            return
+        with self._lock:
+            self._mmap = None
+            self._offsets, self._nomes = [], []
+            self._chaves, self._tokens_chave = {}, {}
+            self._por_token = defaultdict(set)
+            self._por_trigrama = None
+            self._entradas, self._pesquisas = {}, {}
+            self._ler_ficheiro()
+        logger.info(f"Base de conhecimento {self.path.name} alterada: recarregada")
+
+    def _assinatura(self) -> list:
+        stat = self.path.stat()
+        return [str(self.path), stat.st_size, stat.st_mtime_ns]
+
+    def versao(self) -> str:
+        """Identifica o conteúdo carregado (recarrega primeiro se o ficheiro foi editado)"""
+        self._carregar()
+        _, tamanho, mtime = self._assinatura_carregada
+        return f'{tamanho}-{mtime}'
+
+    def _ler_indice(self) -> bool:
+        """Lê o índice pré-calculado se corresponder à versão atual do ficheiro"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                dados = json.load(f)
+            if dados.get('assinatura') != self._assinatura():
+                return False
+            self._offsets, self._nomes = [tuple(o) for o in dados['offsets']], dados['nomes']
+            self._chaves = dados['chaves']
+            self._tokens_chave = {chave: set(tokens) for chave, tokens in dados['tokens_chave'].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+        for chave, tokens in self._tokens_chave.items():
+            for token in tokens:
+                self._por_token[token].add(chave)
+        return True
+
+    def _construir_indice(self):
+        inicio = 0
+        dados = self._mmap if self._mmap is not None else b''
+        while inicio < len(dados):
+            fim = dados.find(b'\n', inicio)
+            fim = len(dados) if fim == -1 else fim
+            if fim > inicio:
+                registo = json.loads(dados[inicio:fim])
+                self._indexar(len(self._offsets), registo)
+                self._offsets.append((inicio, fim))
+            inicio = fim + 1
+
+    def _guardar_indice(self):
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'assinatura': self._assinatura(), 'offsets': self._offsets, 'nomes': self._nomes,
+                    'chaves': self._chaves,
+                    'tokens_chave': {chave: sorted(tokens) for chave, tokens in self._tokens_chave.items()}
+                }, f, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            log_error('KnowledgeBase._guardar_indice', e)
+
+    def _indexar(self, indice: int, registo: dict):
+        self._nomes.append(registo['nome'])
+        for termo in [registo['nome'], registo.get('id', '')] + registo.get('aliases', []):
+            tokens = tokenizar(termo.replace('-', ' '))
+            chave = ' '.join(tokens)
+            if not chave or chave in self._chaves:
+                continue
+            self._chaves[chave] = indice
+            significativos = [radical(t) for t in tokens if t not in STOPWORDS] or tokens
+            self._tokens_chave[chave] = set(significativos)
+            for token in significativos:
+                self._por_token[token].add(chave)
+
+    def _indice_trigramas(self) -> dict:
+        if self._por_trigrama is None:
+            with self._lock:
+                if self._por_trigrama is None:
+                    indice = defaultdict(set)
+                    for chave in self._chaves:
+                        for trigrama in _trigramas(chave):
+                            indice[trigrama].add(chave)
+                    self._por_trigrama = indice
+        return self._por_trigrama
+
+    def entrada(self, indice: int) -> Dict:
+        """Descodifica uma entrada a partir do ficheiro mapeado"""
+        self._carregar()
+        registo = self._entradas.get(indice)
+        if registo is None:
+            inicio, fim = self._offsets[indice]
+            registo = json.loads(self._mmap[inicio:fim])
+            if len(self._entradas) >= MAX_ENTRADAS_CACHE:
+                self._entradas = {}
+            self._entradas[indice] = registo
+        return registo
+
+    def nomes(self) -> List[str]:
+        self._carregar()
+        return list(self._nomes)
+
+    def __len__(self) -> int:
+        self._carregar()
+        return len(self._offsets)
+
+    def _procurar(self, texto: str) -> Optional[int]:
+        tokens = tokenizar(texto.replace('-', ' '))
+        chave = ' '.join(tokens)
+        if not chave:
+            return None
+        # 1. Nome ou alias exato
+        if chave in self._chaves:
+            return self._chaves[chave]
+
+        # 2. Nome ou alias contido no texto, por radicais (ex: "entorses de tornozelo em futebolistas")
+        presentes = {radical(t) for t in tokens}
+        candidatas = set()
+        for token in presentes:
+            candidatas |= self._por_token.get(token, set())
+        completas = [c for c in candidatas if self._tokens_chave[c] <= presentes]
+        if completas:
+            return self._chaves[max(completas, key=lambda c: len(self._tokens_chave[c]))]
+
+        # 3. Erro de escrita: candidatas que partilham um dos trigramas mais raros da
+        # consulta, aceites só se cada termo do nome estiver no texto, igual ou quase
+        por_trigrama = self._indice_trigramas()
+        trigramas = _trigramas(chave)
+        raros = sorted((t for t in trigramas if t in por_trigrama), key=lambda t: len(por_trigrama[t]))
+        candidatas = set()
+        for trigrama in raros[:TRIGRAMAS_CANDIDATOS]:
+            candidatas |= por_trigrama[trigrama]
+        significativos = {radical(t) for t in tokens if t not in STOPWORDS}
+        melhor, melhor_score = None, 0.0
+        for candidata in candidatas:
+            score = _alinhamento(self._tokens_chave[candidata], significativos)
+            if score > melhor_score:
+                melhor, melhor_score = candidata, score
+        return self._chaves[melhor] if melhor is not None else None
+
+    def encontrar_indice(self, texto: str) -> Optional[int]:
+        """Índice da lesão encontrada para o texto (ver encontrar())"""
+        if not texto:
+            return None
+        self._carregar()
+        texto = texto[:300]
+        if texto not in self._pesquisas:
+            if len(self._pesquisas) >= MAX_PESQUISAS_CACHE:
+                self._pesquisas = {}
+            self._pesquisas[texto] = self._procurar(texto)
+        return self._pesquisas[texto]
+
+    def encontrar(self, texto: str) -> Optional[Dict]:
+        """Encontra a lesão pelo nome ou alias, exatos, contidos no texto ou com um erro de escrita"""
+        indice = self.encontrar_indice(texto)
+        return self.entrada(indice) if indice is not None else None
+
+
+def _alinhamento(nome: set, texto: set) -> float:
+    """Semelhança média dos termos do nome ao termo mais próximo do texto; 0 se algum
+    termo do nome não tiver correspondência ou se nenhum for igual"""
+    total, iguais = 0.0, 0
+    for termo in nome:
+        if termo in texto:
+            total, iguais = total + 1.0, iguais + 1
+            continue
+        proprios = _trigramas(termo)
+        melhor = 0.0
+        for outro in texto:
+            outros = _trigramas(outro)
+            comuns = len(proprios & outros)
+            melhor = max(melhor, comuns / (len(proprios) + len(outros) - comuns))
+        if melhor < LIMIAR_TERMO:
+            return 0.0
+        total += melhor
+    return total / len(nome) if iguais else 0.0
+
+
+def itens(lista: list, nivel_detalhe: str) -> list:
+    """Corta uma lista de conteúdos consoante o nível de detalhe"""
+    return lista[:ITENS_POR_NIVEL.get(nivel_detalhe, 5)]
+
+
+def timeline(entrada: Dict, publico: str) -> List[Dict]:
+    """Timeline de recuperação adaptada ao público-alvo"""
+    fases = entrada.get('recuperacao', [])
+    if publico == 'Paciente leigo':
+        return [{'fase': f['fase'], 'periodo': f['periodo']} for f in fases]
+    if publico == 'Treinador':
+        # O treinador precisa sobretudo do horizonte de regresso à competição
+        return fases[-2:]
+    return fases
+
+
+# Instância global
+knowledge_base = KnowledgeBase()
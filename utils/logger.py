@@ -1,54 +1,191 @@
 """Sistema de Logging para Sports Injury AI Studio
 Criado: 13 Dezembro 2025
+
+Os registos são colocados numa fila (QueueHandler) e escritos por uma thread
+de fundo (QueueListener), pelo que a thread do script Streamlit nunca faz I/O
+de disco. A thread e o ficheiro só são criados com o primeiro registo. O
+ficheiro é JSON-lines, roda à meia-noite e quando excede o tamanho máximo; a
+consola mantém o formato legível.
 """
 
+import atexit
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 
-# Criar diretório de logs se não existir
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
+LOG_DIR = Path(os.environ.get('SIA_LOG_DIR', 'logs'))
+LOG_LEVEL = os.environ.get('SIA_LOG_LEVEL', 'INFO').upper()
+LOG_MAX_BYTES = int(os.environ.get('SIA_LOG_MAX_BYTES', 20 * 1024 * 1024))
+LOG_BACKUPS = int(os.environ.get('SIA_LOG_BACKUPS', 14))
+
+# Atributos padrão de LogRecord (tudo o resto vem de 'extra')
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registo como um objeto JSON numa linha"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_RECORD:
+                dados[chave] = valor
+        if record.exc_info:
+            dados['exc'] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Roda à meia-noite e também quando o ficheiro excede max_bytes"""
+
+    def __init__(self, filename, max_bytes: int, backup_count: int):
+        super().__init__(filename, when='midnight', backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def rotation_filename(self, default_name: str) -> str:
+        # Várias rotações por tamanho no mesmo dia: app.log.2026-10-17, app.log.2026-10-17.1, ...
+        nome, n = default_name, 0
+        while os.path.exists(nome):
+            n += 1
+            nome = f"{default_name}.{n}"
+        return nome
+
+
+_listener = None
+_handler = None
+_encerrado = False
+_lock = threading.Lock()
+
+
+class _FilaHandler(QueueHandler):
+    """Coloca os registos na fila; o listener só é criado com o primeiro registo"""
 
-# Configurar logging
-log_filename = log_dir / f"app_{datetime.now().strftime('%Y%m%d')}.log"
+    def enqueue(self, record):
+        if _listener is None and not _encerrado:
+            _iniciar_listener(self.queue)
+        super().enqueue(record)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(name)s | %(levelname)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler(log_filename, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 
+def _iniciar_listener(fila):
+    """Cria os handlers de destino e a thread que os alimenta a partir da fila"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        LOG_DIR.mkdir(exist_ok=True)
+        file_handler = SizedTimedRotatingFileHandler(LOG_DIR / 'app.log', LOG_MAX_BYTES, LOG_BACKUPS)
+        file_handler.setFormatter(JsonFormatter())
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(
+            '%(asctime)s | %(name)s | %(levelname)s | %(message)s', datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        listener = QueueListener(fila, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+        _listener = listener
+
+
+def setup_logging():
+    """Configura o logging assíncrono (idempotente)
+
+    Só instala o handler da fila: a pasta de logs, o ficheiro e a thread de
+    escrita são criados quando chega o primeiro registo, não na importação.
+    """
+    global _handler
+    if _handler is not None:
+        return
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(handler)
+    _handler = _FilaHandler(queue.SimpleQueue())
+    root.addHandler(_handler)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Esvazia a fila e pára a thread de escrita"""
+    global _listener, _encerrado
+    _encerrado = True
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _apos_fork():
+    # A thread do listener não sobrevive ao fork (ex: pool de processos do batch):
+    # o filho usa uma fila nova e cria o seu listener no primeiro registo
+    global _listener, _lock
+    _listener = None
+    _lock = threading.Lock()
+    if _handler is not None:
+        _handler.queue = queue.SimpleQueue()
+
+
+os.register_at_fork(after_in_child=_apos_fork)
+
+setup_logging()
 logger = logging.getLogger('SportsInjuryAI')
 
+
 def log_api_call(api_name: str, query: str, status: str, duration_ms: float, result_count: int = 0):
     """Log chamada a API externa"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     logger.info(
-        f"API Call | {api_name} | Query: '{query}' | Status: {status} | "
-        f"Duration: {duration_ms:.2f}ms | Results: {result_count}"
+        "API Call | %s | Query: '%s' | Status: %s | Duration: %.2fms | Results: %d",
+        api_name, query, status, duration_ms, result_count,
+        extra={'evento': 'api_call', 'api': api_name, 'query': query, 'status': status,
+               'duration_ms': round(duration_ms, 2), 'result_count': result_count}
     )
 
-def log_error(function_name: str, error_message: str, error_type: str = "Exception"):
-    """Log erro estruturado"""
-    logger.error(f"{error_type} in {function_name}: {error_message}")
+def log_error(function_name: str, error_message, error_type: str = "Exception"):
+    """Log erro estruturado (aceita mensagem ou a própria exceção)"""
+    if isinstance(error_message, BaseException):
+        error_type = type(error_message).__name__
+    logger.error(
+        "%s in %s: %s", error_type, function_name, error_message,
+        extra={'evento': 'error', 'function': function_name, 'error_type': error_type}
+    )
 
 def log_user_action(action: str, details: dict = None):
     """Log ação do utilizador"""
-    details_str = f" | Details: {details}" if details else ""
-    logger.info(f"User Action | {action}{details_str}")
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "User Action | %s%s", action, f" | Details: {details}" if details else "",
+        extra={'evento': 'user_action', 'action': action, 'details': details or {}}
+    )
 
 def log_generation(content_type: str, tema: str, success: bool, duration_ms: float = 0):
     """Log geração de conteúdo"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     status = "SUCCESS" if success else "FAILED"
     logger.info(
-        f"Content Generation | Type: {content_type} | Tema: '{tema}' | "
-        f"Status: {status} | Duration: {duration_ms:.2f}ms"
+        "Content Generation | Type: %s | Tema: '%s' | Status: %s | Duration: %.2fms",
+        content_type, tema, status, duration_ms,
+        extra={'evento': 'generation', 'content_type': content_type, 'tema': tema,
+               'status': status, 'duration_ms': round(duration_ms, 2)}
     )
 
 # Exportar logger e funções
-__all__ = ['logger', 'log_api_call', 'log_error', 'log_user_action', 'log_generation']
+__all__ = ['logger', 'log_api_call', 'log_error', 'log_user_action', 'log_generation',
+           'setup_logging', 'shutdown_logging']
@@ -0,0 +1,301 @@
+"""Métricas de latência e quotas para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Histogramas de buckets fixos (observação O(1), alguns microssegundos) e
+contadores com labels, exportados em formato de texto Prometheus:
+- ficheiro (SIA_METRICS_FILE), reescrito periodicamente para o textfile collector
+- endpoint HTTP /metrics (SIA_METRICS_PORT)
+As métricas são por processo.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+PREFIXO = 'sia_'
+
+# Limites superiores dos buckets de latência (segundos)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'soma', 'total', '_lock')
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self.soma = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observe(self, valor: float):
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            self.counts[i] += 1
+            self.soma += valor
+            self.total += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimativa do quantil por interpolação linear dentro do bucket"""
+        with self._lock:
+            counts, total = list(self.counts), self.total
+        if not total:
+            return 0.0
+        alvo = q * total
+        acumulado = 0
+        for i, n in enumerate(counts):
+            if acumulado + n >= alvo and n:
+                inferior = self.buckets[i - 1] if i > 0 else 0.0
+                superior = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return inferior + (superior - inferior) * (alvo - acumulado) / n
+            acumulado += n
+        return self.buckets[-1]
+
+
+def _chave(nome: str, labels: dict) -> tuple:
+    return (nome, tuple(sorted(labels.items())))
+
+
+def _labels_texto(labels) -> str:
+    if not labels:
+        return ''
+    pares = ','.join(f'{k}="{str(v)}"' for k, v in labels)
+    return '{' + pares + '}'
+
+
+class Metrics:
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._exportacao_iniciada = False
+
+    # ---- Registo ----
+
+    def histogram(self, nome: str, **labels) -> Histogram:
+        chave = _chave(nome, labels)
+        hist = self._histograms.get(chave)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(chave, Histogram())
+        return hist
+
+    def observe(self, nome: str, valor: float, **labels):
+        self.histogram(nome, **labels).observe(valor)
+
+    def inc(self, nome: str, valor: float = 1, **labels):
+        chave = _chave(nome, labels)
+        with self._lock:
+            self._counters[chave] = self._counters.get(chave, 0) + valor
+
+    @contextmanager
+    def timer(self, nome: str, **labels):
+        hist = self.histogram(nome, **labels)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            hist.observe(time.perf_counter() - inicio)
+
+    def timed(self, nome: str, **labels):
+        """Decorador: regista a duração em '<nome>_seconds' e o resultado em '<nome>s_total'"""
+        def decorator(func):
+            hist = self.histogram(f'{nome}_seconds', **labels)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                inicio = time.perf_counter()
+                try:
+                    resultado = func(*args, **kwargs)
+                except Exception:
+                    self.inc(f'{nome}s_total', status='error', **labels)
+                    raise
+                finally:
+                    hist.observe(time.perf_counter() - inicio)
+                self.inc(f'{nome}s_total', status='ok', **labels)
+                return resultado
+
+            return wrapper
+        return decorator
+
+    def register_collector(self, func):
+        """Regista uma função que devolve [(nome, labels, valor, tipo)] no momento da exportação"""
+        self._collectors.append(func)
+        return func
+
+    # ---- Leitura ----
+
+    def counter(self, nome: str, **labels) -> float:
+        return self._counters.get(_chave(nome, labels), 0)
+
+    def _amostras_collectors(self) -> list:
+        amostras = []
+        for collector in self._collectors:
+            try:
+                amostras.extend(collector())
+            except Exception:
+                continue
+        return amostras
+
+    def snapshot(self) -> dict:
+        """Resumo para o painel de administração"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        latencias = {}
+        for (nome, labels), hist in histograms.items():
+            latencias.setdefault(nome, []).append({
+                **dict(labels),
+                'count': hist.total,
+                'p50_ms': hist.quantile(0.50) * 1000,
+                'p95_ms': hist.quantile(0.95) * 1000,
+                'p99_ms': hist.quantile(0.99) * 1000,
+                'media_ms': (hist.soma / hist.total * 1000) if hist.total else 0,
+            })
+        contadores = [{'nome': nome, **dict(labels), 'valor': valor}
+                      for (nome, labels), valor in counters.items()]
+        estado = [{'nome': nome, **labels, 'valor': valor}
+                  for nome, labels, valor, _ in self._amostras_collectors()]
+        return {'latencias': latencias, 'contadores': contadores, 'estado': estado}
+
+    def render_prometheus(self) -> str:
+        """Exposição em formato de texto Prometheus"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        linhas = []
+        tipos_emitidos = set()
+
+        def tipo(nome, t):
+            if nome not in tipos_emitidos:
+                tipos_emitidos.add(nome)
+                linhas.append(f'# TYPE {nome} {t}')
+
+        for (nome, labels), hist in histograms:
+            nome = PREFIXO + nome
+            tipo(nome, 'histogram')
+            with hist._lock:
+                counts, soma, total = list(hist.counts), hist.soma, hist.total
+            acumulado = 0
+            for limite, n in zip(list(hist.buckets) + ['+Inf'], counts):
+                acumulado += n
+                linhas.append(f'{nome}_bucket{_labels_texto(labels + (("le", limite),))} {acumulado}')
+            linhas.append(f'{nome}_sum{_labels_texto(labels)} {soma}')
+            linhas.append(f'{nome}_count{_labels_texto(labels)} {total}')
+
+        for (nome, labels), valor in counters:
+            nome = PREFIXO + nome
+            tipo(nome, 'counter')
+            linhas.append(f'{nome}{_labels_texto(labels)} {valor}')
+
+        for nome, labels, valor, t in sorted(self._amostras_collectors(), key=lambda a: a[0]):
+            nome = PREFIXO + nome
+            tipo(nome, t)
+            linhas.append(f'{nome}{_labels_texto(tuple(sorted(labels.items())))} {valor}')
+        return '\n'.join(linhas) + '\n'
+
+    # ---- Exportação ----
+
+    def write_textfile(self, path):
+        """Escreve a exposição de forma atómica (rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + f'.{os.getpid()}.tmp')
+        tmp.write_text(self.render_prometheus(), encoding='utf-8')
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> 'ThreadingHTTPServer':
+        """Inicia um endpoint /metrics numa thread de fundo"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registo = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                corpo = registo.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True, name='metrics-http').start()
+        return servidor
+
+    def iniciar_exportacao(self, intervalo: float = 15.0):
+        """Ativa a exportação configurada por SIA_METRICS_FILE / SIA_METRICS_PORT (idempotente)"""
+        with self._lock:
+            if self._exportacao_iniciada:
+                return
+            self._exportacao_iniciada = True
+
+        ficheiro = os.environ.get('SIA_METRICS_FILE')
+        if ficheiro:
+            def escrever_periodicamente():
+                while True:
+                    try:
+                        self.write_textfile(ficheiro)
+                    except OSError:
+                        pass
+                    time.sleep(intervalo)
+            threading.Thread(target=escrever_periodicamente, daemon=True, name='metrics-file').start()
+
+        porta = os.environ.get('SIA_METRICS_PORT')
+        if porta:
+            try:
+                self.serve(int(porta), os.environ.get('SIA_METRICS_HOST', '127.0.0.1'))
+            except OSError:
+                pass  # outro worker já tem a porta
+
+
+def _estado_componentes() -> list:
+    """Cache, rate limiter, coalescência, disjuntores e hedging lidos no momento da exportação"""
+    from .disjuntores import CODIGOS, disjuntores
+    from .disk_cache import disk_cache
+    from .http_client import http_client
+    from .rate_limiter import rate_limiter
+    from .singleflight import singleflight
+
+    amostras = []
+    for fonte, eventos in disk_cache.get_stats()['fontes'].items():
+        for evento in ('hits', 'stale_hits', 'misses', 'fallbacks'):
+            amostras.append(('cache_requests_total', {'source': fonte, 'result': evento},
+                             eventos.get(evento, 0), 'counter'))
+        amostras.append(('cache_hit_ratio', {'source': fonte}, eventos.get('hit_ratio', 0), 'gauge'))
+    for api in rate_limiter.limits:
+        uso = rate_limiter.get_usage_stats(api)
+        amostras.append(('rate_limit_rejections_total', {'api': api}, uso['rejections'], 'counter'))
+        amostras.append(('rate_limit_usage_ratio', {'api': api}, uso['percentage'] / 100, 'gauge'))
+    for fonte, stats in singleflight.get_stats().items():
+        amostras.append(('singleflight_coalesced_total', {'source': fonte}, stats['coalescidas'], 'counter'))
+    for fonte, stats in disjuntores.get_stats().items():
+        # 0 fechado, 1 meio-aberto, 2 aberto
+        amostras.append(('circuit_breaker_state', {'source': fonte}, CODIGOS[stats['estado']], 'gauge'))
+        amostras.append(('circuit_breaker_opens_total', {'source': fonte}, stats['aberturas'], 'counter'))
+        amostras.append(('circuit_breaker_rejections_total', {'source': fonte}, stats['rejeitados'], 'counter'))
+    for endpoint, stats in http_client.get_stats().items():
+        for resultado, valor in (('won', stats['ganhos']), ('lost', stats['hedges'] - stats['ganhos'])):
+            amostras.append(('http_hedges_total', {'endpoint': endpoint, 'result': resultado}, valor, 'counter'))
+        amostras.append(('http_hedge_win_ratio', {'endpoint': endpoint}, stats['win_rate'], 'gauge'))
+    return amostras
+
+
+# Instância global
+metrics = Metrics()
+metrics.register_collector(_estado_componentes)
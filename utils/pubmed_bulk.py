@@ -0,0 +1,159 @@
+"""Recolha em lote no PubMed para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Pesquisa vários termos partilhando um WebEnv do History Server do NCBI
+(usehistory=y), remove PMIDs duplicados entre termos, publica a lista única
+com epost e obtém os resumos (esummary) em lotes via WebEnv/query_key.
+Os artigos são gerados à medida que cada lote chega e adicionados ao índice
+local (article_index). Todos os pedidos passam pelo cliente HTTP partilhado e
+pelo rate limiter global (3 req/s).
+
+resolver_identificadores() resolve PMIDs e DOIs extraídos das fontes
+(utils.identificadores): os DOIs são procurados em blocos com OR num único
+esearch e todos os artigos vêm do mesmo esummary em lote.
+"""
+
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .article_index import article_index
+from .disjuntores import disjuntores
+from .http_client import http_client
+from .logger import log_api_call, log_error
+from .metrics import metrics
+from .rate_limiter import rate_limiter
+from .sources import formatar_artigo
+
+ESEARCH_MAX = 10000   # retmax máximo do esearch
+ESUMMARY_MAX = 10000  # retmax máximo do esummary via History Server
+IDS_POR_URL = 200     # acima disto os IDs vão por epost em vez de no URL
+DOIS_POR_PESQUISA = 50  # DOIs combinados com OR em cada esearch
+
+
+def _pedido(method: str, endpoint: str, **kwargs):
+    disjuntores.verificar('pubmed')
+    rate_limiter.require('pubmed')
+    # Lotes grandes demoram naturalmente mais do que o p95: sem hedging
+    with metrics.timer('api_request_seconds', source='pubmed'):
+        response = http_client.request('pubmed', method, f'/entrez/eutils/{endpoint}', hedge=False, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def pesquisar_termos(termos: Iterable[str], max_por_termo: int = 100,
+                     por_termo: Dict[str, List[str]] = None) -> Tuple[str, List[str]]:
+    """Corre um esearch por termo no mesmo WebEnv
+
+    Retorna (webenv, pmids) com os PMIDs únicos pela ordem em que surgiram. Se
+    for dado 'por_termo', é preenchido com termo -> PMIDs desse termo.
+    """
+    webenv = None
+    pmids = {}
+    for termo in termos:
+        params = {
+            'db': 'pubmed', 'term': termo, 'retmax': min(max_por_termo, ESEARCH_MAX),
+            'retmode': 'json', 'sort': 'relevance', 'usehistory': 'y'
+        }
+        if webenv:
+            params['WebEnv'] = webenv
+        inicio = time.time()
+        resultado = _pedido('GET', 'esearch.fcgi', params=params).json().get('esearchresult', {})
+        webenv = resultado.get('webenv', webenv)
+        ids = resultado.get('idlist', [])
+        pmids.update(dict.fromkeys(ids))
+        if por_termo is not None:
+            por_termo[termo] = ids
+        log_api_call('pubmed_esearch', termo, 'OK', (time.time() - inicio) * 1000, len(ids))
+    return webenv, list(pmids)
+
+
+def publicar_ids(pmids: List[str], webenv: str = None) -> Tuple[str, str]:
+    """Envia os PMIDs para o History Server (epost). Retorna (webenv, query_key)"""
+    data = {'db': 'pubmed', 'id': ','.join(pmids)}
+    if webenv:
+        data['WebEnv'] = webenv
+    raiz = ET.fromstring(_pedido('POST', 'epost.fcgi', data=data).content)
+    erro = raiz.findtext('ERROR')
+    if erro:
+        raise RuntimeError(f"epost: {erro}")
+    return raiz.findtext('WebEnv'), raiz.findtext('QueryKey')
+
+
+def _artigos(dados: dict, dois: Dict[str, str] = None) -> List[Dict]:
+    """Artigos de uma resposta esummary, também adicionados ao índice local
+
+    Se for dado 'dois', é preenchido com DOI (minúsculas) -> PMID dos registos.
+    """
+    resultado = dados.get('result', {})
+    artigos = [formatar_artigo(pmid, resultado[pmid])
+               for pmid in resultado.get('uids', []) if pmid in resultado]
+    if dois is not None:
+        for pmid in resultado.get('uids', []):
+            for artigo_id in resultado.get(pmid, {}).get('articleids', []):
+                if artigo_id.get('idtype') == 'doi' and artigo_id.get('value'):
+                    dois[artigo_id['value'].lower()] = pmid
+    try:
+        article_index.indexar(artigos)
+    except sqlite3.Error as e:
+        log_error('pubmed_bulk.indexar', e)
+    return artigos
+
+
+def resumos_por_ids(pmids: List[str], tamanho_lote: int = 200, webenv: str = None,
+                    dois: Dict[str, str] = None) -> Iterator[Dict]:
+    """Gera os artigos de uma lista de PMIDs, lote a lote (ver _artigos para 'dois')"""
+    pmids = list(dict.fromkeys(pmids))
+    if not pmids:
+        return
+    tamanho_lote = max(1, min(tamanho_lote, ESUMMARY_MAX))
+
+    if len(pmids) <= min(tamanho_lote, IDS_POR_URL):
+        params = {'db': 'pubmed', 'id': ','.join(pmids), 'retmode': 'json'}
+        yield from _artigos(_pedido('GET', 'esummary.fcgi', params=params).json(), dois)
+        return
+
+    webenv, query_key = publicar_ids(pmids, webenv)
+    for inicio in range(0, len(pmids), tamanho_lote):
+        params = {
+            'db': 'pubmed', 'WebEnv': webenv, 'query_key': query_key,
+            'retstart': inicio, 'retmax': tamanho_lote, 'retmode': 'json'
+        }
+        yield from _artigos(_pedido('GET', 'esummary.fcgi', params=params).json(), dois)
+
+
+def buscar_pubmed_lote(termos: Iterable[str], max_por_termo: int = 100, tamanho_lote: int = 200,
+                       por_termo: Dict[str, List[str]] = None) -> Iterator[Dict]:
+    """Pesquisa vários termos e gera os artigos únicos (por PMID) à medida que chegam
+
+    Ver pesquisar_termos para 'por_termo'.
+    """
+    webenv, pmids = pesquisar_termos(termos, max_por_termo, por_termo)
+    yield from resumos_por_ids(pmids, tamanho_lote, webenv)
+
+
+def resolver_identificadores(pmids: Iterable[str], dois: Iterable[str] = (),
+                             tamanho_lote: int = 200) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """Artigos dos PMIDs e DOIs indicados, em lote
+
+    Retorna (artigos por PMID, DOI -> PMID). DOIs sem registo no PubMed ficam
+    de fora do segundo dicionário.
+    """
+    pmids, dois = list(dict.fromkeys(pmids)), list(dict.fromkeys(d.lower() for d in dois))
+    webenv = None
+    if dois:
+        termos = [' OR '.join(f'"{doi}"[doi]' for doi in dois[i:i + DOIS_POR_PESQUISA])
+                  for i in range(0, len(dois), DOIS_POR_PESQUISA)]
+        webenv, encontrados = pesquisar_termos(termos, max_por_termo=DOIS_POR_PESQUISA)
+        conhecidos = set(pmids)
+        pmids.extend(p for p in encontrados if p not in conhecidos)
+
+    por_doi = {}
+    artigos = {artigo['pmid']: artigo for artigo in resumos_por_ids(pmids, tamanho_lote, webenv, por_doi)}
+    pedidos = set(dois)
+    return artigos, {doi: pmid for doi, pmid in por_doi.items() if doi in pedidos}
+
+
+__all__ = ['buscar_pubmed_lote', 'pesquisar_termos', 'publicar_ids', 'resumos_por_ids',
+           'resolver_identificadores']
@@ -0,0 +1,304 @@
+"""Rasterização de infográficos para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Desenha com Pillow a estrutura de gerar_estrutura_infografico (título, secções,
+layout.cores_principais e as fontes sugeridas em layout.fonte_titulo /
+fonte_corpo) numa imagem PNG ou WebP, sem passar pelo Make.com/Canva.
+
+- Fontes e ícones são carregados uma vez por processo e reutilizados (pool
+  por nome e tamanho); uma fonte sugerida que não exista no sistema é
+  substituída pela DejaVu Sans (ou pela fonte embutida do Pillow).
+- As imagens ficam numa cache endereçada por conteúdo (ver cache_ficheiros):
+  a chave é o hash do conteúdo visual da estrutura + formato + largura, por
+  isso gerar de novo o mesmo infográfico não volta a desenhar nada.
+- miniatura() desenha diretamente na largura pequena (em vez de reduzir a
+  imagem completa) para a pré-visualização no separador de infográfico.
+- Em lote, batch.py --imagens desenha nos processos do pool de geração.
+"""
+
+import io
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .cache_ficheiros import CacheFicheiros, chave_conteudo
+from .disk_cache import CACHE_DIR
+from .metrics import metrics
+
+# Muda quando o desenho muda: invalida as imagens em cache
+VERSAO = '1'
+
+LARGURA = 1080
+LARGURA_MINIATURA = 360
+
+FORMATOS = {
+    'png': ('PNG', {'compress_level': 3}),  # ~30% mais rápido que o 6 por omissão, +12% de tamanho
+    'webp': ('WEBP', {'quality': 85, 'method': 4}),
+}
+
+# Onde procurar as fontes sugeridas no layout (SIA_FONTS_DIR primeiro)
+DIRS_FONTES = [p for p in (
+    os.environ.get('SIA_FONTS_DIR'),
+    Path(__file__).resolve().parent.parent / 'data' / 'fonts',
+    '/usr/share/fonts', '/usr/local/share/fonts', Path.home() / '.fonts',
+    '/Library/Fonts', '/System/Library/Fonts', 'C:/Windows/Fonts',
+) if p]
+
+# Substitutas, por ordem, quando a fonte sugerida não existe
+SUBSTITUTAS = {
+    False: ('dejavusans', 'liberationsansregular', 'arial'),
+    True: ('dejavusansbold', 'liberationsansbold', 'arialbold'),
+}
+
+# Símbolo do ícone de cada tipo de secção
+ICONES = {'introducao': 'i', 'sintomas': '!', 'tratamento': '+', 'prevencao': '✓', 'recuperacao': '→'}
+
+CORES_PADRAO = ('#2E86AB', '#A23B72', '#F18F01')
+FUNDO = '#F4F6F8'
+CARTAO = '#FFFFFF'
+TEXTO = '#1F2933'
+TEXTO_SECUNDARIO = '#5F6B76'
+
+# Dimensões à largura de referência (LARGURA); escalam com a largura pedida
+MARGEM = 56
+PADDING = 32
+ICONE = 72
+TITULO, SUBTITULO, TITULO_SECAO, CORPO, RODAPE = 60, 32, 38, 27, 21
+ENTRELINHA = 1.35
+
+
+def _normalizar(nome: str) -> str:
+    return ''.join(c for c in nome.lower() if c.isalnum())
+
+
+@lru_cache(maxsize=1)
+def _indice_fontes() -> Dict[str, str]:
+    """Nome normalizado do ficheiro -> caminho (percorrido uma vez por processo)"""
+    indice = {}
+    for diretorio in DIRS_FONTES:
+        diretorio = Path(diretorio)
+        if not diretorio.is_dir():
+            continue
+        for path in diretorio.rglob('*'):
+            if path.suffix.lower() in ('.ttf', '.otf'):
+                indice.setdefault(_normalizar(path.stem), str(path))
+    return indice
+
+
+@lru_cache(maxsize=128)
+def fonte(dica: str, tamanho: int) -> ImageFont.ImageFont:
+    """Fonte sugerida (ex: 'Montserrat Bold') no tamanho dado, do pool do processo"""
+    indice = _indice_fontes()
+    nome = _normalizar(dica or '')
+    negrito = 'bold' in nome
+    for candidato in (nome, nome + 'regular', *SUBSTITUTAS[negrito]):
+        if candidato in indice:
+            try:
+                # Layout básico: o texto é latino, sem necessidade de shaping (raqm)
+                return ImageFont.truetype(indice[candidato], tamanho, layout_engine=ImageFont.Layout.BASIC)
+            except OSError:
+                continue
+    # Com tamanho (FreeType) desde o Pillow 10.1, daí o mínimo em requirements.txt
+    return ImageFont.load_default(tamanho)
+
+
+@lru_cache(maxsize=64)
+def icone(tipo: str, diametro: int, cor: str) -> Image.Image:
+    """Círculo com o símbolo do tipo de secção (desenhado a 2x e reduzido)"""
+    grande = diametro * 2
+    imagem = Image.new('RGBA', (grande, grande), (0, 0, 0, 0))
+    desenho = ImageDraw.Draw(imagem)
+    desenho.ellipse((0, 0, grande - 1, grande - 1), fill=cor)
+    desenho.text((grande / 2, grande / 2), ICONES.get(tipo, '•'), fill='#FFFFFF',
+                 font=fonte('DejaVu Sans Bold', int(grande * 0.55)), anchor='mm')
+    return imagem.resize((diametro, diametro), Image.LANCZOS)
+
+
+def _quebrar(texto: str, letra, largura: int) -> List[str]:
+    """Quebra o texto em linhas que cabem em 'largura' píxeis
+
+    Cada palavra é medida uma vez e as larguras somadas (em vez de medir a
+    linha inteira a cada palavra acrescentada).
+    """
+    espaco = letra.getlength(' ')
+    linhas = []
+    for paragrafo in str(texto).splitlines() or ['']:
+        linha, ocupado = [], 0.0
+        for palavra in paragrafo.split():
+            medida = letra.getlength(palavra)
+            if linha and ocupado + espaco + medida > largura:
+                linhas.append(' '.join(linha))
+                linha, ocupado = [], 0.0
+            ocupado += (espaco if linha else 0) + medida
+            linha.append(palavra)
+        linhas.append(' '.join(linha))
+    return linhas
+
+
+def _itens(secao: Dict) -> List[Tuple[str, bool]]:
+    """(texto, é alerta) de cada linha de lista da secção"""
+    itens = []
+    for item in secao.get('itens') or []:
+        if isinstance(item, dict):
+            texto = f"{item.get('fase', '')} ({item.get('periodo', '')})"
+            if item.get('objetivos'):
+                texto += f": {item['objetivos']}"
+            itens.append((texto, False))
+        else:
+            itens.append((str(item), False))
+    itens.extend((str(alerta), True) for alerta in secao.get('sinais_alerta') or [])
+    return itens
+
+
+def _planear(estrutura: Dict, largura: int) -> Tuple[int, list]:
+    """(altura, operações de desenho): as medidas são feitas uma só vez"""
+    conteudo = estrutura['conteudo']
+    layout = conteudo.get('layout') or {}
+    cores = tuple(layout.get('cores_principais') or CORES_PADRAO)
+    escala = largura / LARGURA
+
+    def px(valor):
+        return max(1, round(valor * escala))
+
+    negrito = layout.get('fonte_titulo') or 'Montserrat Bold'
+    corpo = layout.get('fonte_corpo') or 'Open Sans'
+    f_titulo, f_subtitulo = fonte(negrito, px(TITULO)), fonte(corpo, px(SUBTITULO))
+    f_secao, f_corpo, f_rodape = fonte(negrito, px(TITULO_SECAO)), fonte(corpo, px(CORPO)), fonte(corpo, px(RODAPE))
+
+    def altura_linha(letra):
+        return round(letra.size * ENTRELINHA)
+
+    ops = []
+    margem, padding = px(MARGEM), px(PADDING)
+
+    # Cabeçalho
+    y = margem
+    for linha in _quebrar(conteudo.get('titulo_principal', ''), f_titulo, largura - 2 * margem):
+        ops.append(('texto', (margem, y), linha, f_titulo, '#FFFFFF'))
+        y += altura_linha(f_titulo)
+    if conteudo.get('subtitulo'):
+        ops.append(('texto', (margem, y + px(8)), conteudo['subtitulo'], f_subtitulo, '#FFFFFF'))
+        y += px(8) + altura_linha(f_subtitulo)
+    y += margem
+    ops.insert(0, ('retangulo', (0, 0, largura, y), cores[0], 0))
+    y += margem // 2
+
+    # Secções em cartões
+    x_texto = margem + padding + px(ICONE) + px(28)
+    largura_texto = largura - margem - padding - x_texto
+    for numero, secao in enumerate(conteudo.get('secoes') or []):
+        cor = cores[numero % len(cores)]
+        topo = y
+        cartao = []
+        y += padding
+        cartao.append(('icone', (margem + padding, y), secao.get('tipo', ''), px(ICONE), cor))
+        for linha in _quebrar(secao.get('titulo', ''), f_secao, largura_texto):
+            cartao.append(('texto', (x_texto, y), linha, f_secao, cor))
+            y += altura_linha(f_secao)
+        y += px(10)
+        itens = _itens(secao)
+        if itens:
+            recuo = round(f_corpo.getlength('•  '))
+            for texto, alerta in itens:
+                cor_item = cores[2 % len(cores)] if alerta else TEXTO
+                cartao.append(('texto', (x_texto, y), '!' if alerta else '•', f_corpo, cor_item))
+                for linha in _quebrar(texto, f_corpo, largura_texto - recuo):
+                    cartao.append(('texto', (x_texto + recuo, y), linha, f_corpo, cor_item))
+                    y += altura_linha(f_corpo)
+                y += px(6)
+        else:
+            for linha in _quebrar(secao.get('conteudo', ''), f_corpo, largura_texto):
+                cartao.append(('texto', (x_texto, y), linha, f_corpo, TEXTO))
+                y += altura_linha(f_corpo)
+        y = max(y, topo + padding + px(ICONE)) + padding
+        ops.append(('retangulo', (margem, topo, largura - margem, y), CARTAO, px(18)))
+        ops.append(('retangulo', (margem, topo, margem + px(10), y), cor, 0))
+        ops.extend(cartao)
+        y += px(24)
+
+    # Rodapé com a fonte dos dados
+    fonte_dados = str((estrutura.get('integracao') or {}).get('fonte_dados') or '')
+    if fonte_dados:
+        texto = fonte_dados if len(fonte_dados) <= 120 else fonte_dados[:117] + '...'
+        for linha in _quebrar(f"Fonte: {texto}", f_rodape, largura - 2 * margem):
+            ops.append(('texto', (margem, y), linha, f_rodape, TEXTO_SECUNDARIO))
+            y += altura_linha(f_rodape)
+    return y + margem, ops
+
+
+def desenhar(estrutura: Dict, largura: int = LARGURA) -> Image.Image:
+    """Imagem RGB do infográfico (sem cache)"""
+    altura, ops = _planear(estrutura, largura)
+    imagem = Image.new('RGB', (largura, altura), FUNDO)
+    desenho = ImageDraw.Draw(imagem)
+    for op in ops:
+        if op[0] == 'texto':
+            _, xy, texto, letra, cor = op
+            desenho.text(xy, texto, font=letra, fill=cor)
+        elif op[0] == 'retangulo':
+            _, caixa, cor, raio = op
+            if raio:
+                desenho.rounded_rectangle(caixa, raio, fill=cor)
+            else:
+                desenho.rectangle(caixa, fill=cor)
+        else:
+            _, xy, tipo, diametro, cor = op
+            simbolo = icone(tipo, diametro, cor)
+            imagem.paste(simbolo, xy, simbolo)
+    return imagem
+
+
+def codificar(imagem: Image.Image, formato: str) -> bytes:
+    nome, opcoes = FORMATOS[formato]
+    dados = io.BytesIO()
+    imagem.save(dados, nome, **opcoes)
+    return dados.getvalue()
+
+
+def chave(estrutura: Dict, formato: str, largura: int) -> str:
+    """Hash do que aparece na imagem (sem data_criacao, que muda em cada geração)"""
+    visual = {
+        'conteudo': estrutura['conteudo'],
+        'fonte_dados': (estrutura.get('integracao') or {}).get('fonte_dados'),
+    }
+    return chave_conteudo(VERSAO, formato, str(largura),
+                          json.dumps(visual, sort_keys=True, ensure_ascii=False, default=str))
+
+
+class Rasterizador:
+    def __init__(self, cache_dir=None, max_bytes: int = 256 * 1024 * 1024):
+        self.cache = CacheFicheiros(Path(cache_dir) if cache_dir else CACHE_DIR / 'infograficos', max_bytes)
+
+    def ficheiro(self, estrutura: Dict, formato: str = 'png', largura: int = LARGURA) -> Path:
+        """Caminho da imagem em cache, desenhada se ainda não existir"""
+        if formato not in FORMATOS:
+            raise ValueError(f"formato inválido: {formato!r} (disponíveis: {', '.join(FORMATOS)})")
+        k = chave(estrutura, formato, largura)
+        path = self.cache.obter(k, formato)
+        if path:
+            metrics.inc('infographic_renders_total', resultado='cache', formato=formato)
+            return path
+        with metrics.timer('infographic_render_seconds', formato=formato):
+            dados = codificar(desenhar(estrutura, largura), formato)
+        path = self.cache.guardar(k, formato, dados)
+        metrics.inc('infographic_renders_total', resultado='desenhado', formato=formato)
+        return path
+
+    def renderizar(self, estrutura: Dict, formato: str = 'png', largura: int = LARGURA) -> bytes:
+        return self.ficheiro(estrutura, formato, largura).read_bytes()
+
+    def miniatura(self, estrutura: Dict, formato: str = 'png') -> bytes:
+        """Pré-visualização pequena, desenhada diretamente a LARGURA_MINIATURA"""
+        return self.renderizar(estrutura, formato, LARGURA_MINIATURA)
+
+
+# Instância global
+rasterizador = Rasterizador()
+
+
+__all__ = ['FORMATOS', 'LARGURA', 'LARGURA_MINIATURA', 'Rasterizador', 'chave', 'codificar', 'desenhar', 'fonte',
+           'icone', 'rasterizador']
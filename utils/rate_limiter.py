@@ -1,62 +1,157 @@
 """Rate Limiter para Sports Injury AI Studio
 Criado: 13 Dezembro 2025
+
+Token bucket partilhado por todas as sessões e processos do host: o estado
+de cada API vive numa base SQLite (transação IMMEDIATE por verificação),
+protegido também por um lock dentro do processo. Cada verificação é O(1).
 """
 
+import sqlite3
+import threading
 import time
 from collections import defaultdict
-from datetime import datetime, timedelta
-import streamlit as st
+from pathlib import Path
+
+from .disk_cache import CACHE_DIR
+from .logger import log_error
+
+
+class RateLimitExceeded(Exception):
+    """Limite de chamadas à API atingido"""
+
 
 class RateLimiter:
-    def __init__(self):
-        # Inicializar no session state para persistir entre reruns
-        if 'rate_limiter_calls' not in st.session_state:
-            st.session_state.rate_limiter_calls = defaultdict(list)
-        
-        self.limits = {
-            'pubmed': {'calls': 3, 'period': 1},  # 3 calls/segundo
-            'newsapi': {'calls': 100, 'period': 86400},  # 100 calls/dia  
-            'perplexity': {'calls': 50, 'period': 3600}  # 50 calls/hora
+    def __init__(self, path=None, limits: dict = None):
+        # path=':memory:' mantém o estado apenas neste processo
+        self.path = path if path is not None else CACHE_DIR / 'rate_limiter.db'
+        self.limits = limits or {
+            'pubmed': {'calls': 3, 'period': 1, 'wait': 5},  # 3 calls/segundo
+            'newsapi': {'calls': 100, 'period': 86400, 'wait': 2},  # 100 calls/dia
+            'perplexity': {'calls': 50, 'period': 3600, 'wait': 2}  # 50 calls/hora
         }
-    
+        self.rejections = defaultdict(int)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._memory = {}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ':memory:':
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets '
+                '(api TEXT PRIMARY KEY, tokens REAL NOT NULL, atualizado REAL NOT NULL)'
+            )
+        return self._conn
+
+    def _take(self, api_name: str, limit_config: dict) -> float:
+        """Tenta consumir um token. Retorna 0 se conseguiu, senão os segundos até haver token"""
+        capacity = limit_config['calls']
+        rate = capacity / limit_config['period']
+
+        def reabastecer(estado, now):
+            if estado is None:
+                return float(capacity)
+            return min(capacity, estado[0] + (now - estado[1]) * rate)
+
+        with self._lock:
+            now = time.time()
+            try:
+                conn = self._db()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    estado = conn.execute(
+                        'SELECT tokens, atualizado FROM buckets WHERE api = ?', (api_name,)
+                    ).fetchone()
+                    tokens = reabastecer(estado, now)
+                    espera = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                    if not espera:
+                        tokens -= 1
+                    conn.execute(
+                        'INSERT OR REPLACE INTO buckets (api, tokens, atualizado) VALUES (?, ?, ?)',
+                        (api_name, tokens, now)
+                    )
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+            except sqlite3.Error as e:
+                # Sem acesso à base partilhada: limitar apenas dentro deste processo
+                log_error('RateLimiter._take', e)
+                tokens = reabastecer(self._memory.get(api_name), now)
+                espera = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                if not espera:
+                    tokens -= 1
+                self._memory[api_name] = (tokens, now)
+            return espera
+
     def check_limit(self, api_name: str) -> tuple[bool, str]:
-        """Verifica se pode fazer chamada à API
+        """Verifica se pode fazer chamada à API (e regista-a se puder)
         Retorna: (pode_chamar, mensagem)
         """
-        now = datetime.now()
         limit_config = self.limits.get(api_name)
-        
         if not limit_config:
             return True, "OK"
-        
-        # Limpar chamadas antigas
-        cutoff = now - timedelta(seconds=limit_config['period'])
-        st.session_state.rate_limiter_calls[api_name] = [
-            call_time for call_time in st.session_state.rate_limiter_calls[api_name] 
-            if call_time > cutoff
-        ]
-        
-        # Verificar limite
-        current_calls = len(st.session_state.rate_limiter_calls[api_name])
-        if current_calls >= limit_config['calls']:
-            wait_time = (st.session_state.rate_limiter_calls[api_name][0] + 
-                        timedelta(seconds=limit_config['period']) - now).total_seconds()
-            return False, f"Limite atingido. Aguarde {int(wait_time)}s"
-        
-        # Registrar chamada
-        st.session_state.rate_limiter_calls[api_name].append(now)
+
+        espera = self._take(api_name, limit_config)
+        if espera:
+            self.rejections[api_name] += 1
+            return False, f"Limite atingido. Aguarde {int(espera) + 1}s"
         return True, "OK"
-    
+
+    def acquire(self, api_name: str, timeout: float = None) -> bool:
+        """Bloqueia até haver disponibilidade ou até esgotar o timeout
+        timeout=None usa o 'wait' configurado para a API.
+        """
+        limit_config = self.limits.get(api_name)
+        if not limit_config:
+            return True
+        if timeout is None:
+            timeout = limit_config.get('wait', 0)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            espera = self._take(api_name, limit_config)
+            if not espera:
+                return True
+            restante = deadline - time.monotonic()
+            if espera > restante:
+                self.rejections[api_name] += 1
+                return False
+            time.sleep(espera)
+
+    def require(self, api_name: str, timeout: float = None):
+        """Como acquire(), mas lança RateLimitExceeded se não houver disponibilidade"""
+        if not self.acquire(api_name, timeout):
+            raise RateLimitExceeded(f"Limite de chamadas atingido para {api_name}")
+
     def get_usage_stats(self, api_name: str) -> dict:
         """Retorna estatísticas de uso da API"""
         limit_config = self.limits.get(api_name, {})
-        current_calls = len(st.session_state.rate_limiter_calls.get(api_name, []))
         max_calls = limit_config.get('calls', 0)
-        
+        if not max_calls:
+            return {'current': 0, 'max': 0, 'percentage': 0, 'rejections': self.rejections[api_name]}
+
+        with self._lock:
+            try:
+                estado = self._db().execute(
+                    'SELECT tokens, atualizado FROM buckets WHERE api = ?', (api_name,)
+                ).fetchone()
+            except sqlite3.Error:
+                estado = self._memory.get(api_name)
+        tokens = float(max_calls)
+        if estado is not None:
+            rate = max_calls / limit_config['period']
+            tokens = min(max_calls, estado[0] + (time.time() - estado[1]) * rate)
+        current_calls = max_calls - tokens
+
         return {
-            'current': current_calls,
+            'current': round(current_calls, 2),
             'max': max_calls,
-            'percentage': (current_calls / max_calls * 100) if max_calls > 0 else 0
+            'percentage': current_calls / max_calls * 100,
+            'rejections': self.rejections[api_name]
         }
 
 # Instância global
@@ -0,0 +1,105 @@
+"""Pipeline de pesquisa paralela para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Consulta PubMed, NewsAPI e Perplexity em simultâneo, com prazo por fonte.
+Fontes que não respondem dentro do prazo ficam como pendentes e o pacote
+é devolvido com os resultados parciais disponíveis.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from . import sources
+from .article_index import article_index
+from .logger import log_error
+
+# Prazo máximo (segundos) por fonte
+PRAZOS_PADRAO = {
+    'pubmed': 8.0,
+    'newsapi': 6.0,
+    'perplexity': 20.0,
+}
+
+FONTES = tuple(PRAZOS_PADRAO)
+
+# Pool partilhado: pedidos que excedem o prazo terminam em fundo sem bloquear quem chama
+_executor = ThreadPoolExecutor(max_workers=12, thread_name_prefix='research')
+
+
+# Exemplos do separador Perplexity: rótulo do botão -> pergunta
+PERGUNTAS_RAPIDAS = {
+    "🦵 Rutura LCA": "Quais são os protocolos mais recentes e baseados em evidência para reabilitação de rutura do ligamento cruzado anterior em atletas profissionais?",
+    "⚽ Entorse Tornozelo": "Quais são as melhores práticas para tratamento e prevenção de entorses de tornozelo em futebolistas?",
+    "🏋️ Tendinite Patelar": "Qual é o tratamento mais eficaz para tendinite patelar (joelho do saltador) baseado em evidência científica?",
+}
+
+
+def pergunta_perplexity(tema: str) -> str:
+    """Pergunta enviada à Perplexity para resumir a evidência sobre um tema"""
+    return (
+        f"Resume a evidência científica mais recente sobre {tema}: "
+        "sintomas, diagnóstico, tratamento, reabilitação e prevenção."
+    )
+
+
+def _tarefas(tema: str, api_keys: dict, max_results: int) -> dict:
+    return {
+        'pubmed': lambda: article_index.pesquisar_artigos(tema, max_results),
+        'newsapi': lambda: sources.buscar_noticias(tema, api_keys.get('newsapi', ''), max_results),
+        'perplexity': lambda: sources.buscar_perplexity_detalhado(pergunta_perplexity(tema),
+                                                                  api_keys.get('perplexity', '')),
+    }
+
+
+def pesquisar_fontes(tema: str, api_keys: dict, fontes=FONTES, prazos: dict = None,
+                     max_results: int = 5) -> dict:
+    """Lança todas as fontes em paralelo e recolhe o que chegar dentro do prazo
+
+    Retorna um dicionário com uma chave por fonte ('pubmed', 'newsapi',
+    'perplexity'), mais 'pendentes' (fontes fora do prazo), 'erros'
+    (fonte -> mensagem) e 'duracao_ms'. Se a resposta da Perplexity for a de
+    uma pergunta semelhante, 'perplexity_semelhante' tem essa pergunta.
+    """
+    prazos = {**PRAZOS_PADRAO, **(prazos or {})}
+    tarefas = _tarefas(tema, api_keys, max_results)
+
+    inicio = time.monotonic()
+    futuros = {nome: _executor.submit(tarefas[nome]) for nome in fontes if nome in tarefas}
+
+    pacote = {'tema': tema, 'pendentes': [], 'erros': {}}
+    # Esperar primeiro pelas fontes com prazo mais curto
+    for nome in sorted(futuros, key=lambda n: prazos[n]):
+        restante = max(0.0, inicio + prazos[nome] - time.monotonic())
+        try:
+            resultado = futuros[nome].result(timeout=restante)
+            if nome == 'perplexity':
+                resultado, semelhante = resultado
+                if semelhante is not None:
+                    pacote['perplexity_semelhante'] = semelhante.pergunta
+            pacote[nome] = resultado
+        except FuturesTimeout:
+            pacote['pendentes'].append(nome)
+        except Exception as e:
+            pacote['erros'][nome] = str(e)
+            log_error('pesquisar_fontes', e)
+
+    pacote['duracao_ms'] = (time.monotonic() - inicio) * 1000
+    return pacote
+
+
+def resumo_evidencia(fonte: str, pacote: dict) -> dict:
+    """Converte um pacote de pesquisa no bloco 'fonte_dados' das estruturas geradas"""
+    resumo = {
+        'entrada': fonte,
+        'artigos_pubmed': pacote.get('pubmed', []),
+        'noticias': pacote.get('newsapi', []),
+        'resumo_perplexity': pacote.get('perplexity', ''),
+        'fontes_incompletas': sorted(set(pacote.get('pendentes', [])) | set(pacote.get('erros', {}))),
+    }
+    if pacote.get('perplexity_semelhante'):
+        resumo['perplexity_reutilizada_de'] = pacote['perplexity_semelhante']
+    return resumo
+
+
+__all__ = ['pesquisar_fontes', 'resumo_evidencia', 'pergunta_perplexity', 'PERGUNTAS_RAPIDAS', 'PRAZOS_PADRAO',
+           'FONTES']
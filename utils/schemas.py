@@ -0,0 +1,272 @@
+"""Esquemas dos documentos gerados para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Dataclasses que descrevem o infográfico e o roteiro de vídeo. de_dict()
+converte e valida uma estrutura gerada: tipos, campos obrigatórios e campos
+desconhecidos. Os erros são SchemaError, com o caminho do campo inválido.
+para_dict() faz o caminho inverso e omite os campos opcionais ausentes.
+"""
+
+from dataclasses import MISSING, dataclass, fields, is_dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union, get_args, get_origin, get_type_hints
+
+
+class SchemaError(ValueError):
+    """Documento que não respeita o esquema"""
+    pass
+
+
+# Fonte original (texto) ou bloco de evidência (ver research.resumo_evidencia)
+FonteDados = Union[str, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class Secao:
+    id: int
+    tipo: str
+    titulo: str
+    conteudo: str
+    visual_hint: str
+    itens: Optional[List[Any]] = None
+    sinais_alerta: Optional[List[str]] = None
+
+
+@dataclass(frozen=True)
+class Layout:
+    tipo: str
+    cores_principais: List[str]
+    fonte_titulo: str
+    fonte_corpo: str
+
+
+@dataclass(frozen=True)
+class MetadataInfografico:
+    titulo: str
+    data_criacao: str
+    publico_alvo: str
+    idioma: str
+    nivel_detalhe: str
+    lesao_id: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ConteudoInfografico:
+    titulo_principal: str
+    subtitulo: str
+    secoes: List[Secao]
+    layout: Layout
+
+
+@dataclass(frozen=True)
+class IntegracaoInfografico:
+    plataforma_destino: str
+    fonte_dados: FonteDados
+
+
+@dataclass(frozen=True)
+class Infografico:
+    metadata: MetadataInfografico
+    conteudo: ConteudoInfografico
+    integracao: IntegracaoInfografico
+
+
+@dataclass(frozen=True)
+class Narrador:
+    role: str
+    texto: str
+    tom_voz: str
+
+
+@dataclass(frozen=True)
+class Visual:
+    tipo: str
+    elementos: List[str]
+
+
+@dataclass(frozen=True)
+class Cena:
+    id: int
+    duracao: int
+    tipo: str
+    narrador: Narrador
+    visual: Visual
+
+
+@dataclass(frozen=True)
+class Audio:
+    narrador_voz: str
+    musica_fundo: str
+    efeitos_sonoros: List[str]
+
+
+@dataclass(frozen=True)
+class MetadataRoteiro:
+    titulo: str
+    data_criacao: str
+    publico_alvo: str
+    idioma: str
+    duracao_alvo: int
+    tom: str
+    lesao_id: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class IntegracaoRoteiro:
+    plataforma_video: str
+    plataforma_audio: str
+    fonte_dados: FonteDados
+
+
+@dataclass(frozen=True)
+class Roteiro:
+    metadata: MetadataRoteiro
+    cenas: List[Cena]
+    audio: Audio
+    integracao: IntegracaoRoteiro
+
+
+# Esquema por tipo de documento (os mesmos tipos de batch.py)
+ESQUEMAS = {'infografico': Infografico, 'video': Roteiro}
+
+
+@lru_cache(maxsize=None)
+def _campos(cls) -> tuple:
+    tipos = get_type_hints(cls)
+    return tuple((f.name, tipos[f.name], f.default is not MISSING) for f in fields(cls))
+
+
+class _Invalido(Exception):
+    """Erro interno de validação; o caminho do campo é montado só quando há erro"""
+
+    def __init__(self, mensagem: str):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+        self.caminho = []
+
+
+def _erro_tipo(esperado: str, valor) -> _Invalido:
+    return _Invalido(f"esperado {esperado}, recebido {type(valor).__name__}")
+
+
+@lru_cache(maxsize=None)
+def _conversor(tipo):
+    """Função valor -> valor convertido para o tipo, construída uma vez por tipo"""
+    if tipo is Any:
+        return lambda valor: valor
+
+    if is_dataclass(tipo):
+        campos = [(nome, _conversor(t), opcional) for nome, t, opcional in _campos(tipo)]
+        nomes = frozenset(nome for nome, _, _ in campos)
+
+        def dataclass_(valor):
+            if not isinstance(valor, dict):
+                raise _erro_tipo('objeto', valor)
+            if not nomes.issuperset(valor):
+                raise _Invalido(f"campos desconhecidos {sorted(set(valor) - nomes)}")
+            valores = {}
+            for nome, conversor, opcional in campos:
+                if nome in valor:
+                    try:
+                        valores[nome] = conversor(valor[nome])
+                    except _Invalido as e:
+                        e.caminho.append(f".{nome}")
+                        raise
+                elif not opcional:
+                    erro = _Invalido("campo obrigatório em falta")
+                    erro.caminho.append(f".{nome}")
+                    raise erro
+            return tipo(**valores)
+        return dataclass_
+
+    origem, args = get_origin(tipo), get_args(tipo)
+    if origem is Union:
+        opcional = type(None) in args
+        alternativas = [_conversor(a) for a in args if a is not type(None)]
+
+        def union_(valor):
+            if valor is None and opcional:
+                return None
+            for conversor in alternativas:
+                try:
+                    return conversor(valor)
+                except _Invalido:
+                    continue
+            raise _Invalido(f"tipo inválido ({type(valor).__name__})")
+        return union_
+
+    if origem is list:
+        item = _conversor(args[0])
+
+        def lista_(valor):
+            if not isinstance(valor, (list, tuple)):
+                raise _erro_tipo('lista', valor)
+            resultado = []
+            for i, v in enumerate(valor):
+                try:
+                    resultado.append(item(v))
+                except _Invalido as e:
+                    e.caminho.append(f"[{i}]")
+                    raise
+            return resultado
+        return lista_
+
+    if origem is dict:
+        item = _conversor(args[1])
+
+        def dicionario_(valor):
+            if not isinstance(valor, dict):
+                raise _erro_tipo('objeto', valor)
+            resultado = {}
+            for k, v in valor.items():
+                try:
+                    resultado[k] = item(v)
+                except _Invalido as e:
+                    e.caminho.append(f".{k}")
+                    raise
+            return resultado
+        return dicionario_
+
+    def escalar_(valor):
+        # bool é subclasse de int, mas não é um valor válido para campos numéricos
+        if not isinstance(valor, tipo) or (isinstance(valor, bool) and tipo is not bool):
+            raise _erro_tipo(tipo.__name__, valor)
+        return valor
+    return escalar_
+
+
+def de_dict(cls, dados: dict, caminho: str = '$'):
+    """Constrói e valida a dataclass 'cls' a partir de um dicionário"""
+    try:
+        return _conversor(cls)(dados)
+    except _Invalido as e:
+        raise SchemaError(f"{caminho}{''.join(reversed(e.caminho))}: {e.mensagem}") from None
+
+
+def para_dict(obj):
+    """Estrutura de dicionários/listas de uma dataclass, sem opcionais a None"""
+    if is_dataclass(obj):
+        resultado = {}
+        for nome, _, opcional in _campos(type(obj)):
+            valor = getattr(obj, nome)
+            if not (opcional and valor is None):
+                resultado[nome] = para_dict(valor)
+        return resultado
+    if isinstance(obj, (list, tuple)):
+        return [para_dict(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: para_dict(v) for k, v in obj.items()}
+    return obj
+
+
+def validar(tipo: str, documento: dict):
+    """Valida um documento gerado ('infografico' ou 'video'). Retorna a dataclass"""
+    if tipo not in ESQUEMAS:
+        raise SchemaError(f"tipo de documento desconhecido: {tipo!r}")
+    return de_dict(ESQUEMAS[tipo], documento)
+
+
+__all__ = [
+    'SchemaError', 'Infografico', 'Roteiro', 'Secao', 'Cena', 'ESQUEMAS',
+    'de_dict', 'para_dict', 'validar'
+]
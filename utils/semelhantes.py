@@ -0,0 +1,310 @@
+"""Perguntas semelhantes para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Índice de perguntas já respondidas para reutilizar a resposta de uma pergunta
+quase igual (ex: "protocolo reabilitação LCA atletas" e "Qual o protocolo de
+reabilitação do LCA em atletas?"), sem rede nem modelos.
+
+Cada pergunta é reduzida ao conjunto dos seus termos (textnorm: sem acentos,
+stopwords PT/EN/ES e radicais, mantendo as negações) e a semelhança é o
+índice de Jaccard entre conjuntos. Jaccard alto não basta: um só termo
+diferente muda a resposta clínica ("ligamento cruzado anterior" vs
+"posterior", "futebolistas" vs "crianças", "com" vs "sem cirurgia"), por isso
+os termos que só uma das perguntas tem têm de ser todos neutros (NEUTROS:
+palavras interrogativas e genéricas como "demora", "recente", "melhor") e os
+distintivos (números, graus, lados) têm de ser iguais. Para não comparar com todo o índice, cada
+conjunto tem uma assinatura MinHash dividida em bandas (LSH): só as perguntas
+que coincidem em pelo menos uma banda são comparadas, o que torna a procura
+independente do tamanho do índice.
+
+O índice em memória está limitado a max_entradas (LRU). As perguntas são
+também guardadas em SQLite, partilhadas pelos processos do host: cada processo
+carrega as mais recentes no arranque e as novas de outros processos a cada
+SINCRONIZAR_S segundos.
+"""
+
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from .disk_cache import CACHE_DIR
+from .logger import log_error
+from .textnorm import STOPWORDS, radical, tokenizar
+
+# Semelhança de Jaccard mínima para reutilizar uma resposta
+LIMIAR = float(os.environ.get('SIA_SEMELHANCA_LIMIAR', '0.75'))
+# Perguntas com menos termos são ambíguas demais para reutilizar
+MIN_TERMOS = 2
+MAX_ENTRADAS = 5000
+# Linhas mantidas na base (as mais antigas são apagadas)
+MAX_GUARDADAS = 20000
+SINCRONIZAR_S = 5.0
+
+# 16 bandas de 5 valores: par com Jaccard 0,75 é candidato com probabilidade
+# ~98,7%, com 0,5 ~40% e com 0,3 só ~4%
+PERMUTACOES = 80
+LINHAS_BANDA = 5
+
+# Negações são stopwords na pesquisa de artigos, mas aqui mudam o sentido: só
+# se reutiliza uma resposta se as duas perguntas tiverem as mesmas negações
+NEGACOES = frozenset(('sem', 'nao', 'without', 'not', 'no', 'sin', 'nunca', 'never'))
+
+# Termos que podem existir só numa das perguntas sem mudar a resposta; qualquer
+# outro (estrutura anatómica, população, intervenção, negação) impede a reutilização
+NEUTROS = frozenset(radical(p) for p in (
+    'qual', 'quais', 'quanto', 'quantos', 'quantas', 'demora', 'demoram', 'leva', 'levam', 'dura', 'duram',
+    'atual', 'atuais', 'recente', 'recentes', 'ultimas', 'melhor', 'melhores', 'principal', 'principais',
+    'evidencia', 'evidencias', 'cientifica', 'cientificas', 'explica', 'explique', 'resumo', 'geral',
+    'saber', 'existe', 'existem', 'deve', 'devo', 'pode', 'posso',
+    'what', 'which', 'how', 'long', 'take', 'takes', 'best', 'recent', 'latest', 'current', 'main',
+    'evidence', 'explain', 'overview', 'should', 'can',
+    'cual', 'cuales', 'cuanto', 'tarda', 'mejor', 'mejores', 'reciente', 'recientes', 'actual', 'actuales',
+    'puedo', 'debo',
+))
+
+# Termos que, mudando um só, mudam a resposta clínica ("entorse grau 1" vs
+# "grau 3", joelho esquerdo vs direito): números, graus em numeração romana e
+# lados/gravidade, com os sinónimos PT/EN/ES reduzidos a uma forma
+_GRAUS = frozenset(('grau', 'grade', 'grado', 'tipo', 'type', 'estadio', 'stage'))
+_ROMANOS = {'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5'}
+_CANONICOS = {
+    **dict.fromkeys(('esquerdo', 'esquerda', 'left', 'izquierdo', 'izquierda'), 'esquerdo'),
+    **dict.fromkeys(('direito', 'direita', 'right', 'derecho', 'derecha'), 'direito'),
+    'bilateral': 'bilateral',
+    **dict.fromkeys(('leve', 'ligeiro', 'ligeira', 'mild'), 'leve'),
+    **dict.fromkeys(('moderado', 'moderada', 'moderate'), 'moderado'),
+    **dict.fromkeys(('grave', 'severo', 'severa', 'severe'), 'grave'),
+}
+
+_PRIMO = (1 << 61) - 1
+_rng = random.Random(20261017)
+_COEFICIENTES = tuple((_rng.randrange(1, _PRIMO), _rng.randrange(_PRIMO)) for _ in range(PERMUTACOES))
+
+
+def conjunto(pergunta: str) -> FrozenSet[str]:
+    """Termos de uma pergunta (radicais, sem stopwords exceto negações)"""
+    return frozenset(radical(t) for t in tokenizar(pergunta) if t not in STOPWORDS or t in NEGACOES)
+
+
+def _neutro(termo: str) -> bool:
+    """Termo que pode faltar numa das perguntas (números e graus romanos são comparados pelos distintivos)"""
+    return termo in NEUTROS or termo.isdigit() or termo in _ROMANOS
+
+
+def distintivos(pergunta: str) -> FrozenSet[str]:
+    """Números, graus e lados/gravidade da pergunta: só se reutiliza uma resposta se coincidirem"""
+    resultado, anterior = set(), ''
+    for token in tokenizar(pergunta):
+        if token.isdigit():
+            resultado.add(str(int(token)))
+        elif any(c.isdigit() for c in token):
+            resultado.add(token)  # 'c5', 'l4', '2a'
+        elif token in _ROMANOS and anterior in _GRAUS:
+            resultado.add(_ROMANOS[token])
+        elif token in _CANONICOS:
+            resultado.add(_CANONICOS[token])
+        anterior = token
+    return frozenset(resultado)
+
+
+@lru_cache(maxsize=4096)
+def _permutacoes(termo: str) -> Tuple[int, ...]:
+    """Valor do termo em cada permutação (os termos repetem-se muito entre perguntas)"""
+    h = int.from_bytes(hashlib.blake2b(termo.encode('utf-8'), digest_size=8).digest(), 'little')
+    return tuple((a * h + b) % _PRIMO for a, b in _COEFICIENTES)
+
+
+def assinatura(termos: FrozenSet[str]) -> Tuple[int, ...]:
+    """MinHash: o menor valor de cada permutação sobre os termos"""
+    return tuple(map(min, *(_permutacoes(t) for t in termos))) if len(termos) > 1 else _permutacoes(*termos)
+
+
+def bandas(valores: Tuple[int, ...]) -> Tuple[tuple, ...]:
+    return tuple((i, valores[i:i + LINHAS_BANDA]) for i in range(0, PERMUTACOES, LINHAS_BANDA))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+@dataclass(frozen=True)
+class Semelhante:
+    """Pergunta indexada mais próxima da procurada"""
+    pergunta: str
+    chave: str
+    similaridade: float
+
+
+@dataclass(frozen=True)
+class _Entrada:
+    pergunta: str
+    chave: str
+    termos: FrozenSet[str]
+    distintivos: FrozenSet[str]
+    bandas: Tuple[tuple, ...]
+
+
+class IndiceSemelhantes:
+    def __init__(self, path=None, limiar: float = LIMIAR, max_entradas: int = MAX_ENTRADAS):
+        self.path = Path(path) if path else CACHE_DIR / 'semelhantes.db'
+        self.limiar = limiar
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._baldes: Dict[tuple, set] = {}
+        self._lock = threading.RLock()
+        self._ultimo_id = 0
+        self._sincronizado = 0.0
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # ---- SQLite ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._init_db()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS perguntas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chave TEXT NOT NULL UNIQUE,
+                    pergunta TEXT NOT NULL,
+                    criado REAL NOT NULL
+                );
+            """)
+            conn.close()
+            self._initialized = True
+
+    def _sincronizar(self):
+        """Carrega as perguntas guardadas (por este ou outros processos) desde a última leitura"""
+        if time.monotonic() - self._sincronizado < SINCRONIZAR_S:
+            return
+        self._sincronizado = time.monotonic()
+        try:
+            linhas = self._conn().execute(
+                'SELECT id, chave, pergunta FROM perguntas WHERE id > ? ORDER BY id DESC LIMIT ?',
+                (self._ultimo_id, self.max_entradas)).fetchall()
+        except sqlite3.Error as e:
+            log_error('IndiceSemelhantes.sincronizar', e)
+            return
+        with self._lock:
+            for gid, chave, pergunta in reversed(linhas):
+                self._indexar(pergunta, chave)
+                self._ultimo_id = max(self._ultimo_id, gid)
+
+    # ---- Índice em memória ----
+
+    def _indexar(self, pergunta: str, chave: str):
+        termos = conjunto(pergunta)
+        if len(termos) < MIN_TERMOS:
+            return
+        if chave in self._entradas:
+            self._retirar(self._entradas[chave])
+        entrada = _Entrada(pergunta, chave, termos, distintivos(pergunta), bandas(assinatura(termos)))
+        self._entradas[chave] = entrada
+        for banda in entrada.bandas:
+            self._baldes.setdefault(banda, set()).add(chave)
+        while len(self._entradas) > self.max_entradas:
+            self._retirar(next(iter(self._entradas.values())))
+
+    def _retirar(self, entrada: _Entrada):
+        self._entradas.pop(entrada.chave, None)
+        for banda in entrada.bandas:
+            balde = self._baldes.get(banda)
+            if balde is not None:
+                balde.discard(entrada.chave)
+                if not balde:
+                    del self._baldes[banda]
+
+    # ---- API ----
+
+    def adicionar(self, pergunta: str, chave: str):
+        """Indexa uma pergunta respondida; 'chave' identifica a resposta (ex: chave da cache em disco)"""
+        with self._lock:
+            self._indexar(pergunta, chave)
+        try:
+            conn = self._conn()
+            cursor = conn.execute(
+                'INSERT INTO perguntas (chave, pergunta, criado) VALUES (?, ?, ?) '
+                'ON CONFLICT (chave) DO UPDATE SET pergunta = excluded.pergunta, criado = excluded.criado',
+                (chave, pergunta, time.time()))
+            if cursor.lastrowid and cursor.lastrowid % 100 == 0:
+                conn.execute('DELETE FROM perguntas WHERE id <= ?', (cursor.lastrowid - MAX_GUARDADAS,))
+        except sqlite3.Error as e:
+            log_error('IndiceSemelhantes.adicionar', e)
+
+    def remover(self, chave: str):
+        """Retira do índice uma resposta que já não existe"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada:
+                self._retirar(entrada)
+
+    def procurar(self, pergunta: str, excluir: str = None, limiar: float = None) -> Optional[Semelhante]:
+        """A pergunta indexada mais semelhante (Jaccard >= limiar), ou None
+
+        'excluir' ignora a entrada com essa chave (a da própria pergunta). Os
+        termos que só uma das perguntas tem têm de ser neutros e os
+        distintivos (números, graus, lados) iguais.
+        """
+        self._sincronizar()
+        termos = conjunto(pergunta)
+        if len(termos) < MIN_TERMOS:
+            return None
+        limiar = self.limiar if limiar is None else limiar
+        chaves = distintivos(pergunta)
+        candidatas = set()
+        with self._lock:
+            for banda in bandas(assinatura(termos)):
+                candidatas.update(self._baldes.get(banda, ()))
+            candidatas.discard(excluir)
+            melhor, similaridade = None, limiar
+            n = len(termos)
+            for chave in candidatas:
+                outros = self._entradas[chave].termos
+                m = len(outros)
+                # Jaccard <= min/max dos tamanhos: salta a interseção com conjuntos de tamanho muito diferente
+                if min(n, m) < similaridade * max(n, m):
+                    continue
+                comuns = len(termos & outros)
+                valor = comuns / (n + m - comuns)
+                if (valor >= similaridade and all(map(_neutro, termos ^ outros))
+                        and self._entradas[chave].distintivos == chaves):
+                    melhor, similaridade = self._entradas[chave], valor
+            if melhor is None:
+                return None
+            self._entradas.move_to_end(melhor.chave)
+        return Semelhante(melhor.pergunta, melhor.chave, similaridade)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+# Instância global (perguntas à Perplexity)
+perguntas_semelhantes = IndiceSemelhantes()
+
+
+__all__ = ['IndiceSemelhantes', 'LIMIAR', 'NEUTROS', 'Semelhante', 'assinatura', 'conjunto', 'distintivos', 'jaccard',
+           'perguntas_semelhantes']
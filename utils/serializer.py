@@ -0,0 +1,157 @@
+"""Serialização JSON para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Camada única para converter as estruturas geradas em JSON. Usa orjson ou
+msgspec quando estão instalados e o módulo json da biblioteca padrão caso
+contrário (SIA_JSON_BACKEND=orjson|msgspec|json força um backend). Dois modos:
+compacto (webhooks, JSONL) e legível, com indentação de 2 espaços (downloads).
+O resultado é sempre UTF-8 sem escapes \\uXXXX, como
+json.dumps(..., ensure_ascii=False).
+
+Também lê e escreve pacotes JSONL, comprimidos com gzip quando o nome do
+ficheiro termina em .gz.
+"""
+
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+# Nível de compressão dos pacotes .jsonl.gz (6: bom compromisso tamanho/tempo)
+GZIP_NIVEL = 6
+
+
+class _Stdlib:
+    nome = 'json'
+
+    def dumps(self, obj, pretty: bool) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, dados):
+        return json.loads(dados)
+
+
+class _Orjson:
+    nome = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj, pretty: bool) -> bytes:
+        return self._orjson.dumps(obj, option=self._orjson.OPT_INDENT_2 if pretty else 0)
+
+    def loads(self, dados):
+        return self._orjson.loads(dados)
+
+
+class _Msgspec:
+    nome = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._formatar = msgspec.json.format
+
+    def dumps(self, obj, pretty: bool) -> bytes:
+        dados = self._encoder.encode(obj)
+        return self._formatar(dados, indent=2) if pretty else dados
+
+    def loads(self, dados):
+        return self._decoder.decode(dados)
+
+
+# Por ordem de preferência
+BACKENDS = {'orjson': _Orjson, 'msgspec': _Msgspec, 'json': _Stdlib}
+
+
+def _abrir(path, modo: str):
+    path = Path(path)
+    if path.suffix.lower() == '.gz':
+        return gzip.open(path, modo, compresslevel=GZIP_NIVEL)
+    return open(path, modo)
+
+
+class JsonlWriter:
+    """Escreve um documento por linha (compacto); '-' é o stdout"""
+
+    def __init__(self, serializer: 'Serializer', path):
+        self._dumps = serializer.dumps
+        self._stdout = str(path) == '-'
+        self._f = sys.stdout.buffer if self._stdout else _abrir(path, 'wb')
+        self.linhas = 0
+
+    def escrever(self, documento):
+        self._f.write(self._dumps(documento) + b'\n')
+        self.linhas += 1
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        if self._stdout:
+            self._f.flush()
+        else:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Serializer:
+    def __init__(self, backend: str = None):
+        self.backend = self._escolher(backend or os.environ.get('SIA_JSON_BACKEND'))
+
+    @staticmethod
+    def _escolher(nome: str = None):
+        """Primeiro backend disponível (o pedido, se existir; senão por preferência)"""
+        candidatos = ([nome] if nome in BACKENDS else []) + list(BACKENDS)
+        for candidato in candidatos:
+            try:
+                return BACKENDS[candidato]()
+            except ImportError:
+                continue
+        return _Stdlib()
+
+    @property
+    def nome(self) -> str:
+        return self.backend.nome
+
+    def dumps(self, obj, pretty: bool = False) -> bytes:
+        """JSON em UTF-8: compacto por omissão, indentado com pretty=True"""
+        return self.backend.dumps(obj, pretty)
+
+    def dumps_str(self, obj, pretty: bool = False) -> str:
+        return self.backend.dumps(obj, pretty).decode('utf-8')
+
+    def loads(self, dados) -> Any:
+        return self.backend.loads(dados)
+
+    def abrir_jsonl(self, path) -> JsonlWriter:
+        return JsonlWriter(self, path)
+
+    def escrever_jsonl(self, documentos: Iterable, path) -> int:
+        """Escreve um pacote JSONL (.jsonl ou .jsonl.gz). Retorna o nº de linhas"""
+        with self.abrir_jsonl(path) as saida:
+            for documento in documentos:
+                saida.escrever(documento)
+        return saida.linhas
+
+    def ler_jsonl(self, path) -> Iterator:
+        """Gera os documentos de um pacote JSONL (.jsonl ou .jsonl.gz)"""
+        with _abrir(path, 'rb') as f:
+            for linha in f:
+                if linha.strip():
+                    yield self.backend.loads(linha)
+
+
+# Instância global
+serializer = Serializer()
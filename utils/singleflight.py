@@ -0,0 +1,145 @@
+"""Coalescência de pedidos idênticos para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Quando várias sessões pedem a mesma consulta ao mesmo tempo, só a primeira
+chama a API; as restantes esperam e recebem o mesmo resultado (ou exceção).
+A coalescência é feita dentro do processo (todas as sessões Streamlit de um
+servidor partilham o mesmo processo).
+
+Respostas em streaming são partilhadas parte a parte (stream): o gerador corre
+numa thread própria e cada pedido concorrente recebe todas as partes desde o
+início, à medida que chegam.
+"""
+
+import inspect
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from .disk_cache import ARGS_IGNORADOS, normalizar
+
+
+class _Chamada:
+    __slots__ = ('evento', 'resultado', 'erro')
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class _Transmissao:
+    __slots__ = ('condicao', 'partes', 'terminado', 'erro')
+
+    def __init__(self):
+        self.condicao = threading.Condition()
+        self.partes = []
+        self.terminado = False
+        self.erro = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._em_curso = {}
+        self._transmissoes = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'chamadas': 0, 'coalescidas': 0})
+
+    def do(self, chave, func, *args, **kwargs):
+        """Executa func uma única vez por chave entre chamadas concorrentes"""
+        nome = chave[0] if isinstance(chave, tuple) else chave
+        with self._lock:
+            self._stats[nome]['chamadas'] += 1
+            chamada = self._em_curso.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self._em_curso[chave] = _Chamada()
+            else:
+                self._stats[nome]['coalescidas'] += 1
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = func(*args, **kwargs)
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._em_curso[chave]
+            chamada.evento.set()
+
+    def stream(self, chave, gerar):
+        """Gera as partes de gerar() uma única vez por chave entre pedidos concorrentes
+
+        O gerador corre numa thread até ao fim mesmo que quem o pediu deixe de
+        ler (ex: sessão fechada), para não deixar os restantes à espera.
+        """
+        nome = chave[0] if isinstance(chave, tuple) else chave
+        with self._lock:
+            self._stats[nome]['chamadas'] += 1
+            transmissao = self._transmissoes.get(chave)
+            if transmissao is None:
+                transmissao = self._transmissoes[chave] = _Transmissao()
+                threading.Thread(target=self._transmitir, args=(chave, transmissao, gerar),
+                                 daemon=True, name=f'singleflight-{nome}').start()
+            else:
+                self._stats[nome]['coalescidas'] += 1
+
+        lidas = 0
+        while True:
+            with transmissao.condicao:
+                transmissao.condicao.wait_for(lambda: transmissao.terminado or len(transmissao.partes) > lidas)
+                novas, terminado = transmissao.partes[lidas:], transmissao.terminado
+            lidas += len(novas)
+            yield from novas
+            if terminado:
+                if transmissao.erro is not None:
+                    raise transmissao.erro
+                return
+
+    def _transmitir(self, chave, transmissao: _Transmissao, gerar):
+        try:
+            for parte in gerar():
+                with transmissao.condicao:
+                    transmissao.partes.append(parte)
+                    transmissao.condicao.notify_all()
+        except BaseException as e:
+            transmissao.erro = e
+        finally:
+            with self._lock:
+                del self._transmissoes[chave]
+            with transmissao.condicao:
+                transmissao.terminado = True
+                transmissao.condicao.notify_all()
+
+    def coalesce(self, nome: str):
+        """Decorador: chamadas concorrentes com os mesmos argumentos partilham a execução"""
+        def decorator(func):
+            assinatura = inspect.signature(func)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = assinatura.bind(*args, **kwargs)
+                bound.apply_defaults()
+                chave = (nome,) + tuple(
+                    (k, normalizar(v)) for k, v in bound.arguments.items() if k not in ARGS_IGNORADOS
+                )
+                return self.do(chave, func, *args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    def get_stats(self) -> dict:
+        """Chamadas e chamadas coalescidas por fonte"""
+        with self._lock:
+            return {nome: dict(stats) for nome, stats in self._stats.items()}
+
+
+# Instância global
+singleflight = SingleFlight()
@@ -0,0 +1,279 @@
+"""Fontes de dados externas para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Chamadas às APIs PubMed, NewsAPI e Perplexity sem dependência do Streamlit,
+para poderem correr em threads de fundo. Os erros são propagados como exceções;
+a apresentação de avisos fica a cargo de quem chama. Cada pedido HTTP consome
+uma vaga do rate limiter global (RateLimitExceeded se não houver vaga a tempo).
+Consultas idênticas em simultâneo partilham uma única chamada (singleflight).
+Uma pergunta à Perplexity sem resposta própria em cache pode reutilizar a
+resposta a uma pergunta semelhante (ver semelhantes.py). Com o disjuntor da
+fonte aberto (disjuntores.py) não há pedido nem consumo de quota: é servido o
+último valor guardado em cache ou lançado CircuitoAberto.
+"""
+
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .disjuntores import CircuitoAberto, disjuntores
+from .disk_cache import disk_cache
+from .http_client import http_client
+from .logger import log_api_call, log_error
+from .metrics import metrics
+from .rate_limiter import rate_limiter
+from .semelhantes import Semelhante, perguntas_semelhantes
+from .singleflight import singleflight
+
+PERPLEXITY_MODEL = "llama-3.1-sonar-small-128k-online"
+PERPLEXITY_SYSTEM_PROMPT = (
+    "Você é um especialista em medicina desportiva e fisioterapia. Fornece informações precisas, "
+    "detalhadas e baseadas em evidência científica sobre lesões desportivas, tratamentos, "
+    "reabilitação e prevenção."
+)
+
+
+def formatar_artigo(pmid: str, article: dict) -> Dict:
+    """Converte um registo esummary no formato de artigo usado pela app"""
+    return {
+        'pmid': pmid,
+        'title': article.get('title', 'N/A'),
+        'authors': ', '.join([a.get('name', '') for a in article.get('authors', [])[:3]]),
+        'journal': article.get('source', 'N/A'),
+        'pubdate': article.get('pubdate', 'N/A'),
+        'url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+    }
+
+
+@singleflight.coalesce('pubmed')
+@disk_cache.cached('pubmed')
+@metrics.timed('api_request', source='pubmed')
+def buscar_pubmed(query: str, max_results: int = 5) -> List[Dict]:
+    """Busca artigos no PubMed via API pública - GRATUITO"""
+    start_time = time.time()
+    search_params = {'db': 'pubmed', 'term': query, 'retmax': max_results, 'retmode': 'json', 'sort': 'relevance'}
+    disjuntores.verificar('pubmed')
+    rate_limiter.require('pubmed')
+    search_response = http_client.get('pubmed', '/entrez/eutils/esearch.fcgi', params=search_params)
+    search_data = search_response.json()
+    ids = search_data.get('esearchresult', {}).get('idlist', [])
+    if not ids:
+        return []
+
+    fetch_params = {'db': 'pubmed', 'id': ','.join(ids), 'retmode': 'json'}
+    rate_limiter.require('pubmed')
+    fetch_response = http_client.get('pubmed', '/entrez/eutils/esummary.fcgi', params=fetch_params)
+    fetch_data = fetch_response.json()
+
+    artigos = [formatar_artigo(pmid, fetch_data['result'][pmid])
+               for pmid in ids if pmid in fetch_data.get('result', {})]
+    log_api_call('pubmed', query, 'OK', (time.time() - start_time) * 1000, len(artigos))
+    return artigos
+
+
+@singleflight.coalesce('newsapi')
+@disk_cache.cached('newsapi')
+@metrics.timed('api_request', source='newsapi')
+def buscar_noticias(query: str, api_key: str, max_results: int = 5) -> List[Dict]:
+    """Busca notícias via NewsAPI"""
+    if not api_key:
+        return []
+    start_time = time.time()
+    params = {'q': query, 'language': 'pt', 'sortBy': 'publishedAt', 'pageSize': max_results, 'apiKey': api_key}
+    disjuntores.verificar('newsapi')
+    rate_limiter.require('newsapi')
+    response = http_client.get('newsapi', '/v2/everything', params=params)
+    data = response.json()
+    if data.get('status') != 'ok':
+        return []
+    noticias = [{'title': article.get('title', 'N/A'), 'source': article.get('source', {}).get('name', ''), 'description': article.get('description', 'N/A'), 'url': article.get('url', ''), 'publishedAt': article.get('publishedAt', 'N/A')} for article in data.get('articles', [])]
+    log_api_call('newsapi', query, 'OK', (time.time() - start_time) * 1000, len(noticias))
+    return noticias
+
+
+def _pedido_perplexity(query: str, api_key: str, stream: bool = False):
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "model": PERPLEXITY_MODEL,
+        "messages": [
+            {"role": "system", "content": PERPLEXITY_SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ],
+        "temperature": 0.2,
+        "max_tokens": 1000
+    }
+    if stream:
+        payload["stream"] = True
+    return headers, payload
+
+
+@metrics.timed('api_request', source='perplexity')
+def perguntar_perplexity(query: str, api_key: str) -> str:
+    """Pedido à Perplexity AI, sem caches (o aquecimento renova as respostas com esta função)"""
+    if not api_key:
+        return ""
+    start_time = time.time()
+    headers, payload = _pedido_perplexity(query, api_key)
+    disjuntores.verificar('perplexity')
+    rate_limiter.require('perplexity')
+    response = http_client.post('perplexity', '/chat/completions', json=payload, headers=headers)
+    response_data = response.json()
+
+    if 'choices' in response_data and len(response_data['choices']) > 0:
+        resultado = response_data['choices'][0]['message']['content']
+        log_api_call('perplexity', query, 'OK', (time.time() - start_time) * 1000, len(resultado))
+        return resultado
+    return ""
+
+
+def resposta_semelhante(query: str) -> Optional[Tuple[Semelhante, str]]:
+    """(pergunta semelhante, resposta) em cache para uma pergunta sem resposta própria, ou None
+
+    Só reutiliza respostas frescas (dentro do TTL): uma resposta antiga passaria
+    a contar como nova na entrada da pergunta que a reutiliza.
+    """
+    chave = disk_cache.chave('perplexity', query=query)
+    try:
+        if disk_cache.get('perplexity', chave)[1] != 'miss':
+            return None
+        for _ in range(3):
+            semelhante = perguntas_semelhantes.procurar(query, excluir=chave)
+            if semelhante is None:
+                break
+            resposta, estado = disk_cache.get('perplexity', semelhante.chave)
+            if estado == 'fresh':
+                metrics.inc('similar_questions_total', result='hit', source='perplexity')
+                return semelhante, resposta
+            # Resposta expirada ou removida da cache: deixa de ser candidata
+            perguntas_semelhantes.remover(semelhante.chave)
+    except sqlite3.Error as e:
+        log_error('resposta_semelhante', e)
+    metrics.inc('similar_questions_total', result='miss', source='perplexity')
+    return None
+
+
+def _indexar_pergunta(query: str):
+    perguntas_semelhantes.adicionar(query, disk_cache.chave('perplexity', query=query))
+
+
+@singleflight.coalesce('perplexity')
+@disk_cache.cached('perplexity')
+def _perplexity_propria(query: str, api_key: str) -> str:
+    """Resposta da própria pergunta (cache em disco ou API)"""
+    resultado = perguntar_perplexity(query, api_key)
+    if resultado:
+        _indexar_pergunta(query)
+    return resultado
+
+
+def buscar_perplexity_detalhado(query: str, api_key: str) -> Tuple[str, Optional[Semelhante]]:
+    """(resposta, pergunta semelhante reutilizada ou None)
+
+    Sem resposta em cache para esta pergunta, reutiliza a de uma pergunta
+    semelhante antes de chamar a API. A resposta reutilizada não é guardada
+    na entrada desta pergunta: expira com a original e não passa a contar
+    como resposta própria.
+    """
+    if not api_key:
+        return "", None
+    reutilizada = resposta_semelhante(query)
+    if reutilizada:
+        semelhante, resposta = reutilizada
+        return resposta, semelhante
+    return _perplexity_propria(query, api_key), None
+
+
+def buscar_perplexity(query: str, api_key: str) -> str:
+    """Busca informações sobre lesões desportivas via Perplexity AI
+
+    Pode devolver a resposta a uma pergunta semelhante; para saber qual, usar
+    buscar_perplexity_detalhado.
+    """
+    return buscar_perplexity_detalhado(query, api_key)[0]
+
+
+def _eventos_sse(response):
+    """Gera o JSON de cada evento 'data:' de um stream SSE até [DONE]"""
+    for linha in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if not linha or not linha.startswith('data:'):
+            continue
+        dados = linha[5:].strip()
+        if dados == '[DONE]':
+            return
+        yield json.loads(dados)
+
+
+def buscar_perplexity_stream(query: str, api_key: str):
+    """Versão em streaming de buscar_perplexity: gera o texto à medida que chega
+
+    Usa a mesma entrada da cache em disco que buscar_perplexity: uma resposta já
+    guardada é devolvida de uma vez; uma resposta nova é guardada quando o
+    stream termina. Pedidos concorrentes da mesma pergunta partilham um único
+    stream (singleflight). Com o disjuntor aberto, devolve a última resposta
+    guardada (mesmo expirada), se existir.
+    """
+    if not api_key:
+        return
+    chave = disk_cache.chave('perplexity', query=query)
+    try:
+        guardado, estado = disk_cache.get('perplexity', chave)
+    except sqlite3.Error:
+        guardado, estado = None, 'miss'
+    if estado != 'miss':
+        yield guardado
+        return
+
+    try:
+        disjuntores.verificar('perplexity')
+    except CircuitoAberto:
+        anterior = disk_cache.ultimo('perplexity', chave)
+        if anterior is None:
+            raise
+        yield anterior
+        return
+
+    yield from singleflight.stream(('perplexity', chave), lambda: _stream_perplexity(query, api_key, chave))
+
+
+def _stream_perplexity(query: str, api_key: str, chave: str):
+    """Pedido em streaming à API; regista o tempo até ao primeiro token e guarda a resposta completa"""
+    start_time = time.time()
+    headers, payload = _pedido_perplexity(query, api_key, stream=True)
+    rate_limiter.require('perplexity')
+    partes = []
+    try:
+        with http_client.post('perplexity', '/chat/completions', json=payload,
+                              headers=headers, stream=True) as response:
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            for evento in _eventos_sse(response):
+                choices = evento.get('choices') or [{}]
+                texto = (choices[0].get('delta') or {}).get('content') or ''
+                if not texto:
+                    continue
+                if not partes:
+                    metrics.observe('perplexity_ttft_seconds', time.time() - start_time)
+                partes.append(texto)
+                yield texto
+    except Exception:
+        metrics.inc('api_requests_total', status='error', source='perplexity')
+        raise
+
+    resultado = ''.join(partes)
+    metrics.observe('api_request_seconds', time.time() - start_time, source='perplexity')
+    metrics.inc('api_requests_total', status='ok', source='perplexity')
+    log_api_call('perplexity', query, 'OK', (time.time() - start_time) * 1000, len(resultado))
+    if resultado:
+        try:
+            disk_cache.set('perplexity', chave, resultado)
+        except sqlite3.Error as e:
+            log_error('buscar_perplexity_stream', e)
+        _indexar_pergunta(query)
+
+
+__all__ = ['buscar_pubmed', 'buscar_noticias', 'buscar_perplexity', 'buscar_perplexity_detalhado',
+           'buscar_perplexity_stream', 'perguntar_perplexity', 'resposta_semelhante']
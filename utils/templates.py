@@ -0,0 +1,389 @@
+"""Motor de templates para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+As secções do infográfico e as cenas do vídeo são descritas de forma
+declarativa (INFOGRAFICO, VIDEO); os textos são em português, como a base de
+conhecimento, e só a voz do narrador depende do idioma. Cada combinação de
+público, idioma, nível de detalhe (ou duração e tom) e lesão é compilada uma
+única vez num protótipo imutável: dicionários congelados e tuplos, com as
+durações das cenas e o conteúdo da base de conhecimento já calculados.
+Instanciar um protótipo copia apenas o caminho até aos campos variáveis (tema,
+data de criação, fonte de dados); o resto da estrutura é partilhado entre
+instâncias e não pode ser alterado. Para o mesmo input (incluindo a data), o
+resultado é sempre o mesmo.
+"""
+
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Optional
+
+from .knowledge_base import itens, knowledge_base, timeline
+
+IDIOMA_PADRAO = 'Português'
+
+# Muda quando os templates mudam: invalida as gerações guardadas no histórico
+VERSAO = '2'
+
+# Níveis de detalhe em que as secções com 'sinais_alerta' os incluem
+NIVEIS_SINAIS_ALERTA = ('Detalhado',)
+
+
+class Var:
+    """Campo variável de um template, preenchido em cada instância"""
+    __slots__ = ('nome', 'formato')
+
+    def __init__(self, nome: str, formato=None):
+        self.nome = nome
+        self.formato = formato   # str.format com {nome}, ou textos por idioma
+
+    def resolver(self, idioma: str) -> 'Var':
+        return Var(self.nome, texto(self.formato, idioma)) if self.formato else self
+
+    def valor(self, valores: dict):
+        valor = valores[self.nome]
+        return self.formato.format_map({self.nome: valor}) if self.formato else valor
+
+    def partes(self) -> Optional[tuple]:
+        """(antes, depois) quando o formato tem só o campo {nome}, sem conversões"""
+        if not isinstance(self.formato, str):
+            return None
+        segmentos = list(Formatter().parse(self.formato))
+        if not segmentos or segmentos[0][1] != self.nome or segmentos[0][2] or segmentos[0][3]:
+            return None
+        resto = segmentos[1:]
+        if len(resto) > 1 or (resto and resto[0][1] is not None):
+            return None
+        return segmentos[0][0], resto[0][0] if resto else ''
+
+    def __repr__(self):
+        return f'Var({self.nome!r}, {self.formato!r})'
+
+
+class FrozenDict(dict):
+    """Dicionário só de leitura (continua a ser um dict para json/st.json)"""
+    __slots__ = ()
+
+    def _imutavel(self, *args, **kwargs):
+        raise TypeError('FrozenDict não pode ser alterado; use descongelar()')
+
+    __setitem__ = __delitem__ = __ior__ = _imutavel
+    clear = pop = popitem = setdefault = update = _imutavel
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def texto(valor, idioma: str):
+    """Texto no idioma pedido; '*' é o valor para os restantes idiomas"""
+    if isinstance(valor, dict):
+        return valor.get(idioma, valor.get('*', valor.get(IDIOMA_PADRAO)))
+    return valor
+
+
+def descongelar(obj):
+    """Cópia mutável (dicts e listas) de uma estrutura gerada"""
+    if isinstance(obj, dict):
+        return {k: descongelar(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [descongelar(v) for v in obj]
+    return obj
+
+
+def _congelar(obj, caminho: tuple, campos: list):
+    if isinstance(obj, Var):
+        campos.append((caminho, obj))
+        return obj
+    if isinstance(obj, dict):
+        return FrozenDict({k: _congelar(v, caminho + (k,), campos) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(_congelar(v, caminho + (i,), campos) for i, v in enumerate(obj))
+    return obj
+
+
+class Prototipo:
+    """Estrutura compilada: parte fixa congelada + campos variáveis
+
+    instanciar(valores) é uma função gerada para este protótipo que copia só os
+    contentores no caminho de cada campo variável e escreve os valores, sem
+    percorrer a estrutura.
+    """
+    __slots__ = ('estrutura', 'campos', 'codigo', 'instanciar')
+
+    def __init__(self, estrutura: dict):
+        campos = []
+        self.estrutura = _congelar(estrutura, (), campos)
+        self.campos = tuple(campos)
+        self.codigo, self.instanciar = self._gerar()
+
+    def _gerar(self):
+        # Contentores a copiar, pais antes dos filhos; n0 é a raiz
+        contentores = sorted({c[:i] for c, _ in self.campos for i in range(len(c))}, key=len)
+        posicao = {caminho: i for i, caminho in enumerate(contentores)}
+        ambiente = {'E': self.estrutura}
+        linhas = ['def instanciar(v):', '    n0 = dict(E)']
+        for i, caminho in enumerate(contentores[1:], 1):
+            original = self.estrutura
+            for chave in caminho:
+                original = original[chave]
+            tipo = 'dict' if isinstance(original, dict) else 'list'
+            pai, chave = posicao[caminho[:-1]], caminho[-1]
+            linhas.append(f'    n{i} = n{pai}[{chave!r}] = {tipo}(n{pai}[{chave!r}])')
+        for k, (caminho, var) in enumerate(self.campos):
+            partes = var.partes()
+            if var.formato is None:
+                expressao = f'v[{var.nome!r}]'
+            elif partes:
+                ambiente[f'A{k}'], ambiente[f'D{k}'] = partes
+                expressao = f'A{k} + str(v[{var.nome!r}]) + D{k}'
+            else:
+                ambiente[f'V{k}'] = var
+                expressao = f'V{k}.valor(v)'
+            linhas.append(f'    n{posicao[caminho[:-1]]}[{caminho[-1]!r}] = {expressao}')
+        linhas.append('    return n0')
+        codigo = '\n'.join(linhas)
+        exec(compile(codigo, '<template>', 'exec'), ambiente)
+        return codigo, ambiente['instanciar']
+
+
+# Infográfico: secções por ordem. 'lesao' é o campo da base de conhecimento que
+# substitui o conteúdo genérico (texto, ou lista cortada pelo nível de detalhe).
+# Os textos ficam em português em todos os idiomas, como o conteúdo da base de
+# conhecimento: traduzir só os títulos daria documentos meio traduzidos.
+INFOGRAFICO = {
+    'titulo': Var('tema', 'Infográfico: {tema}'),
+    'subtitulo': 'Informação para {publico}',
+    'secoes': (
+        {
+            'tipo': 'introducao',
+            'titulo': 'O que é?',
+            'conteudo': Var('tema', 'Introdução sobre {tema}'),
+            'visual_hint': 'ícone anatômico',
+            'lesao': 'descricao',
+        },
+        {
+            'tipo': 'sintomas',
+            'titulo': 'Sintomas',
+            'conteudo': 'Lista de sintomas principais',
+            'visual_hint': 'ícones de sintomas',
+            'lesao': 'sintomas',
+            'sinais_alerta': True,
+        },
+        {
+            'tipo': 'tratamento',
+            'titulo': 'Tratamento',
+            'conteudo': 'Opções de tratamento',
+            'visual_hint': 'fluxograma',
+            'lesao': 'tratamento',
+        },
+        {
+            'tipo': 'prevencao',
+            'titulo': 'Prevenção',
+            'conteudo': 'Dicas de prevenção',
+            'visual_hint': 'checklist visual',
+            'lesao': 'prevencao',
+        },
+    ),
+    # Secção acrescentada quando há lesão na base de conhecimento
+    'recuperacao': {
+        'tipo': 'recuperacao',
+        'titulo': 'Recuperação',
+        'visual_hint': 'timeline',
+    },
+    'layout': {
+        'tipo': 'vertical',
+        'cores_principais': ['#2E86AB', '#A23B72', '#F18F01'],
+        'fonte_titulo': 'Montserrat Bold',
+        'fonte_corpo': 'Open Sans'
+    },
+    'plataforma_destino': 'Canva',
+}
+
+# Vídeo: cenas por ordem, com a fração da duração total de cada uma.
+# 'lesao' é o texto do narrador quando há lesão na base de conhecimento.
+# Textos em português em todos os idiomas (exceto a voz do narrador).
+VIDEO = {
+    'titulo': Var('tema', 'Vídeo: {tema}'),
+    'role': 'especialista',
+    'cenas': (
+        {
+            'tipo': 'abertura',
+            'proporcao': 0.15,
+            'texto': Var('tema', 'Bem-vindo! Hoje vamos falar sobre {tema}'),
+            'visual': {'tipo': 'título animado', 'elementos': ['logo', 'título', 'subtítulo']},
+        },
+        {
+            'tipo': 'contexto',
+            'proporcao': 0.25,
+            'texto': 'Contextualização da lesão',
+            'lesao': '{descricao}',
+            'visual': {'tipo': 'animação anatômica', 'elementos': ['diagrama', 'setas', 'legendas']},
+        },
+        {
+            'tipo': 'explicacao',
+            'proporcao': 0.30,
+            'texto': 'Explicação detalhada dos sintomas e diagnóstico',
+            'lesao': 'Sintomas principais: {sintomas}.',
+            'visual': {'tipo': 'infográfico animado', 'elementos': ['lista', 'ícones', 'transições']},
+        },
+        {
+            'tipo': 'solucao',
+            'proporcao': 0.20,
+            'texto': 'Tratamentos e reabilitação',
+            'lesao': 'Tratamento: {tratamento}.{regresso}',
+            'visual': {'tipo': 'demonstração', 'elementos': ['exercícios', 'técnicas', 'equipamento']},
+        },
+        {
+            'tipo': 'encerramento',
+            'proporcao': 0.10,
+            'texto': 'Conclusão e call-to-action',
+            'lesao': 'Para prevenir: {prevencao}. Partilha este vídeo com a tua equipa!',
+            'visual': {'tipo': 'tela final', 'elementos': ['resumo', 'contatos', 'redes sociais']},
+        },
+    ),
+    'regresso': ' Regresso ao desporto: {periodo}.',
+    'audio': {
+        'narrador_voz': {'Português': 'Português nativo profissional', '*': 'Native speaker'},
+        'musica_fundo': 'corporativa suave',
+        'efeitos_sonoros': ['transições', 'highlights']
+    },
+    'plataforma_video': 'HeyGen/Synthesia',
+    'plataforma_audio': 'ElevenLabs',
+}
+
+
+def _minuscula(valor: str) -> str:
+    return valor[:1].lower() + valor[1:]
+
+
+def _resolver(valor, idioma: str):
+    return valor.resolver(idioma) if isinstance(valor, Var) else texto(valor, idioma)
+
+
+def _lesao(indice: Optional[int]) -> Optional[Dict]:
+    return knowledge_base.entrada(indice) if indice is not None else None
+
+
+@lru_cache(maxsize=4096)
+def compilar_infografico(publico: str, idioma: str, nivel_detalhe: str, lesao: int = None,
+                         versao_kb: str = None) -> Prototipo:
+    """Protótipo de infográfico; 'lesao' é o índice na base de conhecimento
+
+    'versao_kb' (knowledge_base.versao()) só entra na chave da cache: um
+    índice deixa de servir protótipos antigos quando o ficheiro muda.
+    """
+    t = INFOGRAFICO
+    entrada = _lesao(lesao)
+    secoes = []
+    for numero, modelo in enumerate(t['secoes'], 1):
+        secao = {
+            'id': numero,
+            'tipo': modelo['tipo'],
+            'titulo': texto(modelo['titulo'], idioma),
+            'conteudo': _resolver(modelo['conteudo'], idioma),
+            'visual_hint': modelo['visual_hint']
+        }
+        if entrada and modelo.get('lesao'):
+            valor = entrada[modelo['lesao']]
+            if isinstance(valor, list):
+                secao['conteudo'] = '; '.join(itens(valor, nivel_detalhe))
+                secao['itens'] = itens(valor, nivel_detalhe)
+            else:
+                secao['conteudo'] = valor
+            if modelo.get('sinais_alerta') and nivel_detalhe in NIVEIS_SINAIS_ALERTA and entrada.get('sinais_alerta'):
+                secao['sinais_alerta'] = entrada['sinais_alerta']
+        secoes.append(secao)
+    if entrada:
+        fases = timeline(entrada, publico)
+        secoes.append({
+            'id': len(secoes) + 1,
+            'tipo': t['recuperacao']['tipo'],
+            'titulo': texto(t['recuperacao']['titulo'], idioma),
+            'conteudo': ' → '.join(f"{f['fase']} ({f['periodo']})" for f in fases),
+            'itens': fases,
+            'visual_hint': t['recuperacao']['visual_hint']
+        })
+
+    metadata = {
+        'titulo': t['titulo'].resolver(idioma),
+        'data_criacao': Var('data_criacao'),
+        'publico_alvo': publico,
+        'idioma': idioma,
+        'nivel_detalhe': nivel_detalhe
+    }
+    if entrada:
+        metadata['lesao_id'] = entrada['id']
+    return Prototipo({
+        'metadata': metadata,
+        'conteudo': {
+            'titulo_principal': Var('tema'),
+            'subtitulo': texto(t['subtitulo'], idioma).format(publico=publico),
+            'secoes': secoes,
+            'layout': t['layout']
+        },
+        'integracao': {
+            'plataforma_destino': t['plataforma_destino'],
+            'fonte_dados': Var('fonte_dados')
+        }
+    })
+
+
+def _narracao_lesao(entrada: Dict, publico: str, idioma: str) -> Dict[str, str]:
+    """Campos da base de conhecimento usados nos textos 'lesao' das cenas"""
+    fases = timeline(entrada, publico)
+    return {
+        'descricao': entrada['descricao'],
+        'sintomas': ', '.join(map(_minuscula, entrada['sintomas'][:3])),
+        'tratamento': ', '.join(map(_minuscula, entrada['tratamento'][:3])),
+        'prevencao': _minuscula(entrada['prevencao'][0]),
+        'regresso': texto(VIDEO['regresso'], idioma).format(periodo=fases[-1]['periodo']) if fases else '',
+    }
+
+
+@lru_cache(maxsize=4096)
+def compilar_roteiro(publico: str, idioma: str, duracao: int, tom: str, lesao: int = None,
+                     versao_kb: str = None) -> Prototipo:
+    """Protótipo de roteiro de vídeo; 'lesao' é o índice na base de conhecimento (ver versao_kb
+    em compilar_infografico)"""
+    t = VIDEO
+    entrada = _lesao(lesao)
+    campos_lesao = _narracao_lesao(entrada, publico, idioma) if entrada else None
+    cenas = []
+    for numero, modelo in enumerate(t['cenas'], 1):
+        if campos_lesao and modelo.get('lesao'):
+            fala = texto(modelo['lesao'], idioma).format_map(campos_lesao)
+        else:
+            fala = _resolver(modelo['texto'], idioma)
+        cenas.append({
+            'id': numero,
+            'duracao': int(duracao * modelo['proporcao']),
+            'tipo': modelo['tipo'],
+            'narrador': {'role': t['role'], 'texto': fala, 'tom_voz': tom},
+            'visual': modelo['visual']
+        })
+
+    metadata = {
+        'titulo': t['titulo'].resolver(idioma),
+        'data_criacao': Var('data_criacao'),
+        'publico_alvo': publico,
+        'idioma': idioma,
+        'duracao_alvo': duracao,
+        'tom': tom
+    }
+    if entrada:
+        metadata['lesao_id'] = entrada['id']
+    return Prototipo({
+        'metadata': metadata,
+        'cenas': cenas,
+        'audio': {chave: texto(valor, idioma) for chave, valor in t['audio'].items()},
+        'integracao': {
+            'plataforma_video': t['plataforma_video'],
+            'plataforma_audio': t['plataforma_audio'],
+            'fonte_dados': Var('fonte_dados')
+        }
+    })
+
+
+__all__ = [
+    'INFOGRAFICO', 'VIDEO', 'Var', 'FrozenDict', 'Prototipo',
+    'compilar_infografico', 'compilar_roteiro', 'descongelar', 'texto'
+]
@@ -0,0 +1,64 @@
+"""Normalização de texto para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+Remoção de acentos, tokenização, stopwords PT/EN/ES e um stemmer leve por
+sufixos. O mesmo processamento é aplicado ao indexar e ao pesquisar, pelo que
+importa mais ser consistente do que linguisticamente exato.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de do da dos das em no na nos nas por para pelo pela pelos pelas
+com sem sobre entre e ou que qual quais quem como onde quando mais menos muito muita
+ao aos se sua seu suas seus este esta estes estas esse essa isso isto ha ser sao foi sera
+the an of in on at to for from by with without about and or is are was were be been
+what which who how when where why this that these those it its as into than then
+el la los las un una unos unas del al y en por para con sin sobre es son cual cuales
+como donde cuando mas muy lo le les su sus
+""".split())
+
+# (sufixo, substituição, tamanho mínimo do radical), aplicados por ordem
+_SUFIXOS = (
+    ('coes', 'cao', 3), ('cion', 'cao', 3), ('ciones', 'cao', 3), ('tion', 'cao', 3), ('tions', 'cao', 3),
+    ('mente', '', 4), ('ness', '', 4),
+    ('idades', 'idad', 3), ('idade', 'idad', 3), ('idad', 'idad', 3), ('ity', 'idad', 3), ('ities', 'idad', 3),
+    ('ing', '', 4), ('ies', 'y', 3), ('oes', 'ao', 3), ('aes', 'ao', 3), ('ais', 'al', 3), ('eis', 'el', 3),
+    ('ed', '', 4), ('s', '', 3),
+)
+
+
+def dobrar_acentos(texto: str) -> str:
+    """Minúsculas e sem diacríticos ('Reabilitação' -> 'reabilitacao')"""
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=65536)
+def radical(palavra: str) -> str:
+    """Stemmer leve PT/EN/ES por remoção de sufixos"""
+    for sufixo, substituto, minimo in _SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= minimo:
+            palavra = palavra[:-len(sufixo)] + substituto
+            break
+    # 'entorse'/'entorses', 'stretch'/'stretches' -> mesmo radical
+    if palavra.endswith('e') and len(palavra) >= 5:
+        palavra = palavra[:-1]
+    return palavra
+
+
+def tokenizar(texto: str) -> list:
+    return _TOKEN.findall(dobrar_acentos(texto or ''))
+
+
+def termos(texto: str, stem: bool = True) -> list:
+    """Tokens sem stopwords, opcionalmente reduzidos ao radical"""
+    tokens = [t for t in tokenizar(texto) if t not in STOPWORDS]
+    return [radical(t) for t in tokens] if stem else tokens
+
+
+__all__ = ['STOPWORDS', 'dobrar_acentos', 'radical', 'tokenizar', 'termos']
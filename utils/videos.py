@@ -0,0 +1,430 @@
+"""Streaming de vídeos para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+st.video com um caminho local lê o ficheiro inteiro para a memória do
+servidor e envia-o com a página. Este módulo serve os vídeos num servidor HTTP
+próprio (ThreadingHTTPServer numa thread de fundo) com pedidos Range, para o
+browser os ir buscar aos bocados e saltar para qualquer ponto:
+
+- Ficheiros locais: lidos por mmap e enviados em blocos de BLOCO bytes (as
+  páginas vêm da page cache do sistema, partilhada entre utilizadores).
+- Links diretos remotos (http/https terminados em .mp4, .webm, ...): o pedido
+  Range é reencaminhado para a origem e a resposta retransmitida bloco a
+  bloco. Os primeiros CABECA bytes de cada vídeo ficam numa cache em disco,
+  para o início (e o índice 'moov' dos MP4 com faststart) não esperar pela
+  origem.
+
+A memória por utilizador fica limitada a um bloco (mais a cabeça em
+construção no primeiro pedido de um vídeo remoto). Só são servidas origens
+registadas pela app (registar() devolve o URL com um token); o proxy só
+retransmite respostas de vídeo e só de endereços públicos (nem a própria
+máquina, nem a rede interna, nem o serviço de metadados da cloud), também
+depois de redirecionamentos.
+
+Os tokens ficam numa tabela SQLite no diretório da cache, partilhada pelos
+processos da máquina: com vários workers do Streamlit, o primeiro a arrancar
+escuta na porta e serve também os vídeos registados pelos outros.
+
+Configuração: SIA_VIDEO_URL é o endereço público do servidor, como o browser
+o vê (ex: uma rota do proxy reverso à frente do Streamlit); sem ele a app não
+usa o streaming e st.video recebe a origem como antes, porque localhost no
+browser de um utilizador remoto é a máquina dele. SIA_VIDEO_HOST /
+SIA_VIDEO_PORT definem onde escutar (padrão 127.0.0.1); com SIA_VIDEO_URL a
+porta é obrigatória, porque o proxy reverso tem de saber para onde
+encaminhar (sem ela o streaming fica desligado, com um aviso no log).
+"""
+
+import errno
+import ipaddress
+import json
+import mimetypes
+import mmap
+import os
+import socket
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .cache_ficheiros import CacheFicheiros, chave_conteudo
+from .disk_cache import CACHE_DIR
+from .http_client import http_client
+from .logger import log_error, logger
+from .metrics import metrics
+
+EXTENSOES = ('.mp4', '.m4v', '.mov', '.webm', '.ogv', '.ogg', '.mkv')
+BLOCO = 256 * 1024
+# Bytes iniciais de cada vídeo remoto guardados em disco
+CABECA = 4 * BLOCO
+# Idade máxima da cabeça em cache (a origem pode mudar o ficheiro)
+CABECA_TTL = 86400
+MAX_REGISTOS = 1000
+# Para não desligar o browser a meio de um bloco lento da origem
+TIMEOUT_CLIENTE = 60
+MAX_REDIRECIONAMENTOS = 5
+
+_ERROS_LIGACAO = (BrokenPipeError, ConnectionResetError, ConnectionAbortedError)
+
+
+class IntervaloInvalido(ValueError):
+    """Range fora do tamanho do vídeo (resposta 416)"""
+
+
+def intervalo(cabecalho: Optional[str], tamanho: int) -> Optional[Tuple[int, int]]:
+    """(início, fim) inclusivos do cabeçalho Range para um recurso de 'tamanho' bytes
+
+    None sem Range, com sintaxe inválida ou com vários intervalos (responde-se
+    com o vídeo inteiro); IntervaloInvalido se começar depois do fim.
+    """
+    if not cabecalho or not cabecalho.startswith('bytes=') or ',' in cabecalho:
+        return None
+    inicio, _, fim = cabecalho[6:].strip().partition('-')
+    try:
+        if not inicio:
+            # Sufixo: os últimos N bytes
+            n = int(fim)
+            if n <= 0:
+                raise IntervaloInvalido(cabecalho)
+            return max(0, tamanho - n), tamanho - 1
+        a, b = int(inicio), int(fim) if fim else tamanho - 1
+    except IntervaloInvalido:
+        raise
+    except ValueError:
+        return None
+    if a >= tamanho or b < a:
+        raise IntervaloInvalido(cabecalho)
+    return a, min(b, tamanho - 1)
+
+
+def _remoto(origem: str) -> bool:
+    return urlsplit(origem).scheme in ('http', 'https')
+
+
+def publico(url: str) -> bool:
+    """Todos os endereços do host do URL são públicos (não privados, loopback, link-local, reservados...)
+
+    Resolve o nome como o pedido o resolveria; um nome que não resolve conta
+    como não público.
+    """
+    partes = urlsplit(url)
+    if not partes.hostname:
+        return False
+    try:
+        porta = partes.port or (443 if partes.scheme == 'https' else 80)
+        enderecos = socket.getaddrinfo(partes.hostname, porta, type=socket.SOCK_STREAM)
+    except (OSError, ValueError):
+        return False
+    for *_, endereco in enderecos:
+        ip = ipaddress.ip_address(endereco[0].split('%')[0])
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            return False
+    return bool(enderecos)
+
+
+def suportado(origem: str) -> bool:
+    """Ficheiro de vídeo local existente ou link direto http(s) para um ficheiro de vídeo"""
+    origem = origem.strip()
+    if _remoto(origem):
+        return urlsplit(origem).path.lower().endswith(EXTENSOES)
+    path = Path(origem).expanduser()
+    return path.suffix.lower() in EXTENSOES and path.is_file()
+
+
+class ServidorVideos:
+    def __init__(self, host: str = None, porta: int = None, url_publico: str = None, cache_dir=None,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.host = host or os.environ.get('SIA_VIDEO_HOST', '127.0.0.1')
+        self.porta = int(porta if porta is not None else os.environ.get('SIA_VIDEO_PORT', 0))
+        self.url_publico = url_publico or os.environ.get('SIA_VIDEO_URL')
+        diretorio = Path(cache_dir) if cache_dir else CACHE_DIR / 'videos'
+        self.cache = CacheFicheiros(diretorio, max_bytes)
+        self.path = diretorio / 'origens.db'
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._servidor = None
+        if self.url_publico and not self.porta:
+            logger.warning("SIA_VIDEO_URL definido sem SIA_VIDEO_PORT: streaming de vídeo desligado")
+
+    # ---- Registo ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS origens (
+                    token TEXT PRIMARY KEY,
+                    origem TEXT NOT NULL,
+                    usado REAL NOT NULL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_origens_usado ON origens(usado)')
+            self._local.conn = conn
+        return conn
+
+    def registar(self, origem: str) -> str:
+        """URL de streaming para a origem (arranca o servidor na primeira utilização)"""
+        origem = origem.strip()
+        if not _remoto(origem):
+            origem = str(Path(origem).expanduser().resolve())
+        token = chave_conteudo('video', origem)[:32]
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO origens (token, origem, usado) VALUES (?, ?, ?)',
+                     (token, origem, time.time()))
+        conn.execute('DELETE FROM origens WHERE token NOT IN '
+                     '(SELECT token FROM origens ORDER BY usado DESC LIMIT ?)', (MAX_REGISTOS,))
+        base = self.iniciar()
+        nome = Path(urlsplit(origem).path).name if _remoto(origem) else Path(origem).name
+        return f'{base}/v/{token}/{nome}'
+
+    @property
+    def disponivel(self) -> bool:
+        """Há um endereço público pelo qual o browser chega ao servidor (SIA_VIDEO_URL) e uma porta fixa"""
+        return bool(self.url_publico) and bool(self.porta)
+
+    def origem(self, token: str) -> Optional[str]:
+        linha = self._conn().execute('SELECT origem FROM origens WHERE token = ?', (token,)).fetchone()
+        return linha[0] if linha else None
+
+    # ---- Servidor ----
+
+    def iniciar(self) -> str:
+        """Arranca o servidor (idempotente) e devolve o seu URL base
+
+        Sem URL público, o base é http://localhost:<porta>: só serve a um
+        browser na mesma máquina (benchmarks, desenvolvimento local). Com a
+        porta fixa já ocupada por outro worker, é esse que serve (os tokens
+        são partilhados); a próxima chamada volta a tentar, caso ele termine.
+        """
+        with self._lock:
+            if self._servidor is None:
+                try:
+                    self._servidor = ThreadingHTTPServer((self.host, self.porta), self._handler())
+                except OSError as e:
+                    if e.errno != errno.EADDRINUSE or not self.porta:
+                        raise
+                    return (self.url_publico or f'http://localhost:{self.porta}').rstrip('/')
+                self._servidor.daemon_threads = True
+                threading.Thread(target=self._servidor.serve_forever, daemon=True, name='video-http').start()
+                logger.info(f"Streaming de vídeo em {self._servidor.server_address[:2]}")
+            porta = self._servidor.server_address[1]
+        return (self.url_publico or f'http://localhost:{porta}').rstrip('/')
+
+    def parar(self):
+        with self._lock:
+            servidor, self._servidor = self._servidor, None
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+
+    def _handler(self):
+        videos = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            timeout = TIMEOUT_CLIENTE
+
+            def _responder(self, corpo: bool):
+                partes = self.path.split('?')[0].split('/')
+                origem = videos.origem(partes[2]) if len(partes) > 2 and partes[1] == 'v' else None
+                if origem is None:
+                    self.send_error(404)
+                    return
+                try:
+                    if _remoto(origem):
+                        videos._servir_remoto(self, origem, corpo)
+                    else:
+                        videos._servir_local(self, origem, corpo)
+                except _ERROS_LIGACAO:
+                    self.close_connection = True  # o browser cancelou (ex: saltou para outro ponto)
+                except Exception as e:
+                    log_error('ServidorVideos', e)
+                    self.close_connection = True
+
+            def do_GET(self):
+                self._responder(True)
+
+            def do_HEAD(self):
+                self._responder(False)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # ---- Respostas ----
+
+    @staticmethod
+    def _cabecalhos(handler, status: int, tipo: str, tamanho: int, inicio: int, fim: int, parcial: bool):
+        handler.send_response(status)
+        handler.send_header('Content-Type', tipo)
+        handler.send_header('Accept-Ranges', 'bytes')
+        handler.send_header('Content-Length', str(fim - inicio + 1))
+        if parcial:
+            handler.send_header('Content-Range', f'bytes {inicio}-{fim}/{tamanho}')
+        handler.send_header('Cache-Control', 'private, max-age=3600')
+        handler.end_headers()
+
+    @staticmethod
+    def _recusar_intervalo(handler, tamanho: int):
+        handler.send_response(416)
+        handler.send_header('Content-Range', f'bytes */{tamanho}')
+        handler.send_header('Content-Length', '0')
+        handler.end_headers()
+
+    def _servir_local(self, handler, origem: str, corpo: bool):
+        path = Path(origem)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            handler.send_error(404)
+            return
+        with f:
+            tamanho = os.fstat(f.fileno()).st_size
+            tipo = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+            try:
+                pedido = intervalo(handler.headers.get('Range'), tamanho)
+            except IntervaloInvalido:
+                self._recusar_intervalo(handler, tamanho)
+                return
+            inicio, fim = pedido or (0, tamanho - 1)
+            self._cabecalhos(handler, 206 if pedido else 200, tipo, tamanho, inicio, fim, bool(pedido))
+            if not corpo or not tamanho:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa, memoryview(mapa) as vista:
+                for posicao in range(inicio, fim + 1, BLOCO):
+                    handler.wfile.write(vista[posicao:min(posicao + BLOCO, fim + 1)])
+        metrics.inc('video_bytes_total', fim - inicio + 1, source='local')
+
+    def _servir_remoto(self, handler, origem: str, corpo: bool):
+        chave = chave_conteudo('video', origem)
+        meta = self._meta(chave)
+        if meta is not None:
+            try:
+                pedido = intervalo(handler.headers.get('Range'), meta['tamanho'])
+            except IntervaloInvalido:
+                self._recusar_intervalo(handler, meta['tamanho'])
+                return
+            # Início do vídeo servido da cache: a resposta pode ser mais curta do que o pedido,
+            # o browser pede o resto a seguir
+            if pedido and pedido[0] < meta['cabeca']:
+                cabeca = self.cache.obter(chave, 'head')
+                if cabeca is not None:
+                    inicio, fim = pedido[0], min(pedido[1], meta['cabeca'] - 1)
+                    self._cabecalhos(handler, 206, meta['tipo'], meta['tamanho'], inicio, fim, True)
+                    if corpo:
+                        with open(cabeca, 'rb') as f:
+                            f.seek(inicio)
+                            for posicao in range(inicio, fim + 1, BLOCO):
+                                handler.wfile.write(f.read(min(BLOCO, fim + 1 - posicao)))
+                    metrics.inc('video_bytes_total', fim - inicio + 1, source='cache')
+                    return
+        self._proxy(handler, origem, chave, corpo)
+
+    def _meta(self, chave: str) -> Optional[dict]:
+        path = self.cache.obter(chave, 'json')
+        if path is None:
+            return None
+        try:
+            meta = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return meta if time.time() - meta.get('criado', 0) <= CABECA_TTL else None
+
+    @staticmethod
+    def _pedir(metodo: str, url: str, cabecalhos: dict):
+        """Resposta da origem, seguindo os redirecionamentos só para endereços públicos (None se recusado)"""
+        for _ in range(MAX_REDIRECIONAMENTOS + 1):
+            if not publico(url):
+                logger.warning(f"Vídeo recusado: {urlsplit(url).hostname} não é um endereço público")
+                return None
+            response = http_client.session('video').request(
+                metodo, url, headers=cabecalhos, stream=True, allow_redirects=False,
+                timeout=http_client.endpoints['video']['timeout'])
+            if not response.is_redirect:
+                return response
+            url = urljoin(url, response.headers['Location'])
+            response.close()
+        return None
+
+    def _proxy(self, handler, origem: str, chave: str, corpo: bool):
+        """Reencaminha o pedido (com o Range do browser) e retransmite a resposta bloco a bloco"""
+        cabecalhos = {'Range': handler.headers['Range']} if handler.headers.get('Range') else {}
+        response = self._pedir('GET' if corpo else 'HEAD', origem, cabecalhos)
+        if response is None:
+            handler.send_error(403, 'Origem não permitida')
+            return
+        with response:
+            tipo = response.headers.get('Content-Type', '')
+            if response.status_code not in (200, 206, 416) or not (
+                    tipo.startswith('video/') or tipo.startswith('application/octet-stream')):
+                handler.send_error(502, 'A origem não devolveu um vídeo')
+                return
+            handler.send_response(response.status_code)
+            for nome in ('Content-Type', 'Content-Length', 'Content-Range', 'Accept-Ranges', 'Last-Modified',
+                         'ETag'):
+                if nome in response.headers:
+                    handler.send_header(nome, response.headers[nome])
+            if 'Content-Length' not in response.headers:
+                handler.send_header('Connection', 'close')
+                handler.close_connection = True
+            handler.end_headers()
+            if not corpo or response.status_code == 416:
+                return
+
+            # A cabeça só é guardada se a origem aceitar Range (senão não se pode servir aos bocados)
+            inicio = 0 if response.status_code == 200 else _inicio_content_range(response.headers)
+            tamanho = _tamanho_total(response)
+            guardar = inicio == 0 and tamanho and (
+                response.status_code == 206 or response.headers.get('Accept-Ranges') == 'bytes')
+            cabeca = bytearray() if guardar else None
+            enviados = 0
+            for bloco in response.iter_content(BLOCO):
+                handler.wfile.write(bloco)
+                enviados += len(bloco)
+                if cabeca is not None:
+                    cabeca += bloco[:CABECA - len(cabeca)]
+                    if len(cabeca) >= min(CABECA, tamanho):
+                        self._guardar_cabeca(chave, bytes(cabeca), tamanho, tipo)
+                        cabeca = None
+        metrics.inc('video_bytes_total', enviados, source='remote')
+
+    def _guardar_cabeca(self, chave: str, cabeca: bytes, tamanho: int, tipo: str):
+        try:
+            self.cache.guardar(chave, 'head', cabeca)
+            meta = {'tamanho': tamanho, 'tipo': tipo, 'cabeca': len(cabeca), 'criado': time.time()}
+            self.cache.guardar(chave, 'json', json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            log_error('ServidorVideos.cabeca', e)
+
+
+def _inicio_content_range(headers) -> Optional[int]:
+    try:
+        return int(headers['Content-Range'].split()[1].split('-')[0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def _tamanho_total(response) -> Optional[int]:
+    """Tamanho do vídeo completo (Content-Range '/total' numa 206, Content-Length numa 200)"""
+    try:
+        if response.status_code == 206:
+            return int(response.headers['Content-Range'].rsplit('/', 1)[1])
+        return int(response.headers['Content-Length'])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+# Instância global
+servidor_videos = ServidorVideos()
+
+
+__all__ = ['ServidorVideos', 'servidor_videos', 'suportado', 'publico', 'intervalo', 'IntervaloInvalido',
+           'EXTENSOES']
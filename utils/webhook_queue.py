@@ -0,0 +1,414 @@
+"""Fila de envio para webhooks (Make.com/Activepieces) para Sports Injury AI Studio
+Criado: 17 Outubro 2026
+
+A UI apenas coloca o documento na fila (enfileirar) e consulta o estado; o
+envio é feito por um pool de threads em segundo plano. A fila é uma base
+SQLite partilhada por todos os processos do host, pelo que os envios
+sobrevivem a reinícios. Cada worker reclama um lote de documentos do mesmo
+destino numa transação IMMEDIATE, respeitando o limite de envios simultâneos
+do destino, e marca-os como 'enviando' com um prazo (lease). Se o processo
+morrer a meio, o lote volta à fila quando o prazo expira.
+
+Falhas de rede, 408, 429 e 5xx são repetidas com backoff exponencial e jitter
+(respeitando Retry-After). Outras respostas 4xx, ou esgotadas as tentativas,
+movem o documento para a tabela de dead-letters ('mortos').
+
+A configuração de cada destino (URL, envios simultâneos, tamanho do lote) é
+guardada na base por configurar_destino, e todos os processos usam essa, tanto
+o limite de concorrência como a forma do corpo. Um processo só envia
+documentos de destinos configurados na base.
+
+Com tamanho_lote=1 o corpo do POST é o próprio documento (como no
+AUTOMATION_GUIDE.md). Com tamanho_lote > 1 é uma lista JSON de documentos, e
+o cenário deve iterá-la (ex: módulo Iterator no Make.com).
+"""
+
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .disk_cache import CACHE_DIR
+from .http_client import http_client
+from .logger import logger, log_error
+from .metrics import metrics
+from .serializer import serializer
+
+# Estados de um envio
+PENDENTE, ENVIANDO, ENVIADO, FALHADO = 'pendente', 'enviando', 'enviado', 'falhado'
+
+STATUS_REPETIVEIS = (408, 425, 429, 500, 502, 503, 504)
+
+DESTINO_PADRAO = {'max_concorrencia': 2, 'tamanho_lote': 1}
+
+# Segundos até um lote em envio ser considerado abandonado
+LEASE = 120.0
+# Espera máxima dos workers sem trabalho (também é o atraso máximo de um envio agendado)
+INTERVALO_POLL = 1.0
+# Envios concluídos são apagados ao fim de 7 dias
+RETENCAO_ENVIADOS = 7 * 86400
+
+
+class WebhookQueue:
+    def __init__(self, path=None, workers: int = 4, max_tentativas: int = 6,
+                 backoff_base: float = 2.0, backoff_max: float = 300.0):
+        self.path = Path(path) if path else CACHE_DIR / 'webhooks.db'
+        self.workers = workers
+        self.max_tentativas = max_tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.destinos = {}
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._threads = []
+        self._parar = threading.Event()
+        self._acordar = threading.Event()
+        self._proxima = 0.0
+        self._arranque_lock = threading.Lock()
+
+    # ---- SQLite ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._init_db()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS envios (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    destino TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    estado TEXT NOT NULL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    proxima REAL NOT NULL,
+                    lote TEXT,
+                    lease REAL,
+                    ultimo_erro TEXT,
+                    criado REAL NOT NULL,
+                    enviado REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_envios_fila ON envios(estado, destino, proxima);
+                CREATE TABLE IF NOT EXISTS mortos (
+                    id INTEGER PRIMARY KEY,
+                    destino TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    tentativas INTEGER NOT NULL,
+                    ultimo_erro TEXT,
+                    criado REAL NOT NULL,
+                    morto REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS destinos (
+                    nome TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    max_concorrencia INTEGER NOT NULL,
+                    tamanho_lote INTEGER NOT NULL
+                );
+            """)
+            conn.close()
+            self._initialized = True
+
+    def _transacao(self, func):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            resultado = func(conn)
+            conn.execute('COMMIT')
+            return resultado
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    # ---- API ----
+
+    def configurar_destino(self, nome: str, url: str, max_concorrencia: int = None, tamanho_lote: int = None):
+        """Regista um destino: URL, envios simultâneos permitidos e documentos por POST
+
+        A configuração fica na base e passa a valer para os envios deste destino
+        feitos por qualquer processo.
+        """
+        config = {
+            'url': url,
+            'max_concorrencia': max(1, max_concorrencia or DESTINO_PADRAO['max_concorrencia']),
+            'tamanho_lote': max(1, tamanho_lote or DESTINO_PADRAO['tamanho_lote']),
+        }
+        self._conn().execute(
+            'INSERT INTO destinos (nome, url, max_concorrencia, tamanho_lote) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (nome) DO UPDATE SET url = excluded.url, max_concorrencia = excluded.max_concorrencia, '
+            'tamanho_lote = excluded.tamanho_lote',
+            (nome, config['url'], config['max_concorrencia'], config['tamanho_lote'])
+        )
+        self.destinos[nome] = config
+
+    def enfileirar(self, destino: str, documento) -> int:
+        """Coloca um documento na fila do destino. Retorna o id do envio"""
+        if destino not in self.destinos:
+            raise KeyError(f"destino de webhook não configurado: {destino}")
+        agora = time.time()
+        cursor = self._conn().execute(
+            'INSERT INTO envios (destino, url, payload, estado, proxima, criado) VALUES (?, ?, ?, ?, ?, ?)',
+            (destino, self.destinos[destino]['url'], serializer.dumps(documento), PENDENTE, agora, agora)
+        )
+        metrics.inc('webhook_enqueued_total', destino=destino)
+        self.iniciar()
+        self._acordar.set()
+        return cursor.lastrowid
+
+    def estado(self, envio_id: int) -> Optional[Dict]:
+        """Estado de um envio: pendente, enviando, enviado ou falhado (dead-letter)"""
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT id, destino, estado, tentativas, proxima, ultimo_erro, criado, enviado FROM envios WHERE id = ?',
+            (envio_id,)
+        ).fetchone()
+        if row:
+            return dict(zip(('id', 'destino', 'estado', 'tentativas', 'proxima', 'ultimo_erro', 'criado',
+                             'enviado'), row))
+        row = conn.execute(
+            'SELECT id, destino, tentativas, ultimo_erro, criado, morto FROM mortos WHERE id = ?', (envio_id,)
+        ).fetchone()
+        if row:
+            return {'id': row[0], 'destino': row[1], 'estado': FALHADO, 'tentativas': row[2],
+                    'ultimo_erro': row[3], 'criado': row[4], 'morto': row[5]}
+        return None
+
+    def contagens(self) -> Dict[str, Dict[str, int]]:
+        """destino -> {estado: nº de envios}"""
+        conn = self._conn()
+        resultado = {}
+        for destino, estado, total in conn.execute(
+                'SELECT destino, estado, COUNT(*) FROM envios GROUP BY destino, estado'):
+            resultado.setdefault(destino, {})[estado] = total
+        for destino, total in conn.execute('SELECT destino, COUNT(*) FROM mortos GROUP BY destino'):
+            resultado.setdefault(destino, {})[FALHADO] = total
+        return resultado
+
+    def dead_letters(self, limite: int = 50) -> List[Dict]:
+        rows = self._conn().execute(
+            'SELECT id, destino, tentativas, ultimo_erro, criado, morto FROM mortos ORDER BY morto DESC LIMIT ?',
+            (limite,)
+        ).fetchall()
+        return [dict(zip(('id', 'destino', 'tentativas', 'ultimo_erro', 'criado', 'morto'), row)) for row in rows]
+
+    def reenviar(self, envio_id: int) -> bool:
+        """Devolve um dead-letter à fila (com as tentativas a zero)"""
+        def mover(conn):
+            row = conn.execute('SELECT id, destino, url, payload, criado FROM mortos WHERE id = ?',
+                               (envio_id,)).fetchone()
+            if row is None:
+                return False
+            conn.execute(
+                'INSERT INTO envios (id, destino, url, payload, estado, proxima, criado) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (*row[:4], PENDENTE, time.time(), row[4])
+            )
+            conn.execute('DELETE FROM mortos WHERE id = ?', (envio_id,))
+            return True
+        movido = self._transacao(mover)
+        if movido:
+            self.iniciar()
+            self._acordar.set()
+        return movido
+
+    def esperar(self, ids, timeout: float = 30.0) -> bool:
+        """Espera até os envios terminarem (enviado ou falhado). Retorna False no timeout"""
+        ids = list(ids)
+        limite = time.monotonic() + timeout
+        while self._em_curso(ids):
+            if time.monotonic() >= limite:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _em_curso(self, ids: list) -> int:
+        total = 0
+        for inicio in range(0, len(ids), 500):
+            parte = ids[inicio:inicio + 500]
+            total += self._conn().execute(
+                f'SELECT COUNT(*) FROM envios WHERE estado IN (?, ?) AND id IN ({",".join("?" * len(parte))})',
+                (PENDENTE, ENVIANDO, *parte)
+            ).fetchone()[0]
+        return total
+
+    # ---- Workers ----
+
+    def iniciar(self):
+        """Arranca o pool de workers (idempotente)"""
+        if self._threads:
+            return
+        with self._arranque_lock:
+            if self._threads:
+                return
+            self._parar.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'webhook-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def parar(self, timeout: float = 5.0):
+        self._parar.set()
+        self._acordar.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _worker(self):
+        while not self._parar.is_set():
+            try:
+                lote = self._reclamar()
+            except sqlite3.Error as e:
+                log_error('WebhookQueue._reclamar', e)
+                lote = None
+            if lote is None:
+                self._acordar.wait(min(INTERVALO_POLL, max(0.0, self._proxima - time.time())))
+                self._acordar.clear()
+                continue
+            try:
+                self._enviar(*lote)
+            except Exception as e:
+                log_error('WebhookQueue._enviar', e)
+
+    def _reclamar(self):
+        """Reclama o próximo lote de um destino com capacidade livre. Retorna (destino, tamanho_lote, lote, linhas)
+
+        Só considera destinos configurados na base, com a configuração aí guardada.
+        """
+        def reclamar(conn):
+            agora = time.time()
+            # Lotes de workers que morreram a meio voltam à fila
+            conn.execute('UPDATE envios SET estado = ?, lote = NULL WHERE estado = ? AND lease < ?',
+                         (PENDENTE, ENVIANDO, agora))
+            prontos = conn.execute(
+                'SELECT e.destino, d.max_concorrencia, d.tamanho_lote FROM envios e '
+                'JOIN destinos d ON d.nome = e.destino WHERE e.estado = ? AND e.proxima <= ? '
+                'GROUP BY e.destino ORDER BY MIN(e.proxima)', (PENDENTE, agora)
+            ).fetchall()
+            for destino, max_concorrencia, tamanho_lote in prontos:
+                em_envio = conn.execute(
+                    'SELECT COUNT(DISTINCT lote) FROM envios WHERE destino = ? AND estado = ?', (destino, ENVIANDO)
+                ).fetchone()[0]
+                if em_envio >= max_concorrencia:
+                    continue
+                linhas = conn.execute(
+                    'SELECT id, url, payload, tentativas FROM envios WHERE destino = ? AND estado = ? '
+                    'AND proxima <= ? ORDER BY id LIMIT ?', (destino, PENDENTE, agora, tamanho_lote)
+                ).fetchall()
+                lote = uuid.uuid4().hex
+                conn.executemany(
+                    'UPDATE envios SET estado = ?, lote = ?, lease = ? WHERE id = ?',
+                    [(ENVIANDO, lote, agora + LEASE, linha[0]) for linha in linhas]
+                )
+                return destino, tamanho_lote, lote, linhas
+            # Nada pronto (ou destinos prontos no limite de concorrência): os workers dormem até à
+            # próxima tentativa agendada, ou até um lote terminar e libertar capacidade
+            proxima = conn.execute('SELECT MIN(proxima) FROM envios WHERE estado = ? AND proxima > ?',
+                                   (PENDENTE, agora)).fetchone()[0]
+            self._proxima = proxima if proxima is not None else agora + INTERVALO_POLL
+            if random.random() < 0.01:
+                conn.execute('DELETE FROM envios WHERE estado = ? AND enviado < ?',
+                             (ENVIADO, agora - RETENCAO_ENVIADOS))
+            return None
+        return self._transacao(reclamar)
+
+    def _backoff(self, tentativas: int, retry_after: Optional[float]) -> float:
+        """Backoff exponencial com jitter total, nunca abaixo do Retry-After"""
+        teto = min(self.backoff_max, self.backoff_base * 2 ** (tentativas - 1))
+        return max(random.uniform(0, teto), retry_after or 0)
+
+    def _enviar(self, destino: str, tamanho_lote: int, lote: str, linhas: list):
+        import requests
+
+        url = linhas[0][1]
+        payloads = [linha[2] for linha in linhas]
+        corpo = payloads[0] if tamanho_lote == 1 else b'[' + b','.join(payloads) + b']'
+
+        erro, repetir, retry_after = None, True, None
+        try:
+            with metrics.timer('webhook_seconds', destino=destino):
+                response = http_client.session('webhook').post(
+                    url, data=corpo, headers={'Content-Type': 'application/json'},
+                    timeout=http_client.endpoints['webhook']['timeout']
+                )
+            if response.ok:
+                self._concluir(lote)
+                metrics.inc('webhook_sent_total', len(linhas), destino=destino)
+                return
+            erro = f"HTTP {response.status_code}: {response.text[:200]}"
+            repetir = response.status_code in STATUS_REPETIVEIS
+            retry_after = _retry_after(response.headers.get('Retry-After'))
+        except requests.RequestException as e:
+            erro = f"{type(e).__name__}: {e}"
+        metrics.inc('webhook_failures_total', destino=destino)
+        logger.warning("Webhook %s falhou (%d documentos): %s", destino, len(linhas), erro,
+                       extra={'evento': 'webhook_failure', 'destino': destino, 'erro': erro})
+        self._falhar(destino, lote, linhas, erro, repetir, retry_after)
+
+    def _concluir(self, lote: str):
+        self._conn().execute('UPDATE envios SET estado = ?, enviado = ?, lote = NULL, ultimo_erro = NULL '
+                             'WHERE lote = ?', (ENVIADO, time.time(), lote))
+        self._acordar.set()
+
+    def _falhar(self, destino: str, lote: str, linhas: list, erro: str, repetir: bool, retry_after):
+        def registar(conn):
+            agora = time.time()
+            for envio_id, url, payload, tentativas in linhas:
+                tentativas += 1
+                if repetir and tentativas < self.max_tentativas:
+                    conn.execute(
+                        'UPDATE envios SET estado = ?, tentativas = ?, proxima = ?, lote = NULL, ultimo_erro = ? '
+                        'WHERE id = ? AND lote = ?',
+                        (PENDENTE, tentativas, agora + self._backoff(tentativas, retry_after), erro, envio_id, lote)
+                    )
+                    continue
+                criado = conn.execute('SELECT criado FROM envios WHERE id = ?', (envio_id,)).fetchone()
+                conn.execute(
+                    'INSERT OR REPLACE INTO mortos (id, destino, url, payload, tentativas, ultimo_erro, criado, morto) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (envio_id, destino, url, payload, tentativas, erro, criado[0] if criado else agora, agora)
+                )
+                conn.execute('DELETE FROM envios WHERE id = ?', (envio_id,))
+                metrics.inc('webhook_dead_letters_total', destino=destino)
+        self._transacao(registar)
+        self._acordar.set()
+
+
+def _retry_after(valor: Optional[str]) -> Optional[float]:
+    try:
+        return float(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def _estado_fila() -> list:
+    """Documentos por destino e estado, lidos no momento da exportação"""
+    amostras = []
+    try:
+        contagens = webhook_queue.contagens()
+    except sqlite3.Error:
+        return amostras
+    for destino, estados in contagens.items():
+        for estado, total in estados.items():
+            amostras.append(('webhook_queue_documents', {'destino': destino, 'estado': estado}, total, 'gauge'))
+    return amostras
+
+
+# Instância global
+webhook_queue = WebhookQueue()
+metrics.register_collector(_estado_fila)